@@ -0,0 +1,107 @@
+"""
+Layer 1 Backend Benchmark
+PyTorch fp32 versus ONNX Runtime fp32 and int8: latency, throughput,
+resident memory and entity-level agreement with the PyTorch baseline
+
+Each backend runs in its own interpreter so memory figures are not mixed.
+Export the ONNX models first:
+    python inference_backends.py export /models/bert-base-NER /models/bert-base-NER-onnx
+    python benchmarks/bench_backends.py /models/bert-base-NER /models/bert-base-NER-onnx
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON report
+PROBE = """
+import sys, time, json
+sys.path.insert(0, 'benchmarks')
+from bench_chunking import peak_rss_mb
+from bench_detect_batch import build_corpus
+from inference_backends import load_backend
+
+backend = load_backend(BACKEND, MODEL, local_files_only=True)
+corpus = build_corpus(NUM_DOCS)
+backend(corpus[:BATCH_SIZE], batch_size=BATCH_SIZE)
+
+latencies = []
+for text in corpus[:LATENCY_DOCS]:
+    started = time.perf_counter()
+    backend(text)
+    latencies.append(time.perf_counter() - started)
+
+started = time.perf_counter()
+outputs = backend(corpus, batch_size=BATCH_SIZE)
+elapsed = time.perf_counter() - started
+
+print(json.dumps({
+    'latencies': latencies,
+    'throughput': len(corpus) / elapsed,
+    'rss_mb': peak_rss_mb(),
+    'entities': [[[e['entity_group'], int(e['start']), int(e['end'])] for e in entities]
+                 for entities in outputs],
+}))
+"""
+
+
+def probe(backend: str, model: str, num_docs: int, batch_size: int, latency_docs: int) -> dict:
+    """Run PROBE for one backend in a fresh interpreter"""
+    code = (f"BACKEND = {backend!r}\nMODEL = {model!r}\nNUM_DOCS = {num_docs}\n"
+            f"BATCH_SIZE = {batch_size}\nLATENCY_DOCS = {latency_docs}\n" + PROBE)
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def agreement(baseline, candidate) -> float:
+    """Entity-level F1 of candidate against baseline (type and exact span)"""
+    matched = expected = found = 0
+    for gold, got in zip(baseline, candidate):
+        gold = {tuple(e) for e in gold}
+        got = {tuple(e) for e in got}
+        matched += len(gold & got)
+        expected += len(gold)
+        found += len(got)
+    if not expected and not found:
+        return 1.0
+    return 2 * matched / (expected + found)
+
+
+def run_benchmark(checkpoint: str, onnx_dir: str, num_docs: int = 256,
+                  batch_size: int = 16, latency_docs: int = 50):
+    """Measure each backend and compare its entities with PyTorch"""
+    print("=" * 60)
+    print("LAYER 1 BACKEND BENCHMARK")
+    print("=" * 60)
+
+    reports = {'pytorch': probe('pytorch', checkpoint, num_docs, batch_size, latency_docs)}
+    for backend in ('onnx', 'onnx-int8'):
+        reports[backend] = probe(backend, onnx_dir, num_docs, batch_size, latency_docs)
+
+    print("\n{:<11} {:<9} {:<9} {:<10} {:<10} {:<9}".format(
+        "Backend", "p50 (ms)", "p99 (ms)", "docs/sec", "RSS (MB)", "Agree F1"))
+    print("-" * 60)
+    baseline = reports['pytorch']['entities']
+    for backend, report in reports.items():
+        latencies = np.array(report['latencies']) * 1000
+        print("{:<11} {:<9.1f} {:<9.1f} {:<10.1f} {:<10.0f} {:<9.3f}".format(
+            backend, np.percentile(latencies, 50), np.percentile(latencies, 99),
+            report['throughput'], report['rss_mb'], agreement(baseline, report['entities'])))
+
+    print(f"\n{num_docs} documents, batch size {batch_size}; latency is one document per call")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('checkpoint', help="Local PyTorch checkpoint directory")
+    parser.add_argument('onnx_dir', help="Directory written by 'inference_backends.py export'")
+    args = parser.parse_args()
+    run_benchmark(args.checkpoint, args.onnx_dir)
@@ -0,0 +1,86 @@
+"""
+Long-Document Chunking Benchmark
+Latency, recall and peak memory of windowed Layer 1 at 10 KB, 100 KB and 1 MB
+"""
+
+import os
+import sys
+import time
+import random
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+
+NAMES = ["John Smith", "Jane Doe", "Robert Johnson", "Maria Garcia",
+         "David Lee", "Sarah Connor", "Michael Brown", "Emily Davis"]
+FILLER = ["The patient was seen in clinic today for a routine follow-up visit.",
+          "Vitals were stable and no acute distress was noted on examination.",
+          "The agreement shall remain in force for a period of twelve months.",
+          "All parties acknowledge receipt of the amended disclosure schedule."]
+
+
+def build_document(size_chars: int, seed: int = 0):
+    """Clinical/contract prose with planted names; returns (text, gold spans)"""
+    rng = random.Random(seed)
+    parts, gold, length = [], [], 0
+    while length < size_chars:
+        if rng.random() < 0.3:
+            name = rng.choice(NAMES)
+            sentence = f"The note was signed by {name} after review."
+            start = length + sentence.index(name)
+            gold.append((start, start + len(name)))
+        else:
+            sentence = rng.choice(FILLER)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts), gold
+
+
+def recall(gold, results) -> float:
+    """Share of planted names overlapped by a PER detection"""
+    spans = sorted((r.start, r.end) for r in results if r.pii_type == 'PER')
+    found = 0
+    i = 0
+    for start, end in gold:
+        while i < len(spans) and spans[i][1] <= start:
+            i += 1
+        if i < len(spans) and spans[i][0] < end:
+            found += 1
+    return found / len(gold) if gold else 1.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_benchmark():
+    """Run windowed Layer 1 over increasingly long documents"""
+    print("=" * 60)
+    print("LONG-DOCUMENT CHUNKING BENCHMARK")
+    print("=" * 60)
+    
+    detector = MultiLayerPIIDetector()
+    detector.detect_ml_layer("Warm-up call for John Smith.")
+    print(f"Window: {detector._window_tokens()} tokens, overlap {detector.chunk_overlap}")
+    print(f"Peak RSS after model load: {peak_rss_mb():.0f} MB")
+    
+    print("\n{:<10} {:<14} {:<12} {:<10} {:<14}".format(
+        "Input", "Latency (s)", "KB/sec", "Recall", "Peak RSS (MB)"))
+    print("-" * 60)
+    
+    for label, size in [("10 KB", 10_000), ("100 KB", 100_000), ("1 MB", 1_000_000)]:
+        text, gold = build_document(size)
+        start = time.perf_counter()
+        results = detector.detect_ml_layer(text)
+        seconds = time.perf_counter() - start
+        print("{:<10} {:<14.2f} {:<12.1f} {:<10.3f} {:<14.0f}".format(
+            label, seconds, len(text) / 1000 / seconds, recall(gold, results), peak_rss_mb()))
+    
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,103 @@
+"""
+Incremental Scan Benchmark
+Nightly re-scan of a corpus where a few percent of documents changed:
+full detect_batch() versus IncrementalScanner backed by a fingerprint store
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+from incremental_scan import FingerprintStore, IncrementalScanner
+from bench_suite import build_corpus
+
+EDIT = "\nAmended: contact Maria Garcia at 617-555-0142 regarding the claim.\n"
+
+
+def build_documents(num_small: int, num_large: int, seed: int = 0) -> dict:
+    """doc_id -> text: many short notes plus a few long reports"""
+    documents = {f"note-{i}": text for i, text in enumerate(build_corpus(num_small, seed=seed))}
+    for i in range(num_large):
+        documents[f"report-{i}"] = "\n".join(build_corpus(120, seed=seed + 1000 + i))
+    return documents
+
+
+def edit_documents(documents: dict, fraction: float, seed: int = 0) -> dict:
+    """Copy with fraction of documents changed: notes get a sentence appended, reports an insertion mid-way"""
+    rng = random.Random(seed)
+    edited = dict(documents)
+    notes = sorted(doc_id for doc_id in documents if doc_id.startswith('note'))
+    reports = sorted(doc_id for doc_id in documents if doc_id.startswith('report'))
+    # Sample each kind separately so some long reports are always among the edits
+    chosen = rng.sample(notes, max(1, int(len(notes) * fraction))) if notes else []
+    chosen += rng.sample(reports, max(1, int(len(reports) * fraction))) if reports else []
+    for doc_id in chosen:
+        text = edited[doc_id]
+        if doc_id.startswith('report'):
+            middle = text.find("\n", len(text) // 2)
+            edited[doc_id] = text[:middle] + EDIT + text[middle:]
+        else:
+            edited[doc_id] = text + EDIT.strip()
+    return edited
+
+
+def full_scan(detector: MultiLayerPIIDetector, documents: dict, batch_size: int) -> float:
+    """Seconds to detect every document"""
+    texts = list(documents.values())
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        detector.detect_batch(texts[i:i + batch_size], batch_size=batch_size)
+    return time.perf_counter() - started
+
+
+def incremental_scan(detector: MultiLayerPIIDetector, documents: dict, path: str, batch_size: int) -> dict:
+    """One incremental run against the store at path; returns its report"""
+    doc_ids = list(documents)
+    with FingerprintStore(path) as store:
+        scanner = IncrementalScanner(detector, store)
+        for i in range(0, len(doc_ids), batch_size):
+            batch = doc_ids[i:i + batch_size]
+            scanner.detect_batch(batch, [documents[doc_id] for doc_id in batch], batch_size)
+        return scanner.report()
+
+
+def run_benchmark(num_small: int = 2000, num_large: int = 20, changed: float = 0.05, batch_size: int = 32):
+    """Seed the store with a first run, then compare re-scans of the edited corpus"""
+    print("=" * 60)
+    print("INCREMENTAL SCAN BENCHMARK")
+    print("=" * 60)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        detector = MultiLayerPIIDetector()
+    detector.warmup()
+
+    documents = build_documents(num_small, num_large)
+    edited = edit_documents(documents, changed)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'fingerprints.db')
+        first = incremental_scan(detector, documents, path, batch_size)
+        full_seconds = full_scan(detector, edited, batch_size)
+        report = incremental_scan(detector, edited, path, batch_size)
+
+    print(f"\n{len(documents)} documents ({num_large} long), {changed:.0%} edited")
+    print("\n{:<26} {:<12}".format("Run", "Wall (s)"))
+    print("-" * 60)
+    print("{:<26} {:<12.2f}".format("first run (store empty)", first['wall_seconds']))
+    print("{:<26} {:<12.2f}".format("full re-scan", full_seconds))
+    print("{:<26} {:<12.2f}".format("incremental re-scan", report['wall_seconds']))
+    print(f"\nSkipped {report['skipped']}, partially rescanned {report['partial']}, "
+          f"rescanned {report['rescanned']}")
+    print(f"Chunks reused {report['chunks_reused']}, re-detected {report['chunks_rescanned']}; "
+          f"{report['scanned_fraction']:.1%} of characters detected")
+    print(f"Speedup over full re-scan: {full_seconds / report['wall_seconds']:.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
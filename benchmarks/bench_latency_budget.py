@@ -0,0 +1,100 @@
+"""
+Latency Budget Load Test
+End-to-end tail latency of detect() with and without deadline_ms when
+documents arrive at twice the rate the full three-layer path can serve
+
+A single worker takes documents from an open-loop Poisson arrival stream in
+arrival order. Latency is measured from arrival, so time spent queued counts;
+with deadlines, each document gets whatever is left of the budget after
+queueing. Documents follow a long-tailed (pareto) length distribution from
+synthetic_corpus, so some would blow the budget on their own.
+"""
+
+import os
+import sys
+import time
+import contextlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+from synthetic_corpus import CorpusConfig, generate_shard
+
+
+def serve(detector: MultiLayerPIIDetector, texts, arrivals, budget_ms=None):
+    """
+    Serve texts one at a time in arrival order. Returns per-document
+    latencies in seconds, the budget reports and the number of findings.
+    """
+    latencies, reports, findings = [], [], 0
+    origin = time.perf_counter()
+    for text, arrival in zip(texts, arrivals):
+        wait = origin + arrival - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        if budget_ms is None:
+            result = detector.detect(text)
+        else:
+            queued_ms = (time.perf_counter() - origin - arrival) * 1000
+            result = detector.detect(text, deadline_ms=max(0.0, budget_ms - queued_ms))
+            reports.append(result['budget'])
+        latencies.append(time.perf_counter() - origin - arrival)
+        findings += len(result['pii_detected'])
+    return np.array(latencies), reports, findings
+
+
+def run_benchmark(num_docs: int = 400, budget_ms: float = 100.0, overload: float = 2.0,
+                  seed: int = 0):
+    """Compare the full path and the deadline path at overload times capacity"""
+    print("=" * 60)
+    print("LATENCY BUDGET LOAD TEST")
+    print("=" * 60)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        detector = MultiLayerPIIDetector()
+    detector.warmup()
+
+    texts = generate_shard(num_docs, CorpusConfig(length='pareto', mean_sentences=8.0),
+                           seed=seed).texts
+
+    # Capacity of the full path, measured on the same documents
+    start = time.perf_counter()
+    for text in texts:
+        detector.detect(text)
+    service_time = (time.perf_counter() - start) / num_docs
+    rate = overload / service_time
+    arrivals = np.cumsum(np.random.default_rng(seed).exponential(1.0 / rate, size=num_docs))
+
+    print(f"\nDocuments: {num_docs}, mean {np.mean([len(t) for t in texts]):.0f} chars, "
+          f"max {max(len(t) for t in texts)} chars")
+    print(f"Full path capacity: {1 / service_time:.1f} docs/sec, "
+          f"offered load: {rate:.1f} docs/sec ({overload:.1f}x)")
+    print(f"Budget: {budget_ms:.0f} ms from arrival")
+
+    print("\n{:<12} {:<10} {:<10} {:<10} {:<10} {:<10}".format(
+        "Mode", "p50 (ms)", "p95 (ms)", "p99 (ms)", "In budget", "Findings"))
+    print("-" * 60)
+    full_latencies, _, full_findings = serve(detector, texts, arrivals)
+    budget_latencies, reports, budget_findings = serve(detector, texts, arrivals, budget_ms)
+    for name, latencies, findings in (("full", full_latencies, full_findings),
+                                      ("deadline", budget_latencies, budget_findings)):
+        print("{:<12} {:<10.1f} {:<10.1f} {:<10.1f} {:<10.1%} {:<10}".format(
+            name, *(np.percentile(latencies, q) * 1000 for q in (50, 95, 99)),
+            float(np.mean(latencies * 1000 <= budget_ms)), findings))
+
+    print("\nDeadline path degradation:")
+    for stage in ('layer1', 'layer3'):
+        outcomes = [report[stage] for report in reports]
+        counts = ", ".join(f"{outcome} {outcomes.count(outcome)}"
+                           for outcome in sorted(set(outcomes)))
+        print(f"  {stage}: {counts}")
+    print(f"  findings kept: {budget_findings / full_findings:.1%}" if full_findings else "")
+    print(f"  stage costs (s/unit): {detector.stage_costs.as_dict()}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,106 @@
+"""
+Memory-Mapped Scan Benchmark
+Layer 2 over a large log-style file: read + decode + detect_rules_layer()
+versus detect_rules_file() with one and several workers
+
+Each mode runs in its own interpreter so peak RSS figures are not mixed.
+    python benchmarks/bench_mmap_scan.py --size-mb 512 --workers 4
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON report
+PROBE = """
+import sys, time, json
+sys.path.insert(0, 'benchmarks')
+from bench_chunking import peak_rss_mb
+from multi_layer_detector import MultiLayerPIIDetector
+
+detector = MultiLayerPIIDetector()
+started = time.perf_counter()
+if MODE == 'str':
+    with open(PATH, encoding='utf-8') as handle:
+        found = len(detector.detect_rules_layer(handle.read()))
+else:
+    found = sum(1 for _ in detector.detect_rules_file(PATH, workers=WORKERS))
+elapsed = time.perf_counter() - started
+print(json.dumps({'seconds': elapsed, 'found': found, 'rss_mb': peak_rss_mb()}))
+"""
+
+LOG_LINES = [
+    "2024-03-{day:02d}T10:{minute:02d}:00Z INFO request served in {ms} ms path=/api/v1/orders/{order}",
+    "2024-03-{day:02d}T10:{minute:02d}:01Z DEBUG cache hit ratio {ms} for shard {order}",
+    "2024-03-{day:02d}T10:{minute:02d}:02Z WARN retrying upstream call attempt={ms}",
+]
+PII_LINES = [
+    "2024-03-{day:02d}T10:{minute:02d}:03Z INFO password reset sent to user{order}@example.com",
+    "2024-03-{day:02d}T10:{minute:02d}:04Z INFO callback requested on 617-555-{phone:04d}",
+]
+
+
+def write_log(path: str, size_mb: int, pii_rate: float = 0.05, seed: int = 0):
+    """Log-style file of about size_mb megabytes with a PII line every so often"""
+    rng = random.Random(seed)
+    target = size_mb * 1_000_000
+    with open(path, 'w') as handle:
+        written = 0
+        while written < target:
+            lines = []
+            for _ in range(10_000):
+                template = rng.choice(PII_LINES if rng.random() < pii_rate else LOG_LINES)
+                lines.append(template.format(day=rng.randint(1, 28), minute=rng.randint(0, 59),
+                                             ms=rng.randint(1, 999), order=rng.randint(1, 99999),
+                                             phone=rng.randint(0, 9999)))
+            chunk = "\n".join(lines) + "\n"
+            handle.write(chunk)
+            written += len(chunk)
+
+
+def probe(mode: str, path: str, workers: int = 1) -> dict:
+    """Run PROBE for one mode in a fresh interpreter"""
+    code = f"MODE = {mode!r}\nPATH = {path!r}\nWORKERS = {workers}\n" + PROBE
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(size_mb: int = 256, workers: int = 4):
+    """Scan one generated file in each mode"""
+    print("=" * 60)
+    print("MEMORY-MAPPED RULES SCAN BENCHMARK")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'export.log')
+        write_log(path, size_mb)
+        file_mb = os.path.getsize(path) / 1e6
+
+        reports = {
+            'read + detect_rules_layer': probe('str', path),
+            'detect_rules_file': probe('mmap', path),
+            f'detect_rules_file x{workers}': probe('mmap', path, workers),
+        }
+
+    print(f"\nFile: {file_mb:,.0f} MB")
+    print("\n{:<30} {:<10} {:<10} {:<10} {:<8}".format("Mode", "Time (s)", "MB/s", "RSS (MB)", "Matches"))
+    print("-" * 60)
+    for mode, report in reports.items():
+        print("{:<30} {:<10.2f} {:<10.1f} {:<10.0f} {:<8}".format(
+            mode, report['seconds'], file_mb / report['seconds'], report['rss_mb'], report['found']))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=256, help="Size of the generated file")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes for the parallel run")
+    args = parser.parse_args()
+    run_benchmark(args.size_mb, args.workers)
@@ -0,0 +1,157 @@
+"""
+Domain Model Router Benchmark
+Mixed-domain traffic through one DomainRouter with a memory-budgeted model
+pool versus one dedicated detector process per model
+
+Each configuration runs in its own interpreter so memory figures are not
+mixed. Pass the domain checkpoints (any token-classification models with
+PER/LOC/ORG labels) as DOMAIN=MODEL:
+    python benchmarks/bench_model_router.py --model biomedical=/models/biobert-ner \\
+        --model financial=/models/finbert-ner --model legal=/models/legalbert-ner --budget-mb 1200
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import subprocess
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stand-ins for the fine-tuned domain checkpoints, so the benchmark runs as is
+DEFAULT_MODELS = {
+    'biomedical': 'dslim/distilbert-NER',
+    'financial': 'dslim/bert-large-NER',
+    'legal': 'Jean-Baptiste/roberta-large-ner-english',
+}
+
+# Runs in the child interpreter; prints one JSON report
+PROBE = """
+import sys, time, json, contextlib
+sys.path.insert(0, 'benchmarks')
+from bench_chunking import peak_rss_mb
+from bench_model_router import build_traffic
+from multi_layer_detector import MultiLayerPIIDetector
+from model_router import DomainRouter, ModelPool
+
+texts, domains = build_traffic(NUM_DOCS)
+with contextlib.redirect_stdout(sys.stderr):
+    detector = MultiLayerPIIDetector(local_files_only=LOCAL_FILES_ONLY)
+report = {}
+if MODE == 'router':
+    router = DomainRouter(detector, MODELS, pool=ModelPool(BUDGET_MB, local_files_only=LOCAL_FILES_ONLY))
+    started = time.perf_counter()
+    routes = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        routes += [r['routing']['domain'] for r in router.detect_batch(texts[i:i + BATCH_SIZE], BATCH_SIZE)]
+    report['docs'] = len(texts)
+    report['routed_correctly'] = sum(got == want for got, want in zip(routes, domains)) / len(texts)
+    report['pool'] = router.pool.summary()
+else:
+    # One process serving one domain, model loaded up front like a dedicated server
+    texts = [text for text, domain in zip(texts, domains) if domain == MODE]
+    detector.model_name = MODELS.get(MODE, detector.model_name)
+    detector.warmup()
+    started = time.perf_counter()
+    for i in range(0, len(texts), BATCH_SIZE):
+        detector.detect_batch(texts[i:i + BATCH_SIZE], BATCH_SIZE)
+    report['docs'] = len(texts)
+report['seconds'] = time.perf_counter() - started
+report['rss_mb'] = peak_rss_mb()
+print(json.dumps(report))
+"""
+
+NAMES = ["Maria Garcia", "James Wilson", "Priya Patel", "Chen Wei", "Olivia Brown", "Ahmed Khan"]
+PLACES = ["Boston", "Chicago", "Denver", "Seattle", "Atlanta"]
+TEMPLATES = {
+    'biomedical': [
+        "Patient {name} was admitted to {place} General Hospital with acute chest pain.",
+        "Diagnosis confirmed by biopsy; the physician prescribed 20 mg daily for chronic symptoms.",
+        "Discharge summary for {name}: vitals stable, follow-up at the cardiology clinic.",
+    ],
+    'financial': [
+        "Wire transfer of 4,500 USD from the brokerage account of {name} settled today.",
+        "Invoice payment overdue; the statement balance and interest were sent to {phone}.",
+        "Loan application for {name} in {place} approved pending the audit of the ledger.",
+    ],
+    'legal': [
+        "The plaintiff {name} filed in the {place} district court on the docket below.",
+        "Whereas the parties hereby agree to the settlement, counsel shall indemnify the defendant.",
+        "Pursuant to clause 4 of the agreement, {name} waives liability for the breach.",
+    ],
+    'general': [
+        "Hi {name}, the offsite in {place} moves to Thursday.",
+        "Please call {phone} when you land.",
+        "Thanks for lunch, see you next week.",
+    ],
+}
+
+
+def build_traffic(num_docs: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Interleaved (texts, true domains), an equal share per domain"""
+    rng = random.Random(seed)
+    domains = [rng.choice(sorted(TEMPLATES)) for _ in range(num_docs)]
+    texts = []
+    for domain in domains:
+        texts.append(" ".join(rng.choice(TEMPLATES[domain]).format(
+            name=rng.choice(NAMES), place=rng.choice(PLACES),
+            phone=f"{rng.randint(200, 999)}-555-{rng.randint(0, 9999):04d}")
+            for _ in range(rng.randint(2, 6))))
+    return texts, domains
+
+
+def probe(mode: str, models: dict, num_docs: int, batch_size: int, budget_mb: float,
+          local_files_only: bool) -> dict:
+    """Run PROBE for one configuration in a fresh interpreter"""
+    code = (f"MODE = {mode!r}\nMODELS = {models!r}\nNUM_DOCS = {num_docs}\nBATCH_SIZE = {batch_size}\n"
+            f"BUDGET_MB = {budget_mb}\nLOCAL_FILES_ONLY = {local_files_only}\n" + PROBE)
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(models: dict, num_docs: int = 400, batch_size: int = 16,
+                  budget_mb: float = 2048, local_files_only: bool = False):
+    """Route the traffic in one process, then serve each domain from its own process"""
+    print("=" * 60)
+    print("DOMAIN MODEL ROUTER BENCHMARK")
+    print("=" * 60)
+
+    routed = probe('router', models, num_docs, batch_size, budget_mb, local_files_only)
+    dedicated = {domain: probe(domain, models, num_docs, batch_size, budget_mb, local_files_only)
+                 for domain in sorted(TEMPLATES)}
+
+    print(f"\n{num_docs} documents across {len(TEMPLATES)} domains, batches of {batch_size}")
+    print("\n{:<28} {:<10} {:<10} {:<10}".format("Configuration", "Docs/s", "RSS (MB)", "Processes"))
+    print("-" * 60)
+    print("{:<28} {:<10.1f} {:<10.0f} {:<10}".format(
+        f"router, {budget_mb:.0f} MB budget", routed['docs'] / routed['seconds'], routed['rss_mb'], 1))
+    for domain, report in dedicated.items():
+        print("{:<28} {:<10.1f} {:<10.0f} {:<10}".format(
+            f"  dedicated: {domain}", report['docs'] / report['seconds'], report['rss_mb'], 1))
+    # The dedicated processes share the same cores, so their times add up
+    total_seconds = sum(report['seconds'] for report in dedicated.values())
+    print("{:<28} {:<10.1f} {:<10.0f} {:<10}".format(
+        "one process per model", num_docs / total_seconds,
+        sum(report['rss_mb'] for report in dedicated.values()), len(dedicated)))
+
+    pool = routed['pool']
+    print(f"\nRouted to the right domain: {routed['routed_correctly']:.1%}")
+    print(f"Pool: {pool['loads']} loads, {pool['evictions']} evictions, "
+          f"{pool['resident_mb']:.0f} MB of weights resident at the end")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', action='append', default=[], metavar='DOMAIN=MODEL',
+                        help="Checkpoint for a domain (repeatable)")
+    parser.add_argument('--num-docs', type=int, default=400, help="Documents of mixed traffic")
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--budget-mb', type=float, default=2048, help="Model pool budget")
+    parser.add_argument('--local-files-only', action='store_true', help="Read checkpoints from disk only")
+    args = parser.parse_args()
+    models = dict(DEFAULT_MODELS, **dict(spec.split('=', 1) for spec in args.model))
+    run_benchmark(models, args.num_docs, args.batch_size, args.budget_mb, args.local_files_only)
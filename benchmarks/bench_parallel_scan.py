@@ -0,0 +1,59 @@
+"""
+Multi-Process Scaling Benchmark
+Docs/sec of ShardedDetector as the worker count grows
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_scan import ShardedDetector
+from bench_detect_batch import build_corpus
+
+
+def worker_counts(max_workers: int):
+    """1, 2, 4, ... up to and including max_workers"""
+    counts, workers = [], 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run_benchmark(docs_per_worker: int = 64, batch_size: int = 16):
+    """Measure throughput for each worker count, excluding model load time"""
+    print("=" * 60)
+    print("MULTI-PROCESS SCALING BENCHMARK")
+    print("=" * 60)
+    
+    cores = os.cpu_count() or 1
+    print(f"CPU cores: {cores}")
+    print("\n{:<10} {:<12} {:<12} {:<12} {:<12}".format(
+        "Workers", "Docs", "Docs/sec", "Speedup", "Efficiency"))
+    print("-" * 60)
+    
+    baseline = None
+    for workers in worker_counts(cores):
+        # Weak scaling: every worker gets the same amount of work
+        corpus = build_corpus(docs_per_worker * workers)
+        with ShardedDetector(workers=workers, torch_threads=1) as sharded:
+            # One warm-up batch per worker so model loading is not timed
+            sharded.detect_batch(corpus[:workers * batch_size], batch_size=batch_size)
+            
+            start = time.perf_counter()
+            sharded.detect_batch(corpus, batch_size=batch_size)
+            rate = len(corpus) / (time.perf_counter() - start)
+        
+        baseline = baseline or rate
+        speedup = rate / baseline
+        print("{:<10} {:<12} {:<12.1f} {:<12} {:<12}".format(
+            workers, len(corpus), rate, f"{speedup:.2f}x", f"{speedup / workers:.0%}"))
+    
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
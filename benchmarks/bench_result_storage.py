@@ -0,0 +1,109 @@
+"""
+Result Storage Benchmark
+Memory per million findings as detect() dicts, PIIResult objects (with and
+without __slots__) and ResultColumns arrays, plus serialized JSON versus
+Parquet size
+"""
+
+import os
+import sys
+import json
+import random
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import PIIResult
+from columnar_results import ResultColumns
+
+TYPES = ['PER', 'LOC', 'ORG', 'Social Security Number', 'Phone Number', 'Email Address']
+LAYERS = ['ML/NLP', 'Rules']
+
+
+@dataclass
+class DictPIIResult:
+    """PIIResult as it was before __slots__, for comparison"""
+    text: str
+    pii_type: str
+    confidence: float
+    start: int
+    end: int
+    detection_layer: str
+
+
+def generate(cls, num_findings: int, findings_per_doc: int = 10, seed: int = 0):
+    """Findings grouped per document, with realistic value lengths and offsets"""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(num_findings // findings_per_doc):
+        results, position = [], 0
+        for _ in range(findings_per_doc):
+            position += rng.randint(5, 200)
+            length = rng.randint(5, 20)
+            results.append(cls(text="x" * length + str(position), pii_type=rng.choice(TYPES),
+                               confidence=rng.random(), start=position, end=position + length,
+                               detection_layer=rng.choice(LAYERS)))
+            position += length
+        documents.append(results)
+    return documents
+
+
+def as_dicts(documents):
+    """The per-finding dicts detect() builds"""
+    return [[{'text': r.text, 'type': r.pii_type, 'confidence': round(r.confidence, 3),
+              'position': [r.start, r.end], 'layer': r.detection_layer} for r in results]
+            for results in documents]
+
+
+def traced_mb(build) -> tuple:
+    """(value, MB allocated by build() and still live)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    used = (tracemalloc.get_traced_memory()[0] - before) / 1e6
+    tracemalloc.stop()
+    return value, used
+
+
+def run_benchmark(num_findings: int = 1_000_000):
+    """Measure each representation of the same findings"""
+    print("=" * 60)
+    print("RESULT STORAGE BENCHMARK")
+    print("=" * 60)
+
+    per_million = 1_000_000 / num_findings
+    unslotted, unslotted_mb = traced_mb(lambda: generate(DictPIIResult, num_findings))
+    slotted, slotted_mb = traced_mb(lambda: generate(PIIResult, num_findings))
+    dicts, dicts_mb = traced_mb(lambda: as_dicts(slotted))
+    columns, columns_mb = traced_mb(lambda: ResultColumns.from_results(slotted))
+    del unslotted
+
+    print("\n{:<36} {:<14}".format("Representation", "MB / 1M findings"))
+    print("-" * 60)
+    print("{:<36} {:<14.1f}".format("detect() dicts (on top of objects)", dicts_mb * per_million))
+    print("{:<36} {:<14.1f}".format("PIIResult, __dict__", unslotted_mb * per_million))
+    print("{:<36} {:<14.1f}".format("PIIResult, __slots__", slotted_mb * per_million))
+    print("{:<36} {:<14.1f}".format("ResultColumns", columns_mb * per_million))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        json_path = os.path.join(workdir, 'findings.jsonl')
+        with open(json_path, 'w') as handle:
+            for findings in dicts:
+                handle.write(json.dumps({'pii_detected': findings}) + "\n")
+        parquet_path = os.path.join(workdir, 'findings.parquet')
+        columns.to_parquet(parquet_path)
+        json_mb = os.path.getsize(json_path) / 1e6 * per_million
+        parquet_mb = os.path.getsize(parquet_path) / 1e6 * per_million
+
+    print("\n{:<36} {:<14}".format("Serialized", "MB / 1M findings"))
+    print("-" * 60)
+    print("{:<36} {:<14.1f}".format("JSON lines (detect() dicts)", json_mb))
+    print("{:<36} {:<14.1f}".format("Parquet (zstd, no values)", parquet_mb))
+    print(f"\n{num_findings:,} findings; ResultColumns stores offsets, not matched values")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
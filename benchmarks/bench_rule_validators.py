@@ -0,0 +1,129 @@
+"""
+Rule Validator Benchmark
+Layer 2 candidates and merge + Layer 3 time on a numeric-heavy log
+corpus, with and without the Luhn/SSN/calendar/NANP validators
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+from rule_validators import luhn_valid
+
+# Lines full of number-shaped values that are not PII
+NOISE_LINES = [
+    "{date} txn={card} status=settled latency={ms}ms",
+    "{date} order {card} shipped from warehouse {ms}",
+    "{date} batch {bad_date} rolled back, retry {ms}",
+    "{date} upstream 0{digits} returned 503 after {ms}ms",
+    "{date} ref {bad_ssn} reconciled against ledger {ms}",
+    "{date} session {bad_phone} expired, {ms} keys evicted",
+]
+# Lines with values that pass their validators
+PII_LINES = [
+    "{date} card on file {good_card} charged for customer {ms}",
+    "{date} callback number 617-555-{phone} confirmed",
+    "{date} ssn 123-45-{serial} verified for account {ms}",
+]
+
+
+def build_logs(num_docs: int, lines_per_doc: int = 40, pii_rate: float = 0.1, seed: int = 0):
+    """Log documents where most rule matches are IDs, timestamps and codes"""
+    rng = random.Random(seed)
+
+    def good_card() -> str:
+        while True:
+            digits = "4" + "".join(str(rng.randint(0, 9)) for _ in range(15))
+            if luhn_valid(digits):
+                return " ".join(digits[i:i + 4] for i in range(0, 16, 4))
+
+    documents = []
+    for _ in range(num_docs):
+        lines = []
+        for _ in range(lines_per_doc):
+            template = rng.choice(PII_LINES if rng.random() < pii_rate else NOISE_LINES)
+            lines.append(template.format(
+                date=f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024",
+                card="-".join(f"{rng.randint(0, 9999):04d}" for _ in range(4)),
+                good_card=good_card() if '{good_card}' in template else '',
+                bad_date=f"{rng.randint(13, 99)}/{rng.randint(32, 99)}/{rng.randint(1000, 9999)}",
+                digits=f"{rng.randint(0, 999_999_999):09d}",
+                bad_ssn=f"{rng.randint(900, 999)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}",
+                bad_phone=f"{rng.randint(100, 199)}-{rng.randint(100, 999)}-{rng.randint(0, 9999):04d}",
+                phone=f"{rng.randint(0, 9999):04d}", serial=f"{rng.randint(1, 9999):04d}",
+                ms=rng.randint(1, 999)))
+        documents.append("\n".join(lines))
+    return documents
+
+
+def measure(detector: MultiLayerPIIDetector, documents: list, batch_size: int) -> dict:
+    """Seconds in Layer 2 and in merging plus Layer 3, candidate and final counts"""
+    layer2 = downstream = 0.0
+    candidates = kept = 0
+    for i in range(0, len(documents), batch_size):
+        batch = documents[i:i + batch_size]
+        started = time.perf_counter()
+        found = [detector.detect_rules_layer(text) for text in batch]
+        layer2 += time.perf_counter() - started
+        started = time.perf_counter()
+        merged = [detector.merge_results([], rule_results, text) for text, rule_results in zip(batch, found)]
+        validated = detector.validate_statistical_layer_batch(batch, merged)
+        downstream += time.perf_counter() - started
+        candidates += sum(map(len, found))
+        kept += sum(map(len, validated))
+    return {'layer2': layer2, 'downstream': downstream, 'candidates': candidates, 'kept': kept}
+
+
+def run_benchmark(num_docs: int = 2000, batch_size: int = 32):
+    """Run Layers 2 and 3 over the same logs with validators off and on"""
+    print("=" * 60)
+    print("RULE VALIDATOR BENCHMARK")
+    print("=" * 60)
+
+    # Layers 2 and 3 never touch the model, so it is not loaded
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        plain = MultiLayerPIIDetector()
+        validating = MultiLayerPIIDetector(validate_rules=True)
+
+    documents = build_logs(num_docs)
+    reports = {'no validators': measure(plain, documents, batch_size),
+               'validate_rules=True': measure(validating, documents, batch_size)}
+
+    print(f"\n{num_docs} log documents, {sum(map(len, documents)) / 1e6:.1f} MB")
+    print("\n{:<22} {:<12} {:<12} {:<12} {:<8}".format(
+        "Mode", "Layer 2 (s)", "Merge + L3", "Candidates", "Kept"))
+    print("-" * 60)
+    for mode, report in reports.items():
+        print("{:<22} {:<12.3f} {:<12.3f} {:<12} {:<8}".format(
+            mode, report['layer2'], report['downstream'], report['candidates'], report['kept']))
+
+    summary = validating.validator_summary()
+    print("\n{:<14} {:<10} {:<10} {:<12}".format("Pattern", "Checked", "Rejected", "Per doc"))
+    print("-" * 60)
+    for pii_type, counts in summary.items():
+        if pii_type == 'documents':
+            continue
+        print("{:<14} {:<10} {:<10} {:<12.2f}".format(
+            pii_type, counts['checked'], counts['rejected'], counts['rejected_per_document']))
+
+    before, after = reports['no validators'], reports['validate_rules=True']
+    saved = before['downstream'] - after['downstream']
+    validator_cost = after['layer2'] - before['layer2']
+    print(f"\nMerge + Layer 3 time saved: {saved:.3f}s ({saved / before['downstream']:.0%}), "
+          f"validators cost {validator_cost:.3f}s in Layer 2")
+    print(f"Rule candidates removed: {1 - after['candidates'] / before['candidates']:.0%}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--num-docs', type=int, default=2000, help="Log documents to generate")
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    run_benchmark(args.num_docs, args.batch_size)
@@ -0,0 +1,127 @@
+"""
+Service Load Benchmark
+p50/p99 latency and throughput of the HTTP service with and without
+micro-batching, plus the rules-only path, at increasing client counts
+
+Starts the service on a local port and drives it with httpx from a separate
+process, so the load generator does not compete with the server for the GIL.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import numpy as np
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+from pii_service import create_app
+from bench_detect_batch import SAMPLE_TEXTS
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app):
+    """Run the app with uvicorn on a background thread, yielding its base URL"""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+async def generate_load(url: str, clients: int, requests_per_client: int,
+                        rules_only: bool = False):
+    """Closed-loop load: each client sends its next request as soon as the last returns"""
+    latencies = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        async def run_client(client_id: int):
+            for i in range(requests_per_client):
+                text = SAMPLE_TEXTS[(client_id + i) % len(SAMPLE_TEXTS)]
+                start = time.perf_counter()
+                response = await client.post("/detect", json={'text': text, 'rules_only': rules_only})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        before = (await client.get("/stats")).json()
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client(c) for c in range(clients)))
+        elapsed = time.perf_counter() - start
+        after = (await client.get("/stats")).json()
+
+    batches = after['batches'] - before['batches']
+    batched = after['requests'] - before['requests']
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1000,
+        'throughput': len(latencies) / elapsed,
+        'average_batch': batched / batches if batches else 0.0,
+    }
+
+
+def load_in_process(url: str, clients: int, requests_per_client: int,
+                    rules_only: bool = False):
+    """Entry point for the load-generator process"""
+    return asyncio.run(generate_load(url, clients, requests_per_client, rules_only))
+
+
+def run_benchmark(client_counts=(1, 50, 500), total_requests: int = 1000,
+                  max_batch_size: int = 32, max_wait_ms: float = 5.0):
+    """Report latency percentiles and throughput for each mode and client count"""
+    print("=" * 60)
+    print("SERVICE LOAD BENCHMARK")
+    print("=" * 60)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        detector = MultiLayerPIIDetector()
+
+    modes = [
+        ("micro-batched", dict(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms), False),
+        ("unbatched", dict(max_batch_size=1, max_wait_ms=0), False),
+        ("rules-only", dict(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms), True),
+    ]
+
+    print("\n{:<9} {:<14} {:<10} {:<10} {:<10} {:<10}".format(
+        "Clients", "Mode", "p50 (ms)", "p99 (ms)", "req/sec", "Avg batch"))
+    print("-" * 60)
+    generator = ProcessPoolExecutor(max_workers=1)
+    for clients in client_counts:
+        requests_per_client = max(1, total_requests // clients)
+        for name, settings, rules_only in modes:
+            with serve(create_app(detector, **settings)) as url:
+                # One untimed request so connection setup and warmup are excluded
+                generator.submit(load_in_process, url, 1, 1, rules_only).result()
+                report = generator.submit(load_in_process, url, clients,
+                                          requests_per_client, rules_only).result()
+            print("{:<9} {:<14} {:<10.1f} {:<10.1f} {:<10.1f} {:<10.1f}".format(
+                clients, name, report['p50_ms'], report['p99_ms'],
+                report['throughput'], report['average_batch']))
+        print()
+    generator.shutdown()
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
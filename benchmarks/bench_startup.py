@@ -0,0 +1,86 @@
+"""
+Startup Benchmark
+Import time, construction time and first-request latency, each measured in a
+fresh interpreter so nothing is already imported or loaded
+
+Importing multi_layer_detector must not pull in transformers or torch; the
+benchmark fails if it does, so a stray top-level import cannot slip back in.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXT = "Contact Dr. Jane Doe at jane.doe@hospital.com or 617-555-0100."
+
+# Runs in the child interpreter; prints one JSON object of timings in ms
+PROBE = """
+import sys, time, json, contextlib, os
+started = time.perf_counter()
+import multi_layer_detector
+timings = {'import': time.perf_counter() - started,
+           'heavy_modules': sorted({'transformers', 'torch'} & set(sys.modules))}
+
+with contextlib.redirect_stdout(open(os.devnull, 'w')):
+    started = time.perf_counter()
+    detector = multi_layer_detector.MultiLayerPIIDetector(model_name=MODEL, local_files_only=LOCAL)
+    timings['construct'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    detector.detect_rules_only(TEXT)
+    timings['first_rules_only'] = time.perf_counter() - started
+
+    if WARMUP:
+        started = time.perf_counter()
+        detector.warmup()
+        timings['warmup'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    detector.detect(TEXT)
+    timings['first_detect'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    detector.detect(TEXT)
+    timings['second_detect'] = time.perf_counter() - started
+
+print(json.dumps({k: v * 1000 if isinstance(v, float) else v for k, v in timings.items()}))
+"""
+
+
+def probe(model_name: str, local_files_only: bool, warmup: bool) -> dict:
+    """Run PROBE in a new interpreter and return its timings"""
+    code = (f"MODEL = {model_name!r}\nLOCAL = {local_files_only!r}\n"
+            f"WARMUP = {warmup!r}\nTEXT = {TEXT!r}\n" + PROBE)
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(model_name: str = "dslim/bert-base-NER", local_files_only: bool = False):
+    """Compare a cold first request with one served after warmup()"""
+    print("=" * 60)
+    print("STARTUP BENCHMARK")
+    print("=" * 60)
+
+    cold = probe(model_name, local_files_only, warmup=False)
+    warm = probe(model_name, local_files_only, warmup=True)
+
+    assert not cold['heavy_modules'], f"importing the detector loaded {cold['heavy_modules']}"
+
+    print("\n{:<28} {:<14} {:<14}".format("Stage (ms)", "Cold", "Warmed up"))
+    print("-" * 60)
+    for stage in ('import', 'construct', 'first_rules_only', 'warmup', 'first_detect', 'second_detect'):
+        print("{:<28} {:<14} {:<14}".format(
+            stage,
+            f"{cold[stage]:.1f}" if stage in cold else "-",
+            f"{warm[stage]:.1f}" if stage in warm else "-"))
+
+    print("\ntransformers/torch imported by 'import multi_layer_detector': no")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,264 @@
+"""
+Benchmark Suite
+Reproducible latency, throughput and memory figures for every layer
+configuration, saved as JSON and comparable against a stored baseline
+
+Configurations (run in this order, so the model is only loaded once the
+rules-only figures have been taken):
+    rules        Layer 2 alone
+    rules+stats  Layers 2 and 3, as served by detect_rules_only()
+    ml           Layer 1 alone
+    full         All three layers, one document at a time
+    full-batch   All three layers through detect_batch()
+
+Per-document configurations report p50/p95/p99 latency for each stage and
+end to end. Peak RSS is the process peak once the configuration has run.
+
+Usage:
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --baseline results.json --max-regression 0.10
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import MultiLayerPIIDetector
+from corpus_scanner import detect_format, read_records
+from inference_backends import BACKENDS
+from bench_chunking import FILLER, NAMES, peak_rss_mb
+
+CONFIGURATIONS = ('rules', 'rules+stats', 'ml', 'full', 'full-batch')
+
+PII_TEMPLATES = [
+    "Patient {name}, SSN {ssn}, was admitted on {date}.",
+    "Contact {name} at {email} or {phone}.",
+    "Card {card} was charged for the {name} account.",
+    "{name} lives at {number} Main St and can be reached on {phone}.",
+]
+
+
+def build_corpus(num_docs: int, seed: int = 0) -> List[str]:
+    """Deterministic mix of clinical/contract prose with PII at varied densities"""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(num_docs):
+        sentences = []
+        for _ in range(rng.randint(1, 12)):
+            if rng.random() < 0.4:
+                sentences.append(rng.choice(PII_TEMPLATES).format(
+                    name=rng.choice(NAMES),
+                    ssn=f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}",
+                    date=f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(1950, 2024)}",
+                    email=f"user{rng.randint(1, 9999)}@example.com",
+                    phone=f"{rng.randint(200, 999)}-555-{rng.randint(0, 9999):04d}",
+                    card="-".join(f"{rng.randint(0, 9999):04d}" for _ in range(4)),
+                    number=rng.randint(1, 9999)))
+            else:
+                sentences.append(rng.choice(FILLER))
+        documents.append(" ".join(sentences))
+    return documents
+
+
+def load_corpus(path: str, text_field: str = 'text') -> List[str]:
+    """Documents from a JSONL, CSV or plain-text file"""
+    return [record.text for record in read_records(path, detect_format(path), text_field)]
+
+
+def percentiles(seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds"""
+    values = np.array(seconds) * 1000
+    return {f"p{q}_ms": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+
+
+def time_stages(detector: MultiLayerPIIDetector, corpus: List[str],
+                stages: List[str]) -> Dict:
+    """Run the given stages on each document, timing each one and the total"""
+    timings: Dict[str, List[float]] = {stage: [] for stage in stages}
+    totals = []
+    started = time.perf_counter()
+    for text in corpus:
+        ml_results, rule_results, candidates = [], [], []
+        document_start = time.perf_counter()
+        for stage in stages:
+            stage_start = time.perf_counter()
+            if stage == 'layer1':
+                ml_results = detector.detect_ml_layer(text)
+            elif stage == 'layer2':
+                rule_results = detector.detect_rules_layer(text)
+            elif stage == 'merge':
+                candidates = detector.merge_results(ml_results, rule_results, text)
+            elif stage == 'layer3':
+                detector.validate_statistical_layer(text, candidates)
+            timings[stage].append(time.perf_counter() - stage_start)
+        totals.append(time.perf_counter() - document_start)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'docs_per_sec': round(len(corpus) / elapsed, 2),
+        'end_to_end': percentiles(totals),
+        'stages': {stage: percentiles(values) for stage, values in timings.items()},
+    }
+
+
+def time_batched(detector: MultiLayerPIIDetector, corpus: List[str], batch_size: int) -> Dict:
+    """Throughput of detect_batch() over the corpus"""
+    started = time.perf_counter()
+    for i in range(0, len(corpus), batch_size):
+        detector.detect_batch(corpus[i:i + batch_size], batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    return {'docs_per_sec': round(len(corpus) / elapsed, 2), 'batch_size': batch_size}
+
+
+STAGES = {
+    'rules': ['layer2'],
+    'rules+stats': ['layer2', 'merge', 'layer3'],
+    'ml': ['layer1'],
+    'full': ['layer1', 'layer2', 'merge', 'layer3'],
+}
+
+
+def run_suite(corpus: List[str], configurations=CONFIGURATIONS, model_name: str = "dslim/bert-base-NER",
+              backend: str = 'pytorch', batch_size: int = 16, warmup_docs: int = 8) -> Dict:
+    """Run each configuration and collect its metrics"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        detector = MultiLayerPIIDetector(model_name=model_name, backend=backend)
+
+    results = {}
+    for name in CONFIGURATIONS:
+        if name not in configurations:
+            continue
+        if name in ('ml', 'full', 'full-batch'):
+            # Model loading is a startup cost, not part of steady-state figures
+            detector.warmup()
+        if name == 'full-batch':
+            time_batched(detector, corpus[:warmup_docs], batch_size)
+            metrics = time_batched(detector, corpus, batch_size)
+        else:
+            time_stages(detector, corpus[:warmup_docs], STAGES[name])
+            metrics = time_stages(detector, corpus, STAGES[name])
+        metrics['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        results[name] = metrics
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository, if available"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Configurations whose throughput fell by more than max_regression (a fraction)"""
+    failures = []
+    print("\n{:<13} {:<14} {:<14} {:<10}".format("Config", "Baseline/s", "Current/s", "Change"))
+    print("-" * 60)
+    for name, metrics in results['configurations'].items():
+        previous = baseline.get('configurations', {}).get(name)
+        if not previous:
+            continue
+        change = metrics['docs_per_sec'] / previous['docs_per_sec'] - 1
+        flag = ""
+        if change < -max_regression:
+            failures.append(name)
+            flag = "  REGRESSION"
+        print("{:<13} {:<14.1f} {:<14.1f} {:<10}".format(
+            name, previous['docs_per_sec'], metrics['docs_per_sec'], f"{change:+.1%}{flag}"))
+    return failures
+
+
+def print_report(results: Dict):
+    """Human-readable summary of a run"""
+    print("\n{:<13} {:<10} {:<10} {:<10} {:<10} {:<9}".format(
+        "Config", "docs/sec", "p50 (ms)", "p95 (ms)", "p99 (ms)", "RSS (MB)"))
+    print("-" * 60)
+    for name, metrics in results['configurations'].items():
+        latency = metrics.get('end_to_end', {})
+        print("{:<13} {:<10.1f} {:<10} {:<10} {:<10} {:<9.0f}".format(
+            name, metrics['docs_per_sec'], latency.get('p50_ms', '-'),
+            latency.get('p95_ms', '-'), latency.get('p99_ms', '-'), metrics['peak_rss_mb']))
+
+    print("\nPer-stage p50/p99 (ms):")
+    for name, metrics in results['configurations'].items():
+        stages = ", ".join(f"{stage} {values['p50_ms']}/{values['p99_ms']}"
+                           for stage, values in metrics.get('stages', {}).items())
+        if stages:
+            print(f"  {name:<12} {stages}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description="Run the detector benchmark suite")
+    parser.add_argument('--corpus', help="JSONL, CSV or text file to use instead of the generated corpus")
+    parser.add_argument('--text-field', default='text', help="JSON key or CSV column holding the text")
+    parser.add_argument('--num-docs', type=int, default=500, help="Size of the generated corpus")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the generated corpus")
+    parser.add_argument('--configs', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    parser.add_argument('--model', default="dslim/bert-base-NER", help="Layer 1 model name or path")
+    parser.add_argument('--backend', choices=BACKENDS, default='pytorch', help="Layer 1 runtime")
+    parser.add_argument('--batch-size', type=int, default=16, help="Batch size for full-batch")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Results JSON from an earlier run to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.10,
+                        help="Fail if docs/sec drops by more than this fraction versus the baseline")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite, save the results and check for regressions"""
+    args = build_parser().parse_args(argv)
+
+    print("=" * 60)
+    print("BENCHMARK SUITE")
+    print("=" * 60)
+
+    corpus = load_corpus(args.corpus, args.text_field) if args.corpus else build_corpus(args.num_docs, args.seed)
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus': {'source': args.corpus or 'generated', 'seed': None if args.corpus else args.seed,
+                   'documents': len(corpus), 'characters': sum(map(len, corpus))},
+        'model': args.model,
+        'backend': args.backend,
+        'configurations': run_suite(corpus, args.configs, args.model, args.backend, args.batch_size),
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print(f"\nThroughput regressed by more than {args.max_regression:.0%}: {', '.join(failures)}")
+            status = 1
+
+    print("=" * 60)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Synthetic Corpus Benchmark
+Generation throughput of synthetic_corpus for each output format, and
+Layer 2 exact-span precision/recall per type against its gold labels
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_layer_detector import DEFAULT_PATTERNS, MultiLayerPIIDetector
+from synthetic_corpus import CorpusConfig, generate_shard, write_corpus
+
+
+def rules_agreement(detector: MultiLayerPIIDetector, shard) -> dict:
+    """Per rule type: (gold spans, found spans, exact matches)"""
+    rule_types = {config['name'] for config in DEFAULT_PATTERNS.values()}
+    counts = {pii_type: Counter() for pii_type in rule_types}
+    for text, labels in zip(shard.texts, shard.document_labels()):
+        gold = {(label['type'], *label['position']) for label in labels if label['type'] in rule_types}
+        found = {(result.pii_type, result.start, result.end) for result in detector.detect_rules_layer(text)}
+        for pii_type, _, _ in gold:
+            counts[pii_type]['gold'] += 1
+        for pii_type, _, _ in found:
+            counts[pii_type]['found'] += 1
+        for pii_type, _, _ in gold & found:
+            counts[pii_type]['matched'] += 1
+    return counts
+
+
+def run_benchmark(num_docs: int = 200_000, shard_docs: int = 50_000, workers: int = 1):
+    """Time generation into memory, JSONL and Parquet, then score Layer 2 on one shard"""
+    print("=" * 60)
+    print("SYNTHETIC CORPUS BENCHMARK")
+    print("=" * 60)
+
+    print("\n{:<24} {:<12} {:<14} {:<10}".format("Output", "Seconds", "Docs/min", "MB"))
+    print("-" * 60)
+    started = time.perf_counter()
+    shard = generate_shard(shard_docs, seed=0)
+    elapsed = time.perf_counter() - started
+    print("{:<24} {:<12.2f} {:<14,.0f} {:<10.0f}".format(
+        "in memory (one shard)", elapsed, shard_docs / elapsed * 60, sum(map(len, shard.texts)) / 1e6))
+
+    for fmt in ('jsonl', 'parquet'):
+        with tempfile.TemporaryDirectory() as workdir:
+            started = time.perf_counter()
+            paths = write_corpus(workdir, num_docs, shard_docs, fmt, seed=0, workers=workers)
+            elapsed = time.perf_counter() - started
+            size_mb = sum(os.path.getsize(path) for path in paths) / 1e6
+        print("{:<24} {:<12.2f} {:<14,.0f} {:<10.0f}".format(
+            f"{fmt}, {len(paths)} shards", elapsed, num_docs / elapsed * 60, size_mb))
+
+    long_tail = generate_shard(1_000, CorpusConfig(length='pareto', mean_sentences=30), seed=0)
+    lengths = sorted(map(len, long_tail.texts))
+    print(f"\nPareto lengths (chars): median {lengths[len(lengths) // 2]:,}, "
+          f"p99 {lengths[int(len(lengths) * 0.99)]:,}, max {lengths[-1]:,}")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        detector = MultiLayerPIIDetector()
+    counts = rules_agreement(detector, generate_shard(5_000, seed=1))
+    print("\n{:<24} {:<8} {:<8} {:<10} {:<8}".format("Layer 2 type", "Gold", "Found", "Precision", "Recall"))
+    print("-" * 60)
+    for pii_type, count in sorted(counts.items()):
+        print("{:<24} {:<8} {:<8} {:<10.3f} {:<8.3f}".format(
+            pii_type, count['gold'], count['found'],
+            count['matched'] / max(count['found'], 1), count['matched'] / max(count['gold'], 1)))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--num-docs', type=int, default=200_000, help="Documents written per format")
+    parser.add_argument('--shard-docs', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating shards")
+    args = parser.parse_args()
+    run_benchmark(args.num_docs, args.shard_docs, args.workers)
@@ -0,0 +1,149 @@
+"""
+Column Profiler
+Classify whole DataFrame columns from a sample of cells before a full scan
+
+Each column is profiled from up to sample_size non-missing cells: Layer 2
+runs on every sampled cell and Layer 1 on the sample as one batch (skipped
+for numeric, boolean and datetime columns, whose cells cannot hold names,
+places or organisations). Sample hits are combined with hints from the
+column name, matched against the Layer 3 context keywords, to label the
+column and decide which layers a full scan of it needs:
+
+    clean        no hits, no hint, short values   -> not scanned
+    structured   rule hits or a rule-type hint,    -> Layer 2 (and 3) only
+                 short values, e.g. an ssn column
+    text         entity hits, entity hints or      -> all three layers
+                 free text
+
+scan_dataframe(profiles=...) then runs only those layers per column.
+
+Usage:
+    profiles = detector.profile_dataframe(df, sample_size=200)
+    print(profile_report(profiles))
+    findings = detector.scan_dataframe(df, profiles=profiles)
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from multi_layer_detector import CONTEXT_INDICATORS, DEFAULT_PATTERNS
+
+# Column-name keywords: the Layer 3 context indicators, mapped to the rule
+# type they suggest (None: PII-like but no specific type), plus entity words
+# that suggest a Layer 1 type
+NAME_HINTS: Dict[str, Optional[str]] = {indicator: None for indicator in CONTEXT_INDICATORS}
+NAME_HINTS.update({
+    'ssn': 'ssn', 'social': 'ssn',
+    'credit': 'credit_card', 'card': 'credit_card',
+    'phone': 'phone', 'email': 'email', 'address': 'address',
+    'dob': 'dob', 'birth': 'dob',
+})
+ENTITY_HINTS = {
+    'name': 'PER', 'firstname': 'PER', 'lastname': 'PER', 'surname': 'PER', 'contact': 'PER',
+    'city': 'LOC', 'country': 'LOC', 'state': 'LOC', 'location': 'LOC',
+    'company': 'ORG', 'employer': 'ORG', 'organization': 'ORG', 'organisation': 'ORG',
+}
+
+LAYER_RULES = 'rules'
+LAYER_ML = 'ml'
+
+# Median whitespace-separated words per cell from which a column counts as free text
+FREE_TEXT_WORDS = 4
+
+_NAME_TOKEN = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Sample-based classification of one column.
+
+    label is the dominant PII type (a Layer 1 entity group or a rule
+    pattern's name), or None for a clean column. layers lists the layers a
+    full scan of the column needs ('rules', 'ml'); an empty tuple means it is
+    not scanned.
+    """
+    column: str
+    label: Optional[str]
+    confidence: float
+    layers: Tuple[str, ...]
+    sampled: int
+    hit_rate: float
+    name_hints: List[str] = field(default_factory=list)
+
+
+def column_name_hints(name) -> List[str]:
+    """Hint keywords found among the words of a column name (snake, kebab or camel case)"""
+    words = [word.lower() for word in _NAME_TOKEN.findall(str(name))]
+    joined = ''.join(words)
+    return [word for word in dict.fromkeys(words + [joined]) if word in NAME_HINTS or word in ENTITY_HINTS]
+
+
+def _is_non_text(series: pd.Series) -> bool:
+    """Columns whose values cannot spell out names, places or organisations"""
+    return (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+            or pd.api.types.is_datetime64_any_dtype(series))
+
+
+def profile_column(detector, series: pd.Series, sample_size: int = 100,
+                   seed: int = 0, batch_size: int = 16) -> ColumnProfile:
+    """Profile one column from a seeded sample of its non-missing cells"""
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.sample(sample_size, random_state=seed)
+    sample = [str(value) for value in values]
+    hints = column_name_hints(series.name)
+    rule_hints = {DEFAULT_PATTERNS[NAME_HINTS[h]]['name'] for h in hints if NAME_HINTS.get(h)}
+    entity_hints = {ENTITY_HINTS[h] for h in hints if h in ENTITY_HINTS}
+    non_text = _is_non_text(series)
+
+    rule_cells, entity_cells = Counter(), Counter()
+    for value in sample:
+        rule_cells.update({r.pii_type for r in detector.detect_rules_layer(value)})
+    if sample and not non_text:
+        for ml_results in detector.detect_ml_layer_batch(sample, batch_size=batch_size):
+            entity_cells.update({r.pii_type for r in ml_results})
+
+    n = len(sample)
+    hits = rule_cells + entity_cells
+    free_text = not non_text and n > 0 and np.median([len(v.split()) for v in sample]) >= FREE_TEXT_WORDS
+    uses_ml = not non_text and bool(entity_cells or entity_hints or free_text)
+    uses_rules = bool(rule_cells or rule_hints or free_text or uses_ml)
+
+    hinted = rule_hints | entity_hints
+    if hits:
+        label, count = hits.most_common(1)[0]
+        hit_rate = count / n
+        # A column name that agrees with the sample halves the remaining doubt
+        confidence = 1 - (1 - hit_rate) / 2 if label in hinted else hit_rate
+    elif hinted:
+        label, hit_rate = sorted(hinted)[0], 0.0
+        confidence = 0.0
+    else:
+        # Nothing in n cells: by the rule of three the PII rate is below 3/n at 95%
+        label, hit_rate = None, 0.0
+        confidence = max(0.0, 1 - 3 / n) if n else 0.0
+
+    layers = tuple(layer for layer, used in ((LAYER_RULES, uses_rules), (LAYER_ML, uses_ml)) if used)
+
+    return ColumnProfile(column=series.name, label=label, confidence=round(float(confidence), 3),
+                         layers=layers, sampled=n, hit_rate=round(hit_rate, 3), name_hints=hints)
+
+
+def profile_dataframe(detector, df: pd.DataFrame, columns: Optional[Sequence] = None,
+                      sample_size: int = 100, seed: int = 0,
+                      batch_size: int = 16) -> Dict[str, ColumnProfile]:
+    """Profiles of the given columns (default: all), keyed by column"""
+    columns = list(df.columns if columns is None else columns)
+    return {column: profile_column(detector, df[column], sample_size, seed, batch_size)
+            for column in columns}
+
+
+def profile_report(profiles: Dict[str, ColumnProfile]) -> pd.DataFrame:
+    """One row per profiled column"""
+    return pd.DataFrame([asdict(profile) for profile in profiles.values()]).set_index('column')
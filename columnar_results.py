@@ -0,0 +1,163 @@
+"""
+Columnar Results
+Struct-of-arrays storage for batch findings, with Arrow and Parquet export
+
+ResultColumns keeps one NumPy array per field (doc_id, start, end, type
+code, confidence, layer code) instead of one object or dict per finding.
+PII types and layers are small vocabularies stored once and referenced by
+code, and become dictionary-encoded columns on export. The matched value
+is not stored: it is text[start:end] of the source document.
+
+pyarrow is only needed for to_arrow() and to_parquet().
+
+Usage:
+    columns = detector.detect_batch_columns(texts, doc_ids=ids)
+    columns.to_parquet("findings.parquet")
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+FIELDS = ('doc_id', 'start', 'end', 'type_code', 'confidence', 'layer_code')
+DTYPES = {
+    'doc_id': np.int64,
+    'start': np.int64,
+    'end': np.int64,
+    'type_code': np.int16,
+    'confidence': np.float32,
+    'layer_code': np.int8,
+}
+
+
+class ResultColumns:
+    """Findings of a batch of documents as parallel NumPy arrays"""
+
+    __slots__ = FIELDS + ('types', 'layers')
+
+    def __init__(self, doc_id, start, end, type_code, confidence, layer_code,
+                 types: Sequence[str] = (), layers: Sequence[str] = ()):
+        self.doc_id = np.asarray(doc_id, dtype=DTYPES['doc_id'])
+        self.start = np.asarray(start, dtype=DTYPES['start'])
+        self.end = np.asarray(end, dtype=DTYPES['end'])
+        self.type_code = np.asarray(type_code, dtype=DTYPES['type_code'])
+        self.confidence = np.asarray(confidence, dtype=DTYPES['confidence'])
+        self.layer_code = np.asarray(layer_code, dtype=DTYPES['layer_code'])
+        self.types = list(types)
+        self.layers = list(layers)
+
+    @classmethod
+    def from_results(cls, results_per_doc: Iterable[List], doc_ids: Optional[Sequence[int]] = None,
+                     types: Sequence[str] = (), layers: Sequence[str] = ()) -> 'ResultColumns':
+        """
+        Build from one list of PIIResult per document. doc_ids defaults to
+        the position of each document; types and layers seed the vocabularies
+        so codes stay stable across batches.
+        """
+        type_codes: Dict[str, int] = {name: i for i, name in enumerate(types)}
+        layer_codes: Dict[str, int] = {name: i for i, name in enumerate(layers)}
+        columns = {field: [] for field in FIELDS}
+        for position, results in enumerate(results_per_doc):
+            doc_id = position if doc_ids is None else doc_ids[position]
+            for result in results:
+                columns['doc_id'].append(doc_id)
+                columns['start'].append(result.start)
+                columns['end'].append(result.end)
+                columns['type_code'].append(type_codes.setdefault(result.pii_type, len(type_codes)))
+                columns['confidence'].append(result.confidence)
+                columns['layer_code'].append(layer_codes.setdefault(result.detection_layer, len(layer_codes)))
+        return cls(**columns, types=list(type_codes), layers=list(layer_codes))
+
+    @classmethod
+    def concat(cls, parts: Sequence['ResultColumns']) -> 'ResultColumns':
+        """Join several batches, re-coding types and layers into one vocabulary"""
+        types: Dict[str, int] = {}
+        layers: Dict[str, int] = {}
+        type_code, layer_code = [], []
+        for part in parts:
+            type_map = np.array([types.setdefault(name, len(types)) for name in part.types] or [0],
+                                dtype=DTYPES['type_code'])
+            layer_map = np.array([layers.setdefault(name, len(layers)) for name in part.layers] or [0],
+                                 dtype=DTYPES['layer_code'])
+            type_code.append(type_map[part.type_code])
+            layer_code.append(layer_map[part.layer_code])
+        if not parts:
+            return cls([], [], [], [], [], [])
+        return cls(np.concatenate([part.doc_id for part in parts]),
+                   np.concatenate([part.start for part in parts]),
+                   np.concatenate([part.end for part in parts]),
+                   np.concatenate(type_code),
+                   np.concatenate([part.confidence for part in parts]),
+                   np.concatenate(layer_code),
+                   types=list(types), layers=list(layers))
+
+    def __len__(self) -> int:
+        return len(self.doc_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays"""
+        return sum(getattr(self, field).nbytes for field in FIELDS)
+
+    def pii_type(self) -> np.ndarray:
+        """Type name of each finding"""
+        return np.array(self.types, dtype=object)[self.type_code] if len(self) else np.array([], dtype=object)
+
+    def iter_findings(self, texts: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """
+        Findings as detect()-style dicts, one at a time. With the source
+        texts (indexed by doc_id) each dict also carries the matched value.
+        """
+        for i in range(len(self)):
+            doc_id, start, end = int(self.doc_id[i]), int(self.start[i]), int(self.end[i])
+            finding = {
+                'doc_id': doc_id,
+                'type': self.types[self.type_code[i]],
+                'confidence': round(float(self.confidence[i]), 3),
+                'position': [start, end],
+                'layer': self.layers[self.layer_code[i]],
+            }
+            if texts is not None:
+                finding['text'] = texts[doc_id][start:end]
+            yield finding
+
+    def to_arrow(self):
+        """pyarrow.Table with dictionary-encoded type and layer columns"""
+        import pyarrow as pa
+
+        return pa.table({
+            'doc_id': pa.array(self.doc_id),
+            'start': pa.array(self.start),
+            'end': pa.array(self.end),
+            'type': pa.DictionaryArray.from_arrays(pa.array(self.type_code), pa.array(self.types, pa.string())),
+            'confidence': pa.array(self.confidence),
+            'layer': pa.DictionaryArray.from_arrays(pa.array(self.layer_code), pa.array(self.layers, pa.string())),
+        })
+
+    def to_parquet(self, path: str, compression: str = 'zstd'):
+        """Write the findings as a Parquet file"""
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path, compression=compression)
+
+    @classmethod
+    def from_arrow(cls, table) -> 'ResultColumns':
+        """Inverse of to_arrow()"""
+        columns = {}
+        vocabularies = {}
+        for name, field in (('type', 'type_code'), ('layer', 'layer_code')):
+            encoded = table.column(name).combine_chunks()
+            if not hasattr(encoded, 'indices'):
+                encoded = encoded.dictionary_encode()
+            columns[field] = encoded.indices.to_numpy(zero_copy_only=False)
+            vocabularies[name + 's'] = encoded.dictionary.to_pylist()
+        for field in ('doc_id', 'start', 'end', 'confidence'):
+            columns[field] = table.column(field).to_numpy()
+        return cls(**columns, **vocabularies)
+
+    @classmethod
+    def read_parquet(cls, path: str) -> 'ResultColumns':
+        """Load a file written by to_parquet()"""
+        import pyarrow.parquet as pq
+
+        return cls.from_arrow(pq.read_table(path))
@@ -0,0 +1,364 @@
+"""
+Streaming Corpus Scanner
+Scans JSONL, CSV or plain-text files for PII with bounded memory
+
+The scan is a pull-based generator pipeline:
+
+    read_records -> batch_records -> detect_batches -> findings_to_rows
+
+Each stage only asks the previous one for more input once it has finished
+with the current batch, so the reader can never run ahead of the detector
+(backpressure) and at most one batch of documents is held in memory.
+
+Usage:
+    python corpus_scanner.py scan notes.jsonl --output findings.jsonl
+    python corpus_scanner.py scan export.csv --text-field comment --output findings.jsonl
+    python corpus_scanner.py scan export.txt --format csv --delimiter ';' --output findings.jsonl
+    python corpus_scanner.py scan notes.jsonl --output findings.jsonl --workers 8
+    python corpus_scanner.py scan notes.jsonl --output findings.jsonl --checkpoint scan.ckpt --resume
+    python corpus_scanner.py scan notes.jsonl --id-field id --output findings.jsonl --fingerprints scan.db
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import contextlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from parallel_scan import ShardedDetector
+from result_cache import ResultCache
+from inference_backends import BACKENDS
+from incremental_scan import FingerprintStore, IncrementalScanner
+
+FORMATS = ('jsonl', 'csv', 'text')
+
+
+@dataclass
+class Record:
+    """One document read from the input file"""
+    doc_id: str
+    text: str
+    end_offset: int  # Byte offset just past this record, used for resuming
+
+
+def detect_format(path: str) -> str:
+    """Guess the input format from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension in ('.csv', '.tsv'):
+        return 'csv'
+    return 'text'
+
+
+def detect_delimiter(path: str) -> str:
+    """CSV field delimiter implied by the file extension"""
+    return '\t' if os.path.splitext(path)[1].lower() == '.tsv' else ','
+
+
+def _iter_lines(handle, offset: int) -> Iterator[tuple]:
+    """Yield (start_offset, end_offset, line_bytes) from a binary file handle"""
+    handle.seek(offset)
+    for line in handle:
+        start = offset
+        offset += len(line)
+        yield start, offset, line
+
+
+def read_records(path: str, fmt: str, text_field: str = 'text',
+                 id_field: Optional[str] = None, start_offset: int = 0,
+                 delimiter: str = ',') -> Iterator[Record]:
+    """
+    Lazily read documents starting at a byte offset.
+    Documents without an id field are identified by their starting byte
+    offset, which stays stable across resumed runs.
+    """
+    with open(path, 'rb') as handle:
+        if fmt == 'jsonl':
+            for start, end, line in _iter_lines(handle, start_offset):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                doc_id = row.get(id_field) if id_field else None
+                yield Record(str(start if doc_id is None else doc_id),
+                             str(row.get(text_field) or ''), end)
+
+        elif fmt == 'text':
+            for start, end, line in _iter_lines(handle, start_offset):
+                text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+                if text.strip():
+                    yield Record(str(start), text, end)
+
+        elif fmt == 'csv':
+            yield from _read_csv(handle, text_field, id_field, start_offset, delimiter)
+
+        else:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+
+
+def _read_csv(handle, text_field: str, id_field: Optional[str],
+              start_offset: int, delimiter: str) -> Iterator[Record]:
+    """CSV reader that tracks byte offsets, including across quoted newlines"""
+    position = {'offset': 0}
+
+    def lines(offset: int) -> Iterator[str]:
+        for _, end, line in _iter_lines(handle, offset):
+            position['offset'] = end
+            yield line.decode('utf-8', errors='replace')
+
+    csv.field_size_limit(sys.maxsize)
+    header = next(csv.reader(lines(0), delimiter=delimiter), None)
+    if header is None:
+        return
+    if text_field not in header:
+        raise ValueError(f"CSV has no '{text_field}' column (columns: {header})")
+    text_index = header.index(text_field)
+    id_index = header.index(id_field) if id_field and id_field in header else None
+
+    # The csv module pulls exactly one record's worth of lines at a time, so
+    # the offset after each row is where the next record begins
+    row_start = max(start_offset, position['offset'])
+    for row in csv.reader(lines(row_start), delimiter=delimiter):
+        row_end = position['offset']
+        if row and len(row) > text_index:
+            doc_id = row[id_index] if id_index is not None else str(row_start)
+            yield Record(doc_id, row[text_index], row_end)
+        row_start = row_end
+
+
+def batch_records(records: Iterable[Record], batch_size: int) -> Iterator[List[Record]]:
+    """Group records into lists of at most batch_size"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def detect_batches(detector, batches: Iterable[List[Record]],
+                   batch_size: int) -> Iterator[tuple]:
+    """Run the detector over each batch, yielding (batch, results)"""
+    if isinstance(detector, ShardedDetector):
+        # Workers only receive the texts; records stay here to pair with results
+        yield from detector.map_batches(((batch, [r.text for r in batch]) for batch in batches),
+                                        batch_size=batch_size)
+        return
+    for batch in batches:
+        yield batch, detector.detect_batch([r.text for r in batch], batch_size=batch_size)
+
+
+def findings_to_rows(record: Record, result: Dict) -> Iterator[Dict]:
+    """Flatten one document's detect() result into finding rows"""
+    for pii in result['pii_detected']:
+        yield {'doc_id': record.doc_id, **pii}
+
+
+class ProgressReporter:
+    """Prints rows/sec to stderr at a fixed interval"""
+
+    def __init__(self, interval: float = 5.0, stream: TextIO = sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.rows = 0
+        self.findings = 0
+
+    def update(self, rows: int, findings: int, offset: int, force: bool = False):
+        """Record progress and report if the interval has elapsed"""
+        self.rows += rows
+        self.findings += findings
+        now = time.perf_counter()
+        if force or now - self.last_report >= self.interval:
+            elapsed = max(now - self.started, 1e-9)
+            print(f"[scan] rows={self.rows:,} findings={self.findings:,} "
+                  f"rows/sec={self.rows / elapsed:,.1f} offset={offset}",
+                  file=self.stream, flush=True)
+            self.last_report = now
+
+
+def write_checkpoint(path: str, offset: int):
+    """Atomically record the byte offset up to which output is complete"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as handle:
+        json.dump({'offset': offset}, handle)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path: str) -> int:
+    """Byte offset stored by write_checkpoint, or 0 if there is none"""
+    if not os.path.exists(path):
+        return 0
+    with open(path) as handle:
+        return int(json.load(handle)['offset'])
+
+
+def scan(detector, input_path: str, output: TextIO, fmt: Optional[str] = None,
+         text_field: str = 'text', id_field: Optional[str] = None,
+         batch_size: int = 32, start_offset: int = 0,
+         checkpoint_path: Optional[str] = None,
+         progress: Optional[ProgressReporter] = None,
+         incremental: Optional[IncrementalScanner] = None,
+         delimiter: Optional[str] = None) -> int:
+    """
+    Stream a corpus through the detector and write findings as JSONL.
+
+    Output for each batch is flushed before the checkpoint moves past it, so
+    an interrupted scan resumed from the checkpoint never loses findings
+    (the last batch may be written twice). With an IncrementalScanner,
+    unchanged documents reuse the findings stored by the previous run.
+    CSV fields are split on delimiter, by default a tab for .tsv files and
+    a comma otherwise.
+    Returns the final byte offset.
+    """
+    fmt = fmt or detect_format(input_path)
+    offset = start_offset
+
+    delimiter = delimiter or detect_delimiter(input_path)
+
+    records = read_records(input_path, fmt, text_field, id_field, start_offset, delimiter)
+    batches = batch_records(records, batch_size)
+    if incremental is not None:
+        detected = incremental.detect_batches(batches, batch_size)
+    else:
+        detected = detect_batches(detector, batches, batch_size)
+    for batch, results in detected:
+        found = 0
+        for record, result in zip(batch, results):
+            for row in findings_to_rows(record, result):
+                output.write(json.dumps(row) + '\n')
+                found += 1
+        output.flush()
+
+        offset = batch[-1].end_offset
+        if checkpoint_path:
+            write_checkpoint(checkpoint_path, offset)
+        if progress:
+            progress.update(len(batch), found, offset)
+
+    if progress:
+        progress.update(0, 0, offset, force=True)
+    return offset
+
+
+def build_detector(args):
+    """Construct the detector, keeping its startup chatter off stdout"""
+    cache = None
+    if args.cache_size or args.cache_path:
+        # Pending disk writes are committed at exit, including in workers
+        cache = ResultCache(max_entries=args.cache_size or 10_000, path=args.cache_path)
+    detector_kwargs = {'model_name': args.model, 'cascade': args.cascade, 'cache': cache,
+                       'local_files_only': args.local_files_only, 'backend': args.backend,
+                       'validate_rules': args.validate_rules}
+    if args.workers > 1:
+        return ShardedDetector(workers=args.workers, detector_kwargs=detector_kwargs)
+    return local_detector(detector_kwargs)
+
+
+def local_detector(detector_kwargs: Dict):
+    """In-process detector; the model itself is only loaded on first use"""
+    from multi_layer_detector import MultiLayerPIIDetector
+    with contextlib.redirect_stdout(sys.stderr):
+        return MultiLayerPIIDetector(**detector_kwargs)
+
+
+def build_incremental(args, detector, store: FingerprintStore) -> IncrementalScanner:
+    """Incremental scanner over the detector; worker pools take the fingerprint of an unloaded local copy"""
+    config_hash = None
+    if isinstance(detector, ShardedDetector):
+        config_hash = local_detector({'model_name': args.model, 'cascade': args.cascade,
+                                      'local_files_only': args.local_files_only,
+                                      'backend': args.backend,
+                                      'validate_rules': args.validate_rules}).config_fingerprint()
+    return IncrementalScanner(detector, store, config_hash=config_hash)
+
+
+def run_scan(args) -> int:
+    """Entry point for the scan command"""
+    start_offset = args.resume_offset
+    if args.resume:
+        if not args.checkpoint:
+            print("--resume requires --checkpoint", file=sys.stderr)
+            return 2
+        start_offset = read_checkpoint(args.checkpoint)
+
+    detector = build_detector(args)
+    progress = ProgressReporter(interval=args.progress_interval)
+
+    if args.output == '-':
+        output_context = contextlib.nullcontext(sys.stdout)
+    else:
+        # Resumed runs append to the findings already written
+        mode = 'a' if start_offset > 0 else 'w'
+        output_context = open(args.output, mode, encoding='utf-8')
+
+    # Worker pools must be shut down; a plain detector needs no cleanup
+    detector_context = detector if isinstance(detector, ShardedDetector) else contextlib.nullcontext()
+    store_context = FingerprintStore(args.fingerprints) if args.fingerprints else contextlib.nullcontext()
+    with detector_context, output_context as output, store_context as store:
+        incremental = build_incremental(args, detector, store) if store is not None else None
+        scan(detector, args.input, output, fmt=args.format, text_field=args.text_field,
+             id_field=args.id_field, batch_size=args.batch_size,
+             start_offset=start_offset, checkpoint_path=args.checkpoint,
+             progress=progress, incremental=incremental, delimiter=args.delimiter)
+        if incremental is not None:
+            print(f"[scan] incremental: {json.dumps(incremental.report())}", file=sys.stderr, flush=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description="Scan corpora for PII")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan_parser = commands.add_parser('scan', help="Stream a file through the detector")
+    scan_parser.add_argument('input', help="JSONL, CSV or plain-text file (one document per line)")
+    scan_parser.add_argument('--output', '-o', default='-', help="Findings JSONL file ('-' for stdout)")
+    scan_parser.add_argument('--format', choices=FORMATS, help="Input format (default: from extension)")
+    scan_parser.add_argument('--text-field', default='text', help="JSON key or CSV column holding the text")
+    scan_parser.add_argument('--delimiter',
+                             help="CSV field delimiter (default: tab for .tsv, comma otherwise)")
+    scan_parser.add_argument('--id-field', help="JSON key or CSV column holding a document ID")
+    scan_parser.add_argument('--batch-size', type=int, default=32, help="Documents per detector batch")
+    scan_parser.add_argument('--workers', type=int, default=1,
+                             help="Worker processes, each loading the model once")
+    scan_parser.add_argument('--model', default="dslim/bert-base-NER", help="Layer 1 model name or path")
+    scan_parser.add_argument('--backend', choices=BACKENDS, default='pytorch',
+                             help="Layer 1 runtime; ONNX backends take an exported directory as --model")
+    scan_parser.add_argument('--local-files-only', action='store_true',
+                             help="Load the model from a local snapshot without contacting the hub")
+    scan_parser.add_argument('--cascade', choices=('document', 'sentence'),
+                             help="Skip Layer 1 where a cheap gate rules out PER/LOC/ORG")
+    scan_parser.add_argument('--validate-rules', action='store_true',
+                             help="Drop rule matches failing Luhn, SSN, calendar or NANP checks")
+    scan_parser.add_argument('--cache-size', type=int, default=0,
+                             help="Cache results for this many distinct texts in memory (per worker)")
+    scan_parser.add_argument('--cache-path', help="SQLite file for a persistent result cache")
+    scan_parser.add_argument('--fingerprints',
+                             help="SQLite fingerprint store; documents unchanged since the last run are "
+                                  "skipped and large ones only re-scan changed chunks (use with --id-field)")
+    scan_parser.add_argument('--checkpoint', help="File recording the last fully written byte offset")
+    scan_parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint offset")
+    scan_parser.add_argument('--resume-offset', type=int, default=0, help="Start reading at this byte offset")
+    scan_parser.add_argument('--progress-interval', type=float, default=5.0,
+                             help="Seconds between rows/sec reports on stderr")
+    scan_parser.set_defaults(func=run_scan)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and dispatch to the selected command"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Detection Metrics
+Optional per-call tracing and aggregated metrics for MultiLayerPIIDetector
+
+A Trace records wall time per stage (layer1, layer2, merge, layer3) and
+counts (candidates per layer, cache hits and misses, cascade gate
+decisions, and optionally tokens sent to the model) for one detect() or detect_batch() call.
+DetectionMetrics aggregates traces into histograms and counters, renders
+them in the Prometheus text exposition format and forwards each trace to
+any registered callbacks.
+
+Detectors built without metrics never create a Trace; every instrumentation
+point then reduces to a None check. Counting the tokens sent to the model
+takes an extra tokenizer pass, so it only happens with count_tokens=True and
+is timed as its own 'token_count' stage.
+
+Usage:
+    metrics = DetectionMetrics(callbacks=[print])
+    detector = MultiLayerPIIDetector(metrics=metrics)
+    detector.detect(text)['metrics']     # this call's timings and counts
+    metrics.to_prometheus()              # aggregated, for a /metrics endpoint
+"""
+
+import time
+import bisect
+import threading
+import contextlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Histogram upper bounds in seconds, as used by Prometheus client defaults
+# extended down to sub-millisecond stages
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Trace:
+    """Timings and counts for one detection call"""
+
+    __slots__ = ('call', 'started', 'elapsed', 'stages', 'counts')
+
+    def __init__(self, call: str):
+        self.call = call
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.stages: Dict[str, float] = {}
+        self.counts = Counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Add the wall time of the enclosed block to a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name: str, amount: int = 1):
+        self.counts[name] += amount
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict:
+        """JSON-friendly view attached to results and passed to callbacks"""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings['total'] = round(self.elapsed * 1000, 3)
+        return {'call': self.call, 'timings_ms': timings, 'counts': dict(self.counts)}
+
+
+def timed(trace: Optional[Trace], name: str):
+    """trace.stage(name), or a shared no-op context when tracing is off"""
+    return trace.stage(name) if trace is not None else _NULL_STAGE
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.observations += 1
+
+    def cumulative(self) -> List[int]:
+        """Observations at or below each bound, then the +Inf total"""
+        running, out = 0, []
+        for count in self.counts:
+            running += count
+            out.append(running)
+        return out
+
+
+class DetectionMetrics:
+    """
+    Aggregates traces from one or more detectors.
+
+    Stage and end-to-end times go into histograms labelled by call type;
+    counts accumulate as counters. callbacks receive each trace's as_dict().
+    With count_tokens, Layer 1 inputs are tokenized again to count tokens.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS,
+                 callbacks: Optional[List[Callable[[Dict], None]]] = None,
+                 namespace: str = 'pii_detect',
+                 count_tokens: bool = False):
+        self.buckets = tuple(buckets)
+        self.count_tokens = count_tokens
+        self.callbacks = list(callbacks or [])
+        self.namespace = namespace
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._counters = Counter()
+        self._calls = Counter()
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback: Callable[[Dict], None]):
+        self.callbacks.append(callback)
+
+    def observe(self, trace: Trace) -> Dict:
+        """Fold a finished trace into the aggregates; returns its dict view"""
+        view = trace.as_dict()
+        with self._lock:
+            self._calls[trace.call] += 1
+            for name, seconds in trace.stages.items():
+                self._histogram(trace.call, name).observe(seconds)
+            self._histogram(trace.call, 'total').observe(trace.elapsed)
+            self._counters.update(trace.counts)
+        for callback in self.callbacks:
+            callback(view)
+        return view
+
+    def _histogram(self, call: str, name: str) -> Histogram:
+        key = (call, name)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(self.buckets)
+        return self._histograms[key]
+
+    def snapshot(self) -> Dict:
+        """Current calls, counters and per-stage time totals as plain dicts"""
+        with self._lock:
+            return {
+                'calls': dict(self._calls),
+                'counts': dict(self._counters),
+                'stage_seconds': {f"{call}.{name}": round(h.total, 6)
+                                  for (call, name), h in self._histograms.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._calls.clear()
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        ns = self.namespace
+        lines = []
+        with self._lock:
+            lines += [f"# HELP {ns}_calls_total Detection calls by type",
+                      f"# TYPE {ns}_calls_total counter"]
+            for call, count in sorted(self._calls.items()):
+                lines.append(f'{ns}_calls_total{{call="{call}"}} {count}')
+
+            lines += [f"# HELP {ns}_stage_seconds Wall time per detection stage and call",
+                      f"# TYPE {ns}_stage_seconds histogram"]
+            for (call, name), histogram in sorted(self._histograms.items()):
+                labels = f'call="{call}",stage="{name}"'
+                cumulative = histogram.cumulative()
+                for bound, count in zip(histogram.bounds, cumulative):
+                    lines.append(f'{ns}_stage_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+                lines.append(f'{ns}_stage_seconds_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+                lines.append(f'{ns}_stage_seconds_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'{ns}_stage_seconds_count{{{labels}}} {histogram.observations}')
+
+            lines += [f"# HELP {ns}_events_total Documents, candidates, tokens, cache and gate decisions",
+                      f"# TYPE {ns}_events_total counter"]
+            for name, count in sorted(self._counters.items()):
+                lines.append(f'{ns}_events_total{{event="{name}"}} {count}')
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,357 @@
+"""
+Incremental Scanning
+Re-scan only what changed since the last run, using a SQLite fingerprint store
+
+For every document ID the store keeps a content hash, the detector
+configuration fingerprint, per-chunk hashes (large documents only) and the
+findings of the last scan. On the next run each document is:
+
+    skipped     same text, same configuration: stored findings are reused
+    partial     large document with some chunks unchanged: only the changed
+                chunks (plus a margin) are detected again, and the findings
+                of unchanged chunks shift to their new offsets
+    rescanned   new, changed throughout, or the configuration changed
+
+Chunk boundaries are content-defined: a chunk ends after a sentence or line
+break whose preceding characters hash to a chosen residue, so an edit only
+changes the chunks around it instead of moving every later boundary.
+Removed chunks leave a changed region at the point where their neighbours now
+meet. Changed regions are widened by margin_chars on both sides and detected with
+margin_chars more context, so findings whose Layer 3 context touches the
+edit are re-detected rather than reused.
+
+Usage:
+    with FingerprintStore("fingerprints.db") as store:
+        scanner = IncrementalScanner(detector, store)
+        results = scanner.detect_batch(doc_ids, texts)
+        print(scanner.report())
+"""
+
+import re
+import json
+import time
+import zlib
+import bisect
+import hashlib
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CHUNKED_MIN_CHARS = 16_384
+CHUNK_MIN_CHARS = 1_024
+CHUNK_TARGET_CHARS = 4_096
+MARGIN_CHARS = 256
+
+# Candidate chunk ends: just after sentence punctuation or line breaks
+_CUT_POINT = re.compile(r'[.!?]\s+|\n+')
+# Characters before a candidate that decide whether it becomes a boundary
+_CUT_HASH_CHARS = 32
+# Average distance between candidates assumed when picking the residue modulus
+_AVERAGE_PIECE_CHARS = 64
+
+
+def digest(text: str) -> str:
+    """Content hash of a document or chunk"""
+    return hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+
+
+def chunk_spans(text: str, min_chars: int = CHUNK_MIN_CHARS,
+                target_chars: int = CHUNK_TARGET_CHARS) -> List[Tuple[int, int]]:
+    """
+    Content-defined (start, end) chunks covering text. Chunks are at least
+    min_chars long (except the last) and target_chars on average; a chunk
+    with no sentence or line break in it grows until one appears.
+    """
+    modulus = max(1, (target_chars - min_chars) // _AVERAGE_PIECE_CHARS)
+    spans, start = [], 0
+    for match in _CUT_POINT.finditer(text):
+        end = match.end()
+        if end - start < min_chars:
+            continue
+        tail = text[end - _CUT_HASH_CHARS:end].encode('utf-8', errors='surrogatepass')
+        if zlib.crc32(tail) % modulus == 0 or end - start >= 4 * target_chars:
+            spans.append((start, end))
+            start = end
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+@dataclass
+class StoredDocument:
+    """What the store remembers about one document"""
+    content_hash: str
+    config_hash: str
+    chunks: Optional[List[List]]    # [start, end, hash] per chunk, large documents only
+    findings: List[Dict]
+
+
+class FingerprintStore:
+    """
+    SQLite index of doc ID -> content hash, configuration hash, chunk hashes
+    and findings. Each run gets a number so documents that were not seen in
+    the latest run can be counted (deleted upstream) or pruned.
+    """
+
+    def __init__(self, path: str, commit_every: int = 500):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending_writes = 0
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (doc_id TEXT PRIMARY KEY, "
+                         "content_hash TEXT NOT NULL, config_hash TEXT NOT NULL, "
+                         "chunks TEXT, findings TEXT NOT NULL, run INTEGER NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+        self.run = self._begin_run()
+
+    def _begin_run(self) -> int:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'run'").fetchone()
+        run = int(row[0]) + 1 if row else 1
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run', ?)", (str(run),))
+        self._db.commit()
+        return run
+
+    def get_many(self, doc_ids: Sequence[str]) -> Dict[str, StoredDocument]:
+        """Stored entries for those of doc_ids that have one"""
+        found = {}
+        # Stay under SQLite's default limit on bound parameters
+        for i in range(0, len(doc_ids), 900):
+            chunk = list(doc_ids[i:i + 900])
+            rows = self._db.execute(
+                "SELECT doc_id, content_hash, config_hash, chunks, findings FROM documents "
+                f"WHERE doc_id IN ({','.join('?' * len(chunk))})", chunk)
+            for doc_id, content_hash, config_hash, chunks, findings in rows:
+                found[doc_id] = StoredDocument(content_hash, config_hash,
+                                               json.loads(chunks) if chunks else None,
+                                               json.loads(findings))
+        return found
+
+    def put(self, doc_id: str, document: StoredDocument):
+        """Record a document scanned in this run"""
+        self._db.execute(
+            "INSERT OR REPLACE INTO documents (doc_id, content_hash, config_hash, chunks, findings, run) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (doc_id, document.content_hash, document.config_hash,
+             json.dumps(document.chunks) if document.chunks else None,
+             json.dumps(document.findings), self.run))
+        self._count_write()
+
+    def touch(self, doc_ids: Sequence[str]):
+        """Mark unchanged documents as seen in this run"""
+        self._db.executemany("UPDATE documents SET run = ? WHERE doc_id = ?",
+                             [(self.run, doc_id) for doc_id in doc_ids])
+        self._count_write(len(doc_ids))
+
+    def _count_write(self, count: int = 1):
+        self._pending_writes += count
+        if self._pending_writes >= self.commit_every:
+            self.flush()
+
+    def unseen_count(self) -> int:
+        """Documents stored by earlier runs but not seen in this one"""
+        return self._db.execute("SELECT COUNT(*) FROM documents WHERE run < ?", (self.run,)).fetchone()[0]
+
+    def prune_unseen(self) -> int:
+        """Delete documents not seen in this run; returns how many"""
+        deleted = self._db.execute("DELETE FROM documents WHERE run < ?", (self.run,)).rowcount
+        self._db.commit()
+        return deleted
+
+    def flush(self):
+        """Commit pending writes"""
+        self._db.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class IncrementalScanner:
+    """
+    Wraps a detector (anything with detect_batch(), such as
+    MultiLayerPIIDetector or ShardedDetector) so that each document is
+    skipped, partially rescanned or rescanned according to the store.
+    config_hash defaults to detector.config_fingerprint().
+    """
+
+    def __init__(self, detector, store: FingerprintStore, config_hash: Optional[str] = None,
+                 chunked_min_chars: int = CHUNKED_MIN_CHARS, chunk_min_chars: int = CHUNK_MIN_CHARS,
+                 chunk_target_chars: int = CHUNK_TARGET_CHARS, margin_chars: int = MARGIN_CHARS):
+        self.detector = detector
+        self.store = store
+        self.config_hash = config_hash or detector.config_fingerprint()
+        self.chunked_min_chars = chunked_min_chars
+        self.chunk_min_chars = chunk_min_chars
+        self.chunk_target_chars = chunk_target_chars
+        self.margin_chars = margin_chars
+        self.stats = Counter()
+        self.detect_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def detect_batches(self, batches: Iterable[List], batch_size: int = 16) -> Iterator[tuple]:
+        """(batch, results) for batches of records with doc_id and text, like corpus_scanner.detect_batches"""
+        for batch in batches:
+            yield batch, self.detect_batch([r.doc_id for r in batch], [r.text for r in batch], batch_size)
+
+    def detect_batch(self, doc_ids: Sequence[str], texts: Sequence[str], batch_size: int = 16) -> List[Dict]:
+        """
+        One result per document, each with 'pii_detected' (as from detect())
+        and 'incremental': 'skipped', 'partial' or 'rescanned'.
+        """
+        stored = self.store.get_many(doc_ids)
+        plans, windows = [], []
+        for doc_id, text in zip(doc_ids, texts):
+            plan = self._plan(text, stored.get(doc_id))
+            # A window is (start, end, keep_start, keep_end): detect text[start:end],
+            # keep findings that start in [keep_start, keep_end)
+            plan['first_window'] = len(windows)
+            windows.extend(plan['windows'])
+            plans.append(plan)
+
+        window_texts = [text[start:end] for plan, text in zip(plans, texts)
+                        for start, end, _, _ in plan['windows']]
+        started = time.perf_counter()
+        detected = self.detector.detect_batch(window_texts, batch_size=batch_size) if window_texts else []
+        self.detect_seconds += time.perf_counter() - started
+
+        results, unchanged = [], []
+        for doc_id, text, plan in zip(doc_ids, texts, plans):
+            self.stats['documents'] += 1
+            self.stats[plan['status']] += 1
+            self.stats['chars_total'] += len(text)
+            if plan['status'] == 'skipped':
+                unchanged.append(doc_id)
+                results.append({'pii_detected': plan['findings'], 'incremental': 'skipped'})
+                continue
+
+            findings = list(plan['findings'])
+            for offset, (start, end, keep_start, keep_end) in enumerate(plan['windows']):
+                self.stats['chars_scanned'] += end - start
+                for finding in detected[plan['first_window'] + offset]['pii_detected']:
+                    position = [finding['position'][0] + start, finding['position'][1] + start]
+                    if keep_start <= position[0] < keep_end:
+                        findings.append({**finding, 'position': position})
+            findings = _drop_overlaps(findings)
+            self.store.put(doc_id, StoredDocument(plan['content_hash'], self.config_hash,
+                                                  plan['chunks'], findings))
+            results.append({'pii_detected': findings, 'incremental': plan['status']})
+        if unchanged:
+            self.store.touch(unchanged)
+        return results
+
+    def _plan(self, text: str, previous: Optional[StoredDocument]) -> Dict:
+        """Decide what to detect for one document and which stored findings to keep"""
+        content_hash = digest(text)
+        same_config = previous is not None and previous.config_hash == self.config_hash
+        if same_config and previous.content_hash == content_hash:
+            return {'status': 'skipped', 'findings': previous.findings, 'windows': []}
+
+        chunks = None
+        if len(text) >= self.chunked_min_chars:
+            chunks = [[start, end, digest(text[start:end])]
+                      for start, end in chunk_spans(text, self.chunk_min_chars, self.chunk_target_chars)]
+        plan = {'status': 'rescanned', 'content_hash': content_hash, 'chunks': chunks,
+                'findings': [], 'windows': [(0, len(text), 0, len(text))]}
+        if not (same_config and chunks and previous.chunks):
+            return plan
+
+        # Unchanged chunks are matched to old ones by hash, in order of appearance
+        old_by_hash: Dict[str, List] = {}
+        for start, end, chunk_hash in previous.chunks:
+            old_by_hash.setdefault(chunk_hash, []).append((start, end))
+        reused, dirty = [], []
+        # Old end of the previous chunk if it was reused, None if it changed
+        previous_old_end = 0
+        for start, end, chunk_hash in chunks:
+            if old_by_hash.get(chunk_hash):
+                old_start, old_end = old_by_hash[chunk_hash].pop(0)
+                if previous_old_end is not None and previous_old_end != old_start:
+                    # Old text was removed (or moved) just before this chunk:
+                    # the join point is a changed region of its own
+                    dirty.append((start, start))
+                reused.append((start, end, start - old_start))
+                previous_old_end = old_end
+            else:
+                if dirty and dirty[-1][1] == start:
+                    dirty[-1] = (dirty[-1][0], end)
+                else:
+                    dirty.append((start, end))
+                previous_old_end = None
+        if previous_old_end is not None and previous_old_end != previous.chunks[-1][1]:
+            # Old chunks were removed from the end
+            dirty.append((len(text), len(text)))
+        self.stats['chunks_reused'] += len(reused)
+        self.stats['chunks_rescanned'] += len(chunks) - len(reused)
+        if not reused:
+            return plan
+
+        # Widen each changed region by the margin, merging regions that meet
+        regions: List[List[int]] = []
+        for start, end in dirty:
+            start, end = max(0, start - self.margin_chars), min(len(text), end + self.margin_chars)
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
+            else:
+                regions.append([start, end])
+
+        old_findings = sorted(previous.findings, key=lambda f: f['position'][0])
+        old_starts = [f['position'][0] for f in old_findings]
+        # A stored finding is reused unless it starts inside a widened region
+        # (the region's window detects it again) or runs into changed text
+        region_starts = [start for start, _ in regions]
+        dirty_starts = [start for start, _ in dirty]
+        kept = []
+        for start, end, shift in reused:
+            old_start, old_end = start - shift, end - shift
+            for finding in old_findings[bisect.bisect_left(old_starts, old_start):
+                                        bisect.bisect_left(old_starts, old_end)]:
+                position = [finding['position'][0] + shift, finding['position'][1] + shift]
+                i = bisect.bisect_right(region_starts, position[0]) - 1
+                inside = i >= 0 and position[0] < regions[i][1]
+                j = bisect.bisect_right(dirty_starts, position[0])
+                reaches = j < len(dirty) and position[1] > dirty_starts[j]
+                if not inside and not reaches:
+                    kept.append({**finding, 'position': position})
+
+        plan.update(status='partial', findings=kept,
+                    windows=[(max(0, start - self.margin_chars), min(len(text), end + self.margin_chars),
+                              start, end) for start, end in regions])
+        return plan
+
+    def report(self) -> Dict:
+        """Counts, characters detected versus total, and wall time with an extrapolated full-scan time"""
+        elapsed = time.perf_counter() - self.started
+        report = {key: self.stats[key] for key in ('documents', 'skipped', 'partial', 'rescanned',
+                                                    'chunks_reused', 'chunks_rescanned',
+                                                    'chars_scanned', 'chars_total')}
+        report['scanned_fraction'] = round(report['chars_scanned'] / report['chars_total'], 4) \
+            if report['chars_total'] else 0.0
+        report['wall_seconds'] = round(elapsed, 3)
+        if report['chars_scanned']:
+            # Detection time per character scanned, applied to every character
+            full = elapsed - self.detect_seconds + self.detect_seconds * report['chars_total'] / report['chars_scanned']
+            report['full_scan_seconds_estimate'] = round(full, 3)
+        report['unseen_documents'] = self.store.unseen_count()
+        return report
+
+
+def _drop_overlaps(findings: List[Dict]) -> List[Dict]:
+    """Sort by position, dropping any finding that overlaps one already kept"""
+    kept: List[Dict] = []
+    for finding in sorted(findings, key=lambda f: (f['position'][0], -f['position'][1])):
+        if kept and finding['position'][0] < kept[-1]['position'][1]:
+            continue
+        kept.append(finding)
+    return kept
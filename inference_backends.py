@@ -0,0 +1,312 @@
+"""
+Layer 1 Inference Backends
+Interchangeable runtimes for the token-classification model behind Layer 1
+
+    pytorch     transformers pipeline in fp32 PyTorch (the original behaviour)
+    onnx        ONNX Runtime over an exported fp32 graph
+    onnx-int8   ONNX Runtime over the same graph with int8 dynamic quantization
+
+Every backend is called like a transformers pipeline with
+aggregation_strategy="simple": one text gives a list of entity dicts
+(entity_group, score, word, start, end), a list of texts gives one such list
+per text. Each also exposes the tokenizer, which Layer 1 chunking uses to
+size its windows. Heavy imports (transformers, torch, onnxruntime) happen
+only when a backend is built.
+
+A call can also be taken apart into encode() (tokenize a batch), forward()
+(the model pass) and decode() (entities per text), so that a pipeline can
+tokenize the next batch on one thread while the model runs on another.
+
+The ONNX backends read a directory produced once, offline, by:
+    python inference_backends.py export /models/bert-base-NER /models/bert-base-NER-onnx
+"""
+
+import os
+import abc
+import sys
+import json
+import argparse
+import itertools
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+BACKENDS = ('pytorch', 'onnx', 'onnx-int8')
+
+ONNX_FILES = {'onnx': 'model.onnx', 'onnx-int8': 'model.int8.onnx'}
+
+# Positional order of the inputs in BERT-style forward() signatures
+MODEL_INPUTS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+class InferenceBackend(abc.ABC):
+    """Interface shared by all Layer 1 runtimes"""
+
+    name = ''
+    tokenizer = None
+
+    @abc.abstractmethod
+    def __call__(self, inputs: Union[str, List[str]],
+                 batch_size: Optional[int] = None) -> Union[List[Dict], List[List[Dict]]]:
+        """Entity dicts for one text, or a list of them per text"""
+
+    @abc.abstractmethod
+    def encode(self, texts: List[str]):
+        """Model inputs for a batch of texts"""
+
+    def forward(self, encoded):
+        """Model outputs for encode()'s result; by default the whole call"""
+        return self(list(encoded), batch_size=len(encoded))
+
+    def decode(self, texts: List[str], encoded, outputs) -> List[List[Dict]]:
+        """Entity dicts per text from forward()'s outputs"""
+        return outputs
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes of weights held in memory, 0 if unknown"""
+        return 0
+
+
+class PyTorchBackend(InferenceBackend):
+    """The transformers pipeline running the model in PyTorch"""
+
+    name = 'pytorch'
+
+    def __init__(self, model_name: str, local_files_only: bool = False):
+        from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+
+        model = model_name
+        tokenizer = None
+        if local_files_only:
+            # Resolve everything from disk up front so the pipeline never asks the hub
+            tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=True)
+            model = AutoModelForTokenClassification.from_pretrained(model_name, local_files_only=True)
+        self.pipeline = pipeline(
+            "token-classification",
+            model=model,
+            tokenizer=tokenizer,
+            aggregation_strategy="simple"
+        )
+        self.tokenizer = self.pipeline.tokenizer
+        id2label = self.pipeline.model.config.id2label
+        self.labels = [id2label[i] for i in range(len(id2label))]
+
+    def __call__(self, inputs, batch_size=None):
+        if batch_size is None:
+            return self.pipeline(inputs)
+        return self.pipeline(inputs, batch_size=batch_size)
+
+    def encode(self, texts):
+        return self.tokenizer(texts, padding=True, truncation=True, return_tensors='pt',
+                              return_offsets_mapping=True, return_special_tokens_mask=True)
+
+    def forward(self, encoded):
+        import torch
+
+        # The forward pass releases the GIL, so other stages keep running meanwhile
+        feed = {name: encoded[name].to(self.pipeline.device) for name in MODEL_INPUTS if name in encoded}
+        with torch.no_grad():
+            return self.pipeline.model(**feed).logits.float().cpu().numpy()
+
+    def decode(self, texts, encoded, outputs):
+        numpy_encoded = {name: encoded[name].numpy() for name in
+                         ('input_ids', 'offset_mapping', 'special_tokens_mask', 'attention_mask')}
+        return _decode_logits(self.tokenizer, self.labels, texts, numpy_encoded, outputs)
+
+    def memory_bytes(self):
+        model = self.pipeline.model
+        return sum(t.numel() * t.element_size() for t in itertools.chain(model.parameters(), model.buffers()))
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime session over an exported model directory. Post-processing
+    reproduces the pipeline's "simple" aggregation (see _decode_logits).
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False,
+                 intra_op_threads: Optional[int] = None):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        self.name = 'onnx-int8' if quantized else 'onnx'
+        path = os.path.join(model_dir, ONNX_FILES[self.name])
+        self.model_path = path
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; create it with "
+                                    f"'python inference_backends.py export <checkpoint> {model_dir}'")
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        with open(os.path.join(model_dir, 'config.json')) as handle:
+            id2label = json.load(handle)['id2label']
+        self.labels = [id2label[str(i)] for i in range(len(id2label))]
+
+    def __call__(self, inputs, batch_size=None):
+        if isinstance(inputs, str):
+            return self._run([inputs])[0]
+        batch_size = batch_size or 1
+        results = []
+        for i in range(0, len(inputs), batch_size):
+            results.extend(self._run(inputs[i:i + batch_size]))
+        return results
+
+    def memory_bytes(self):
+        # The session holds the graph's initializers, about the file's size
+        return os.path.getsize(self.model_path)
+
+    def _run(self, texts: List[str]) -> List[List[Dict]]:
+        """One padded forward pass over a batch of texts"""
+        encoded = self.encode(texts)
+        return self.decode(texts, encoded, self.forward(encoded))
+
+    def encode(self, texts):
+        return self.tokenizer(texts, padding=True, truncation=True, return_tensors='np',
+                              return_offsets_mapping=True, return_special_tokens_mask=True)
+
+    def forward(self, encoded):
+        feed = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(None, feed)[0]
+
+    def decode(self, texts, encoded, outputs):
+        return _decode_logits(self.tokenizer, self.labels, texts, encoded, outputs)
+
+
+def _decode_logits(tokenizer, labels: List[str], texts: List[str], encoded, logits) -> List[List[Dict]]:
+    """
+    Entities per text from token logits, reproducing the pipeline's "simple"
+    aggregation: softmax per token, argmax label, then adjacent tokens sharing
+    an entity tag (and not starting a new B- span) are grouped with their
+    mean score.
+    """
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    scores = shifted / shifted.sum(axis=-1, keepdims=True)
+    return [_aggregate(tokenizer, labels, text, encoded['input_ids'][i], scores[i],
+                       encoded['offset_mapping'][i], encoded['special_tokens_mask'][i],
+                       encoded['attention_mask'][i])
+            for i, text in enumerate(texts)]
+
+
+def _aggregate(tokenizer, labels: List[str], text: str, input_ids, scores, offsets,
+               special_mask, attention) -> List[Dict]:
+    """Token scores to grouped entities, as aggregation_strategy="simple" does"""
+    tokens = []
+    for idx in np.flatnonzero((special_mask == 0) & (attention == 1)):
+        start, end = int(offsets[idx][0]), int(offsets[idx][1])
+        token_id = int(input_ids[idx])
+        word = tokenizer.convert_ids_to_tokens(token_id)
+        if token_id == tokenizer.unk_token_id:
+            word = text[start:end]
+        label = int(scores[idx].argmax())
+        tokens.append((labels[label], float(scores[idx][label]), word, start, end))
+
+    groups: List[List] = []
+    for token in tokens:
+        bi, tag = _split_tag(token[0])
+        if groups and bi != 'B' and tag == _split_tag(groups[-1][-1][0])[1]:
+            groups[-1].append(token)
+        else:
+            groups.append([token])
+
+    entities = []
+    for group in groups:
+        entity_group = group[0][0].split('-', 1)[-1]
+        if entity_group == 'O':
+            continue
+        entities.append({
+            'entity_group': entity_group,
+            'score': float(np.mean([token[1] for token in group])),
+            'word': tokenizer.convert_tokens_to_string([token[2] for token in group]),
+            'start': group[0][3],
+            'end': group[-1][4],
+        })
+    return entities
+
+
+def _split_tag(label: str):
+    """('B' or 'I', tag) for an IOB label; bare labels count as continuations"""
+    if label.startswith('B-') or label.startswith('I-'):
+        return label[0], label[2:]
+    return 'I', label
+
+
+def load_backend(backend: str, model_name: str, local_files_only: bool = False) -> InferenceBackend:
+    """
+    Build a backend. For 'pytorch', model_name is a hub ID or checkpoint
+    directory; for the ONNX backends it is a directory written by export_onnx().
+    """
+    if backend == 'pytorch':
+        return PyTorchBackend(model_name, local_files_only)
+    if backend in ONNX_FILES:
+        return OnnxBackend(model_name, quantized=backend == 'onnx-int8')
+    raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+
+def export_onnx(checkpoint: str, output_dir: str, quantize: bool = True,
+                opset: int = 14) -> Dict[str, str]:
+    """
+    Export a local PyTorch checkpoint to ONNX and, optionally, an int8
+    dynamically quantized copy. Reads only from disk. Returns the written paths.
+    """
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint, local_files_only=True)
+    model = AutoModelForTokenClassification.from_pretrained(checkpoint, local_files_only=True)
+    model.eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    sample = tokenizer(["Contact John Smith at Acme Corp in Boston."], return_tensors='pt')
+    input_names = [name for name in MODEL_INPUTS if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch', 1: 'sequence'}
+
+    paths = {'onnx': os.path.join(output_dir, ONNX_FILES['onnx'])}
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in input_names), paths['onnx'],
+                          input_names=input_names, output_names=['logits'],
+                          dynamic_axes=dynamic_axes, opset_version=opset)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        paths['onnx-int8'] = os.path.join(output_dir, ONNX_FILES['onnx-int8'])
+        quantize_dynamic(paths['onnx'], paths['onnx-int8'], weight_type=QuantType.QInt8)
+
+    return paths
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description="Prepare Layer 1 inference backends")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="Export a local checkpoint to ONNX (fp32 and int8)")
+    export_parser.add_argument('checkpoint', help="Local model directory (e.g. a hub snapshot)")
+    export_parser.add_argument('output_dir', help="Directory for the ONNX model, tokenizer and config")
+    export_parser.add_argument('--no-quantize', action='store_true', help="Skip the int8 copy")
+    export_parser.add_argument('--opset', type=int, default=14, help="ONNX opset version")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the export"""
+    args = build_parser().parse_args(argv)
+    paths = export_onnx(args.checkpoint, args.output_dir, quantize=not args.no_quantize,
+                        opset=args.opset)
+    for backend, path in paths.items():
+        print(f"{backend}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
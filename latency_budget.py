@@ -0,0 +1,98 @@
+"""
+Latency Budgets
+Deadlines and learned stage costs behind detect(text, deadline_ms=...)
+
+A Budget is the wall-clock deadline of one call. StageCosts keeps an
+exponentially weighted estimate of seconds per unit of work for each stage
+(characters for Layer 1, candidates for Layer 3), learned from the calls
+that ran them, so the detector can tell before starting a forward pass
+whether it will finish in time.
+
+Under a deadline the detector degrades in this order:
+
+    Layer 2     always runs, first
+    Layer 1     runs window by window while the estimate fits; the last
+                window may be cut to the prefix that still fits
+                ('truncated'), or nothing runs at all ('skipped')
+    Layer 3     full context and entropy scoring if it fits, otherwise
+                each candidate's own confidence against min_confidence
+                ('cheap')
+
+Results of deadline calls carry a 'budget' entry saying what happened.
+
+Usage:
+    result = detector.detect(text, deadline_ms=100)
+    result['budget']    # {'deadline_ms': 100, 'elapsed_ms': 41.7, 'met': True,
+                        #  'layer1': 'truncated', 'layer1_chars': [0, 2311], ...}
+"""
+
+import math
+import time
+import threading
+from typing import Dict, Optional
+
+
+class Budget:
+    """Deadline of one detection call, deadline_ms after it was created"""
+
+    __slots__ = ('deadline_ms', 'started', 'deadline')
+
+    def __init__(self, deadline_ms: float):
+        self.deadline_ms = deadline_ms
+        self.started = time.perf_counter()
+        self.deadline = self.started + deadline_ms / 1000.0
+
+    def remaining(self) -> float:
+        """Seconds left, negative once the deadline has passed"""
+        return self.deadline - time.perf_counter()
+
+    def fits(self, seconds: Optional[float]) -> bool:
+        """Whether work estimated at seconds ends before the deadline; work of unknown cost (None) is assumed to fit"""
+        return seconds is None or seconds <= self.remaining()
+
+    def report(self, layer1: str, layer1_chars: int, layer3: str) -> Dict:
+        """The 'budget' entry of a result"""
+        elapsed = time.perf_counter() - self.started
+        return {
+            'deadline_ms': self.deadline_ms,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'met': elapsed <= self.deadline_ms / 1000.0,
+            'degraded': layer1 != 'full' or layer3 != 'full',
+            'layer1': layer1,
+            'layer1_chars': [0, layer1_chars],
+            'layer3': layer3,
+        }
+
+
+class StageCosts:
+    """Exponentially weighted seconds per unit of work for each stage"""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._per_unit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, units: int):
+        """Fold one measured run of units of work into the stage's estimate"""
+        if units <= 0:
+            return
+        rate = seconds / units
+        with self._lock:
+            previous = self._per_unit.get(stage)
+            self._per_unit[stage] = rate if previous is None else previous + self.alpha * (rate - previous)
+
+    def estimate(self, stage: str, units: int) -> Optional[float]:
+        """Expected seconds for units of work, or None if the stage was never measured"""
+        rate = self._per_unit.get(stage)
+        return None if rate is None else rate * units
+
+    def affordable(self, stage: str, seconds: float) -> Optional[int]:
+        """Units of work that fit in seconds, or None if the stage was never measured"""
+        rate = self._per_unit.get(stage)
+        if rate is None or rate <= 0 or math.isinf(seconds):
+            return None
+        return max(0, int(seconds / rate))
+
+    def as_dict(self) -> Dict[str, float]:
+        """Current seconds-per-unit estimates"""
+        return dict(self._per_unit)
@@ -0,0 +1,148 @@
+"""
+Memory-Mapped Rules Scanner
+Layer 2 over multi-GB files without decoding or loading them
+
+The file is memory-mapped and the detector's patterns, compiled to bytes,
+run over fixed-size windows of it. Each window is scanned from
+overlap_bytes before its start to overlap_bytes after its end, and keeps
+the matches that start inside it, so a match crossing a window edge is
+found whole by the window it starts in. Matches longer than overlap_bytes
+can be cut short at a window edge. Pages are released once a window is done,
+so resident memory stays at about one window per process.
+
+re holds the GIL, so with workers > 1 windows are spread across processes,
+each mapping the file itself; matches are still yielded in file order.
+
+Offsets are absolute byte offsets into the file. \\d, \\w and \\s match ASCII
+only, as they do for any bytes regex.
+
+Usage:
+    for result in detector.detect_rules_file("export.log", workers=4):
+        print(result.start, result.end, result.pii_type)
+"""
+
+import os
+import mmap
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from multi_layer_detector import CompiledRuleSet, PIIResult, DEFAULT_PATTERNS
+from rule_validators import resolve_validators
+
+DEFAULT_WINDOW_BYTES = 32 << 20
+DEFAULT_OVERLAP_BYTES = 4096
+
+# Per-process state: compiled bytes rules and the open mapping
+_worker_state: Dict = {}
+
+
+def _open_map(path: str) -> Optional[mmap.mmap]:
+    """Read-only mapping of path, or None for an empty file"""
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return None
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapped, 'madvise'):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+def _release(mapped: mmap.mmap, start: int, end: int):
+    """Drop the pages of [start, end) from this process's resident set"""
+    if not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    start = max(0, start - start % mmap.PAGESIZE)
+    if end > start:
+        mapped.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def scan_window(mapped, rules: CompiledRuleSet, start: int, end: int,
+                overlap: int) -> List[Tuple[int, int, str]]:
+    """(start, end, pattern key) of the matches that start in [start, end)"""
+    found = []
+    for pii_type, match in rules.finditer(mapped, max(0, start - overlap), min(len(mapped), end + overlap)):
+        if match.start() >= end:
+            break
+        if match.start() >= start:
+            found.append((match.start(), match.end(), pii_type))
+    return found
+
+
+def _init_worker(path: str, patterns: Dict[str, Dict]):
+    _worker_state['rules'] = CompiledRuleSet(patterns, binary=True)
+    _worker_state['map'] = _open_map(path)
+
+
+def _scan_in_worker(start: int, end: int, overlap: int) -> List[Tuple[int, int, str, bytes]]:
+    mapped = _worker_state['map']
+    found = [(s, e, t, mapped[s:e]) for s, e, t in scan_window(mapped, _worker_state['rules'], start, end, overlap)]
+    _release(mapped, start - overlap, end)
+    return found
+
+
+def _windows(size: int, window_bytes: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, size, window_bytes):
+        yield start, min(size, start + window_bytes)
+
+
+def _window_matches(path: str, patterns: Dict[str, Dict], window_bytes: int, overlap: int,
+                    workers: int) -> Iterator[Tuple[int, int, str, bytes]]:
+    """(start, end, pattern key, value) for every match, window by window in file order"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    if workers <= 1:
+        rules = CompiledRuleSet(patterns, binary=True)
+        mapped = _open_map(path)
+        try:
+            for start, end in _windows(size, window_bytes):
+                for s, e, pii_type in scan_window(mapped, rules, start, end, overlap):
+                    yield s, e, pii_type, mapped[s:e]
+                _release(mapped, start - overlap, end)
+        finally:
+            mapped.close()
+        return
+
+    windows = _windows(size, window_bytes)
+    pending = deque()
+    # 'spawn' avoids forking a parent that may already hold torch threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(path, patterns)) as executor:
+        def submit(count: int):
+            for start, end in itertools.islice(windows, count):
+                pending.append(executor.submit(_scan_in_worker, start, end, overlap))
+
+        # At most two windows' results per worker are held at once
+        submit(2 * workers)
+        while pending:
+            yield from pending.popleft().result()
+            submit(1)
+
+
+def scan_file(path: str, patterns: Optional[Dict[str, Dict]] = None,
+              window_bytes: int = DEFAULT_WINDOW_BYTES, overlap_bytes: int = DEFAULT_OVERLAP_BYTES,
+              workers: int = 1, validate: bool = False) -> Iterator[PIIResult]:
+    """
+    Layer 2 results for a file, in file order, with byte offsets as start and
+    end and the matched bytes decoded (invalid UTF-8 replaced) as text. With
+    validate, matches failing their pattern's validator are dropped.
+    """
+    if overlap_bytes >= window_bytes:
+        raise ValueError("overlap_bytes must be smaller than window_bytes")
+    patterns = DEFAULT_PATTERNS if patterns is None else patterns
+    checks = resolve_validators(patterns) if validate else {}
+    last_end = 0
+    for start, end, pii_type, value in _window_matches(path, patterns, window_bytes, overlap_bytes, workers):
+        # The lookback can resynchronise differently from the previous window;
+        # the earlier window's match wins
+        if start < last_end:
+            continue
+        last_end = end
+        text = value.decode('utf-8', errors='replace')
+        if pii_type in checks and not checks[pii_type](text):
+            continue
+        yield PIIResult(text=text, pii_type=patterns[pii_type]['name'],
+                        confidence=1.0, start=start, end=end, detection_layer='Rules')
@@ -0,0 +1,232 @@
+"""
+Domain Model Routing
+Per-document choice of the Layer 1 model from a pool of loaded checkpoints
+
+Each document is assigned a domain, either by the caller or by a keyword
+classifier that looks at its first few thousand characters, and each domain
+maps to a token-classification checkpoint (BERT-base-NER for general text,
+fine-tuned BioBERT, FinBERT or LegalBERT checkpoints for the others). Domain
+checkpoints are expected to emit the same PER/LOC/ORG labels as the default
+model; Layers 2 and 3 are shared by all of them.
+
+Models are loaded on first use into a ModelPool that keeps their estimated
+weight size under budget_mb, unloading the least recently used model to make
+room. Within a batch, documents are grouped by model so each model sees one
+detect_batch() call, and groups whose model is already loaded run first.
+
+Usage:
+    router = DomainRouter(detector, {'biomedical': '/models/biobert-ner',
+                                     'financial': '/models/finbert-ner'},
+                          pool=ModelPool(budget_mb=1500))
+    results = router.detect_batch(texts)                  # classified
+    results = router.detect_batch(texts, domains=domains)  # caller-supplied
+"""
+
+import re
+import gc
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from inference_backends import InferenceBackend, load_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOMAIN = 'general'
+
+# A few dozen unambiguous terms per domain are enough to separate the traffic
+DOMAIN_KEYWORDS = {
+    'biomedical': ['patient', 'diagnosis', 'diagnosed', 'clinical', 'clinic', 'hospital', 'physician',
+                   'prescribed', 'prescription', 'dosage', 'mg', 'symptoms', 'treatment', 'medication',
+                   'admitted', 'discharge', 'oncology', 'cardiology', 'mri', 'biopsy', 'chronic', 'acute',
+                   'allergies', 'vitals', 'surgery', 'nurse', 'therapy', 'lab', 'blood', 'dose'],
+    'financial': ['account', 'invoice', 'payment', 'balance', 'loan', 'mortgage', 'credit', 'debit',
+                  'transaction', 'transfer', 'wire', 'deposit', 'withdrawal', 'interest', 'portfolio',
+                  'securities', 'equity', 'dividend', 'brokerage', 'routing', 'statement', 'fund',
+                  'investment', 'tax', 'revenue', 'audit', 'ledger', 'usd', 'overdraft', 'billing'],
+    'legal': ['plaintiff', 'defendant', 'court', 'counsel', 'attorney', 'hereby', 'herein', 'whereas',
+              'agreement', 'clause', 'party', 'parties', 'contract', 'litigation', 'settlement',
+              'jurisdiction', 'statute', 'affidavit', 'subpoena', 'testimony', 'deposition', 'judge',
+              'pursuant', 'indemnify', 'liability', 'arbitration', 'appellate', 'docket', 'verdict',
+              'breach'],
+}
+
+_WORD = re.compile(r'[a-z]+')
+
+
+class KeywordDomainClassifier:
+    """
+    Picks the domain whose keywords occur most often in the first max_chars
+    characters, or None when no domain reaches min_hits.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Iterable[str]]] = None,
+                 min_hits: int = 2, max_chars: int = 4000):
+        self.keywords = {domain: sorted(set(words))
+                         for domain, words in (keywords or DOMAIN_KEYWORDS).items()}
+        self.min_hits = min_hits
+        self.max_chars = max_chars
+        self._index = {word: domain for domain, words in self.keywords.items() for word in words}
+
+    def classify(self, text: str) -> Optional[str]:
+        """Domain for text, or None if it looks general"""
+        hits = Counter(self._index[word] for word in _WORD.findall(text[:self.max_chars].lower())
+                       if word in self._index)
+        if not hits:
+            return None
+        domain, count = hits.most_common(1)[0]
+        return domain if count >= self.min_hits else None
+
+    def signature(self) -> Tuple:
+        """Everything that affects classify(), for configuration fingerprints"""
+        return (sorted(self.keywords.items()), self.min_hits, self.max_chars)
+
+
+class ModelPool:
+    """
+    Lazily loaded Layer 1 backends keyed by model name, in least recently used
+    order. Loading a model first unloads others until its expected size fits
+    in budget_mb (the size it had last time, or the largest seen so far); a
+    model larger than the whole budget is still loaded, alone.
+
+    Sizes come from InferenceBackend.memory_bytes() and count weights only,
+    not activations or tokenizers. A batch already running on an unloaded
+    model keeps it alive until it finishes.
+    """
+
+    def __init__(self, budget_mb: float = 2048, backend: str = 'pytorch',
+                 local_files_only: bool = False,
+                 loader: Callable[[str, str, bool], InferenceBackend] = load_backend):
+        self.budget_bytes = int(budget_mb * 2 ** 20)
+        self.backend = backend
+        self.local_files_only = local_files_only
+        self.loader = loader
+        self._models: 'OrderedDict[str, InferenceBackend]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, model_name: str) -> InferenceBackend:
+        """The loaded backend for model_name, loading it (and unloading others) if needed"""
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is not None:
+                self._models.move_to_end(model_name)
+                self.stats['hits'] += 1
+                return model
+
+            # Loading under the lock keeps two large models from loading at once
+            expected = self._sizes.get(model_name, max(self._sizes.values(), default=0))
+            self._evict(self.budget_bytes - expected)
+            model = self.loader(self.backend, model_name, self.local_files_only)
+            self._sizes[model_name] = model.memory_bytes()
+            self.stats['loads'] += 1
+            self._evict(self.budget_bytes - self._sizes[model_name])
+            self._models[model_name] = model
+            logger.info("Loaded %s (%.0f MB, %.0f MB resident)", model_name,
+                        self._sizes[model_name] / 2 ** 20, self.resident_bytes() / 2 ** 20)
+            return model
+
+    def _evict(self, limit: int):
+        """Unload least recently used models until at most limit bytes remain"""
+        evicted = False
+        while self._models and self.resident_bytes() > max(0, limit):
+            model_name, _ = self._models.popitem(last=False)
+            self.stats['evictions'] += 1
+            evicted = True
+            logger.info("Unloaded %s", model_name)
+        if evicted:
+            gc.collect()
+
+    def is_loaded(self, model_name: str) -> bool:
+        return model_name in self._models
+
+    def resident_bytes(self) -> int:
+        """Estimated bytes of the models currently loaded"""
+        return sum(self._sizes[model_name] for model_name in self._models)
+
+    def summary(self) -> Dict:
+        """Loaded models, their estimated size and load/hit/eviction counts"""
+        return {
+            'loaded': list(self._models),
+            'resident_mb': round(self.resident_bytes() / 2 ** 20, 1),
+            'budget_mb': round(self.budget_bytes / 2 ** 20, 1),
+            'loads': self.stats['loads'],
+            'hits': self.stats['hits'],
+            'evictions': self.stats['evictions'],
+        }
+
+
+class DomainRouter:
+    """
+    Wraps a MultiLayerPIIDetector so each document's Layer 1 runs on the
+    model for its domain. Domains missing from models, and documents the
+    classifier leaves unlabelled, use detector.model_name. Those run on the
+    detector's own model, which never takes a slot in the pool. Has the same
+    detect()/detect_batch() contract as the detector, with a 'routing' entry
+    ({'domain', 'model'}) added to each result.
+    """
+
+    def __init__(self, detector, models: Dict[str, str], pool: Optional[ModelPool] = None,
+                 classifier: Optional[KeywordDomainClassifier] = None,
+                 default_domain: str = DEFAULT_DOMAIN):
+        self.detector = detector
+        self.models = dict(models)
+        self.pool = pool or ModelPool(backend=detector.backend, local_files_only=detector.local_files_only)
+        self.classifier = classifier or KeywordDomainClassifier()
+        self.default_domain = default_domain
+        self.routed = Counter()
+
+    def route(self, text: str, domain: Optional[str] = None) -> Tuple[str, str]:
+        """(domain, model name) for one document"""
+        domain = domain or self.classifier.classify(text) or self.default_domain
+        return domain, self.models.get(domain, self.detector.model_name)
+
+    def detect(self, text: str, domain: Optional[str] = None) -> Dict:
+        return self.detect_batch([text], batch_size=1, domains=[domain])[0]
+
+    def detect_batch(self, texts: List[str], batch_size: int = 16,
+                     domains: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        One result per text, in order. domains, if given, holds a domain (or
+        None to classify) per text.
+        """
+        if domains is None:
+            domains = [None] * len(texts)
+        elif len(domains) != len(texts):
+            raise ValueError(f"Got {len(domains)} domains for {len(texts)} texts")
+        routes = [self.route(text, domain) for text, domain in zip(texts, domains)]
+        groups: Dict[str, List[int]] = {}
+        for i, (domain, model_name) in enumerate(routes):
+            groups.setdefault(model_name, []).append(i)
+            self.routed[domain] += 1
+
+        results: List[Optional[Dict]] = [None] * len(texts)
+        # The detector's own model and models already in the pool go first,
+        # so a batch loads each missing model at most once
+        for model_name in sorted(groups, key=lambda name: not (name == self.detector.model_name
+                                                               or self.pool.is_loaded(name))):
+            indices = groups[model_name]
+            for i, result in zip(indices, self._detector_for(model_name).detect_batch(
+                    [texts[i] for i in indices], batch_size)):
+                domain, _ = routes[i]
+                results[i] = {**result, 'routing': {'domain': domain, 'model': model_name}}
+        return results
+
+    def _detector_for(self, model_name: str):
+        """The wrapped detector for its own model, otherwise a view on the pool's backend"""
+        if model_name == self.detector.model_name:
+            return self.detector
+        return self.detector.for_model(model_name, self.pool.get(model_name))
+
+    def config_fingerprint(self) -> str:
+        """The detector's fingerprint extended with the routing table and classifier"""
+        state = (self.detector.config_fingerprint(), sorted(self.models.items()),
+                 self.default_domain, self.classifier.signature())
+        return hashlib.sha256(repr(state).encode('utf-8')).hexdigest()
+
+    def summary(self) -> Dict:
+        """Documents routed per domain plus the pool's summary"""
+        return {'routed': dict(self.routed), 'pool': self.pool.summary()}
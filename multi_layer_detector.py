@@ -5,14 +5,118 @@ Target: 99.8% for enterprise production use
 """
 
 import re
-from typing import Dict, List, Tuple
+import copy
+import time
+import hashlib
+import logging
+import itertools
+import threading
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+from collections import Counter
 from dataclasses import dataclass
-from transformers import pipeline
 import numpy as np
 
+from result_cache import ResultCache, content_key
+from span_resolution import MERGE_POLICIES, resolve_spans
+from inference_backends import BACKENDS, load_backend
+from detection_metrics import DetectionMetrics, Trace, timed
+from redaction import DEFAULT_CHUNK_CHARS, redact_stream, redact_text
+from columnar_results import ResultColumns
+from rule_validators import resolve_validators
+from latency_budget import Budget, StageCosts
+
+logger = logging.getLogger(__name__)
+
+# Layer 2: Deterministic Rules - UPDATED PATTERNS
+# Optional hints used by CompiledRuleSet, neither of which changes what a
+# pattern matches:
+#   'prefilter' - cheap regex that must occur somewhere in the document for
+#                 the pattern to match at all; documents without it skip it.
+#   'guard'     - zero-width assertion that holds wherever a leftmost match
+#                 can start, letting the single-pass scan step over all other
+#                 positions with one cheap check.
+# One optional check, applied to matches once they are found:
+#   'validator' - name of a check in rule_validators.VALIDATORS; with
+#                 validate_rules=True matches failing it never reach Layer 3.
+DEFAULT_PATTERNS = {
+    'ssn': {
+        'pattern': r'\d{3}-\d{2}-\d{4}',
+        'name': 'Social Security Number',
+        'prefilter': r'\d',
+        'guard': r'(?=\d)',
+        'validator': 'ssn'
+    },
+    'credit_card': {
+        'pattern': r'\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}',
+        'name': 'Credit Card',
+        'prefilter': r'\d',
+        'guard': r'(?=\d)',
+        'validator': 'luhn'
+    },
+    'phone': {
+        'pattern': r'(?:\+?1[-.]?)?\(?[0-9]{3}\)?[-.]?[0-9]{3}[-.]?[0-9]{4}',
+        'name': 'Phone Number',
+        'prefilter': r'\d',
+        'guard': r'(?=[\d(+])',
+        'validator': 'nanp'
+    },
+    'email': {
+        'pattern': r'[a-zA-Z0-9][a-zA-Z0-9._%+-]*@[a-zA-Z0-9][a-zA-Z0-9.-]*\.[a-zA-Z]{2,}',
+        'name': 'Email Address',
+        'prefilter': r'@',
+        'guard': r'(?<![a-zA-Z0-9])'
+    },
+    'dob': {
+        'pattern': r'\d{1,2}/\d{1,2}/\d{4}',
+        'name': 'Date of Birth',
+        'prefilter': r'\d',
+        'guard': r'(?=\d)',
+        'validator': 'date'
+    },
+    'address': {
+        'pattern': r'\d+\s+\w+\s+(?:St|Street|Ave|Avenue|Rd|Road|Dr|Drive|Ln|Lane|Blvd|Boulevard)',
+        'name': 'Street Address',
+        'prefilter': r'\d',
+        'guard': r'(?=\d)'
+    }
+}
+
+# Layer 3: words whose presence near a candidate supports it being PII
+CONTEXT_INDICATORS = ['ssn', 'social', 'credit', 'card', 'phone', 'email',
+                      'address', 'number', 'id', 'account', 'dob', 'birth']
+CONTEXT_WINDOW = 50
+
+# Fallback for the rare documents whose length changes when lower-cased:
+# finds every indicator occurrence, overlapping ones included, in one pass.
+# ASCII-only case folding matches what str.lower() does for these words.
+_INDICATOR_REGEX = re.compile('(?=(' + '|'.join(map(re.escape, CONTEXT_INDICATORS)) + '))',
+                              re.IGNORECASE | re.ASCII)
+
+
+def _indicator_positions(text: str) -> Dict[str, np.ndarray]:
+    """Sorted start offsets of each context indicator found in the text"""
+    positions: Dict[str, List[int]] = {}
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        # Lower-case once, then let str.find skip between occurrences at C speed
+        for indicator in CONTEXT_INDICATORS:
+            found = []
+            i = lowered.find(indicator)
+            while i != -1:
+                found.append(i)
+                i = lowered.find(indicator, i + 1)
+            if found:
+                positions[indicator] = found
+    else:
+        for match in _INDICATOR_REGEX.finditer(text):
+            positions.setdefault(match.group(1).lower(), []).append(match.start())
+    return {indicator: np.array(found, dtype=np.int64) for indicator, found in positions.items()}
+
 @dataclass
 class PIIResult:
     """Container for PII detection results"""
+    __slots__ = ('text', 'pii_type', 'confidence', 'start', 'end', 'detection_layer')
+    
     text: str
     pii_type: str
     confidence: float
@@ -20,6 +124,149 @@ class PIIResult:
     end: int
     detection_layer: str
 
+class CompiledRuleSet:
+    """
+    Layer 2 pattern registry compiled into a single regex scanner.
+    
+    All patterns are merged into one alternation with a named group per PII
+    type, so each document is scanned once. Alternatives are tried in
+    registry order, which matches how merge_results() resolves rule matches
+    that start at the same position. Prefilters decide up front which
+    patterns can match at all, and the merged regex for each combination of
+    active patterns is compiled on first use and reused afterwards.
+    
+    With binary=True every regex is compiled from its UTF-8 encoding and
+    scans bytes-like objects (bytes, mmap); \\d, \\w and \\s then match
+    ASCII only.
+    """
+    
+    def __init__(self, patterns: Dict[str, Dict], flags: int = re.IGNORECASE,
+                 binary: bool = False):
+        self.signature = self.signature_of(patterns)
+        self.flags = flags
+        self.binary = binary
+        self._types = list(patterns)
+        self._configs = {pii_type: dict(config) for pii_type, config in patterns.items()}
+        self._group_names = {f'g{i}': pii_type for i, pii_type in enumerate(self._types)}
+        
+        # Validate every pattern individually so errors name the culprit
+        for pii_type, config in self._configs.items():
+            try:
+                re.compile(config['pattern'], flags)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for '{pii_type}': {e}") from e
+        
+        # Group patterns by prefilter so each literal is searched for once
+        self._prefilters: Dict[str, Tuple[re.Pattern, List[str]]] = {}
+        for pii_type, config in self._configs.items():
+            prefilter = config.get('prefilter')
+            if prefilter:
+                if prefilter not in self._prefilters:
+                    self._prefilters[prefilter] = (re.compile(self._source(prefilter), flags), [])
+                self._prefilters[prefilter][1].append(pii_type)
+        
+        self._compiled: Dict[frozenset, Optional[re.Pattern]] = {}
+        self._compiled[frozenset(self._types)] = self._compile(self._types)
+    
+    def _source(self, pattern: str):
+        """Regex source as compiled by this rule set: str, or UTF-8 bytes if binary"""
+        return pattern.encode('utf-8') if self.binary else pattern
+    
+    @staticmethod
+    def signature_of(patterns: Dict[str, Dict]) -> Tuple:
+        """Hashable fingerprint of a pattern registry, used to detect edits"""
+        return tuple((pii_type, config['pattern'], config.get('name'),
+                      config.get('prefilter'), config.get('guard'), config.get('validator'))
+                     for pii_type, config in patterns.items())
+    
+    def _compile(self, active_types: List[str]) -> Optional[re.Pattern]:
+        """
+        Merge the active patterns into one alternation of named groups.
+        Consecutive patterns sharing a guard are gated behind it together,
+        which keeps registry order while skipping hopeless positions early.
+        """
+        if not active_types:
+            return None
+        names = {pii_type: name for name, pii_type in self._group_names.items()}
+        
+        branches = []
+        for guard, group in itertools.groupby(active_types,
+                                              key=lambda t: self._configs[t].get('guard') or ''):
+            alternation = '|'.join(f"(?P<{names[t]}>{self._configs[t]['pattern']})"
+                                   for t in group)
+            branches.append(f"{guard}(?:{alternation})" if guard else alternation)
+        return re.compile(self._source('|'.join(branches)), self.flags)
+    
+    def active_types(self, text, pos: int = 0, endpos: Optional[int] = None) -> List[str]:
+        """Pattern types whose prefilter occurs in text[pos:endpos]"""
+        endpos = len(text) if endpos is None else endpos
+        skipped = set()
+        for regex, pii_types in self._prefilters.values():
+            if regex.search(text, pos, endpos) is None:
+                skipped.update(pii_types)
+        return [t for t in self._types if t not in skipped]
+    
+    def regex_for(self, text, pos: int = 0, endpos: Optional[int] = None) -> Optional[re.Pattern]:
+        """Merged regex covering only the patterns that can match this text"""
+        active = self.active_types(text, pos, endpos)
+        key = frozenset(active)
+        if key not in self._compiled:
+            self._compiled[key] = self._compile(active)
+        return self._compiled[key]
+    
+    def finditer(self, text, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[str, re.Match]]:
+        """
+        Yield (pii_type, match) pairs from a single pass over text[pos:endpos].
+        As with re, lookbehinds may look at text before pos but nothing
+        after endpos is visible.
+        """
+        endpos = len(text) if endpos is None else endpos
+        regex = self.regex_for(text, pos, endpos)
+        if regex is None:
+            return
+        for match in regex.finditer(text, pos, endpos):
+            yield self._group_names[match.lastgroup], match
+
+class ShapeGate:
+    """
+    Cheap token-shape gate for the Layer 1 cascade.
+    
+    The NER model only reports PER/LOC/ORG, which in practice are written as
+    capitalised words or acronyms. Segments made only of numbers, lower-case
+    tokens, punctuation and common log/date keywords cannot produce an entity
+    and are skipped. Any object with the same two methods can replace it.
+    """
+    
+    # Sentence-like segments; the alternatives tile the text without gaps
+    SEGMENT_PATTERN = re.compile(r'[^.!?\n]*[.!?\n]+|[^.!?\n]+')
+    # Title-case or mixed-case words, and acronyms of two or more letters
+    CANDIDATE_PATTERN = re.compile(r"\b[A-Z][A-Za-z'-]*[a-z][A-Za-z'-]*\b|\b[A-Z]{2,}\b")
+    IGNORED_WORDS = frozenset([
+        'ERROR', 'WARN', 'WARNING', 'INFO', 'DEBUG', 'TRACE', 'FATAL', 'CRITICAL',
+        'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS', 'HTTP', 'HTTPS',
+        'OK', 'UTC', 'GMT', 'ID', 'UUID', 'NULL', 'TRUE', 'FALSE', 'NONE', 'NaN',
+        'True', 'False', 'None', 'Null', 'Traceback', 'Exception', 'Error',
+        'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec',
+        'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun',
+    ])
+    
+    def __init__(self, ignored_words: Optional[set] = None):
+        self.ignored_words = frozenset(ignored_words) if ignored_words is not None else self.IGNORED_WORDS
+    
+    def segments(self, text: str) -> List[Tuple[int, int]]:
+        """Contiguous sentence/line spans covering the whole text"""
+        return [match.span() for match in self.SEGMENT_PATTERN.finditer(text)]
+    
+    def needs_ner(self, segment: str) -> bool:
+        """Whether the segment has any token shaped like a named entity"""
+        return any(match.group() not in self.ignored_words
+                   for match in self.CANDIDATE_PATTERN.finditer(segment))
+    
+    def signature(self) -> Tuple:
+        """Every setting that affects the gate's decisions, for cache keys"""
+        return (type(self).__name__, self.SEGMENT_PATTERN.pattern,
+                self.CANDIDATE_PATTERN.pattern, tuple(sorted(self.ignored_words)))
+
 class MultiLayerPIIDetector:
     """
     Three-layer PII detection system for enterprise accuracy.
@@ -29,54 +276,394 @@ class MultiLayerPIIDetector:
     Layer 3: Statistical validation and anomaly detection
     """
     
-    def __init__(self, model_name: str = "dslim/bert-base-NER"):
-        """Initialize the three-layer detection system"""
+    # Upper bound on characters per token used to size tokenizer blocks
+    CHUNK_CHARS_PER_TOKEN = 8
+    
+    # Shortest prefix worth a Layer 1 pass when a deadline cuts a window short
+    MIN_PARTIAL_CHARS = 64
+    
+    def __init__(self, model_name: str = "dslim/bert-base-NER",
+                 chunking: bool = True,
+                 chunk_tokens: Optional[int] = None,
+                 chunk_overlap: int = 64,
+                 chunk_batch_size: int = 8,
+                 cascade: Optional[str] = None,
+                 ner_gate: Optional[ShapeGate] = None,
+                 cache: Optional[ResultCache] = None,
+                 merge_policy: str = 'highest_confidence',
+                 prefer_rules_for: Optional[List[str]] = None,
+                 local_files_only: bool = False,
+                 backend: str = 'pytorch',
+                 metrics: Optional[DetectionMetrics] = None,
+                 validate_rules: bool = False):
+        """
+        Initialize the three-layer detection system.
+        
+        The transformer is loaded on first use of Layer 1, or by warmup().
+        model_name may be a hub ID or a local snapshot directory; with
+        local_files_only=True the model is read from disk without any hub
+        lookup. backend selects the Layer 1 runtime ('pytorch', 'onnx' or
+        'onnx-int8'); the ONNX backends take the directory written by
+        inference_backends.export_onnx() as model_name.
+        
+        With chunking enabled, documents longer than the model's input limit
+        are split into windows of chunk_tokens tokens (default: the model
+        maximum) overlapping by chunk_overlap tokens, and Layer 1 runs over
+        them chunk_batch_size windows at a time.
+        
+        cascade='document' or 'sentence' puts ner_gate in front of Layer 1,
+        so documents or sentences the gate rules out never reach the model.
+        
+        With a cache, detect() and detect_batch() return stored results for
+        text already seen under the same configuration.
+        
+        merge_policy ('highest_confidence', 'longest' or 'union') decides how
+        overlapping Layer 1 and Layer 2 spans are resolved; rule matches for
+        the PII types in prefer_rules_for win over any overlapping span.
+        
+        With metrics, every detect()/detect_batch() result carries a 'metrics'
+        entry with per-stage wall times and counts, which are also aggregated
+        into metrics. Without it no tracing work is done at all.
+        
+        With validate_rules, Layer 2 matches of patterns that name a
+        validator (Luhn, SSN, calendar date, NANP) are dropped when they fail
+        it, before merging and Layer 3; validator_summary() counts them.
+        """
         print("Initializing Multi-Layer PII Detector...")
         
         # Layer 1: ML/NLP
-        self.ner_pipeline = pipeline(
-            "token-classification",
-            model=model_name,
-            aggregation_strategy="simple"
-        )
-        
-        # Layer 2: Deterministic Rules - UPDATED PATTERNS
-        self.patterns = {
-            'ssn': {
-                'pattern': r'\d{3}-\d{2}-\d{4}',
-                'name': 'Social Security Number'
-            },
-            'credit_card': {
-                'pattern': r'\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}',
-                'name': 'Credit Card'
-            },
-            'phone': {
-                'pattern': r'(?:\+?1[-.]?)?\(?[0-9]{3}\)?[-.]?[0-9]{3}[-.]?[0-9]{4}',
-                'name': 'Phone Number'
-            },
-            'email': {
-                'pattern': r'[a-zA-Z0-9][a-zA-Z0-9._%+-]*@[a-zA-Z0-9][a-zA-Z0-9.-]*\.[a-zA-Z]{2,}',
-                'name': 'Email Address'
-            },
-            'dob': {
-                'pattern': r'\d{1,2}/\d{1,2}/\d{4}',
-                'name': 'Date of Birth'
-            },
-            'address': {
-                'pattern': r'\d+\s+\w+\s+(?:St|Street|Ave|Avenue|Rd|Road|Dr|Drive|Ln|Lane|Blvd|Boulevard)',
-                'name': 'Street Address'
-            }
-        }
+        self.model_name = model_name
+        self.local_files_only = local_files_only
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+        self.backend = backend
+        self._ner_pipeline = None
+        self._load_lock = threading.Lock()
+        self.chunking = chunking
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.chunk_batch_size = chunk_batch_size
+        
+        # Cascade: a cheap gate deciding where Layer 1 can help at all
+        if cascade not in (None, 'document', 'sentence'):
+            raise ValueError(f"cascade must be None, 'document' or 'sentence', not {cascade!r}")
+        self.cascade = cascade
+        self.ner_gate = ner_gate or ShapeGate()
+        self.cascade_stats = Counter()
+        
+        # Layer 2: Deterministic Rules, compiled once into a single-pass scanner
+        self.patterns = copy.deepcopy(DEFAULT_PATTERNS)
+        self._rule_set = CompiledRuleSet(self.patterns)
+        self.validate_rules = validate_rules
+        self._checks = resolve_validators(self.patterns)
+        self.validator_stats = Counter()
         
         # Layer 3: Statistical thresholds
         self.entropy_threshold = 2.5
         self.min_confidence = 0.6
         
+        # Overlap resolution between layers
+        if merge_policy not in MERGE_POLICIES:
+            raise ValueError(f"merge_policy must be one of {MERGE_POLICIES}, not {merge_policy!r}")
+        self.merge_policy = merge_policy
+        self.prefer_rules_for = set(prefer_rules_for or ())
+        
+        # Result cache, keyed by text plus config_fingerprint()
+        self.cache = cache
+        self._fingerprint: Optional[Tuple[Tuple, str]] = None
+        
+        # Optional per-stage instrumentation
+        self.metrics = metrics
+        
+        # Learned per-stage costs, used by detect(deadline_ms=...)
+        self.stage_costs = StageCosts()
+    
+    @property
+    def ner_pipeline(self):
+        """Layer 1 inference backend, loaded on first use"""
+        if self._ner_pipeline is None:
+            with self._load_lock:
+                if self._ner_pipeline is None:
+                    self._ner_pipeline = load_backend(self.backend, self.model_name,
+                                                      self.local_files_only)
+        return self._ner_pipeline
+    
+    @ner_pipeline.setter
+    def ner_pipeline(self, value):
+        self._ner_pipeline = value
+    
+    def for_model(self, model_name: str, ner_pipeline) -> 'MultiLayerPIIDetector':
+        """
+        Shallow copy running Layer 1 on ner_pipeline (a loaded backend for
+        model_name) and sharing rules, cache and metrics. Results are cached
+        under model_name. Cascade and validator counts and stage costs are
+        kept per view, so each model's traffic is measured on its own.
+        """
+        view = copy.copy(self)
+        view.model_name = model_name
+        view._ner_pipeline = ner_pipeline
+        view._fingerprint = None
+        view.cascade_stats = Counter()
+        view.validator_stats = Counter()
+        view.stage_costs = StageCosts()
+        return view
+    
+    def warmup(self, batch_size: int = 8) -> float:
+        """
+        Load the model and run a dummy batch through all three layers, so the
+        first real request does not pay for lazy loading and first-call
+        overheads. Returns the seconds taken.
+        """
+        started = time.perf_counter()
+        texts = [f"Warmup note {i}: contact John Smith at john.smith@example.com or 555-010-{i:04d}"
+                 for i in range(batch_size)]
+        ml_batch = self.detect_ml_layer_batch(texts, batch_size=batch_size)
+        candidates = [self._candidates(text, ml_results) for text, ml_results in zip(texts, ml_batch)]
+        self.validate_statistical_layer_batch(texts, candidates)
+        # Seed the stage costs that deadline calls plan with
+        self._detect_within(texts[0], Budget(float('inf')))
+        return time.perf_counter() - started
+    
     def detect_ml_layer(self, text: str) -> List[PIIResult]:
         """Layer 1: ML-based detection using transformers"""
+        if self._needs_chunking(text):
+            return self.detect_ml_layer_chunked(text)
+        return self._entities_to_results(self.ner_pipeline(text))
+    
+    def detect_ml_layer_chunked(self, text: str) -> List[PIIResult]:
+        """
+        Layer 1 over a long document using overlapping token windows.
+        Windows are sent to the model in batches of chunk_batch_size, entity
+        offsets are mapped back into document coordinates, and entities seen
+        twice in an overlap are merged. Memory depends on the window batch,
+        not on the document size.
+        """
         results = []
-        entities = self.ner_pipeline(text)
+        windows = self._iter_windows(text)
+        
+        while True:
+            batch = list(itertools.islice(windows, self.chunk_batch_size))
+            if not batch:
+                break
+            outputs = self.ner_pipeline([text[start:end] for start, end, _, _ in batch],
+                                        batch_size=len(batch))
+            for (start, _, own_start, own_end), entities in zip(batch, outputs):
+                for result in self._entities_to_results(entities):
+                    result.start += start
+                    result.end += start
+                    # Each window only keeps entities starting in its own share of the overlap
+                    if own_start <= result.start < own_end:
+                        results.append(result)
+        
+        return self._merge_window_duplicates(text, results)
+    
+    def detect_ml_layer_batch(self, texts: List[str], batch_size: int = 16) -> List[List[PIIResult]]:
+        """
+        Layer 1 over many documents at once.
+        Inputs are sorted by length so each padded batch holds similarly sized
+        documents; results are returned in input order.
+        """
+        results: List[List[PIIResult]] = [[] for _ in texts]
+        # Empty documents have no tokens and cannot be fed to the pipeline
+        order = sorted((i for i, t in enumerate(texts) if t.strip()),
+                       key=lambda i: len(texts[i]))
+        
+        # Long documents are windowed on their own; the rest share padded batches
+        long_docs = [i for i in order if self._needs_chunking(texts[i])]
+        for i in long_docs:
+            results[i] = self.detect_ml_layer_chunked(texts[i])
+        if long_docs:
+            order = [i for i in order if not self._needs_chunking(texts[i])]
+        
+        for offset in range(0, len(order), batch_size):
+            indices = order[offset:offset + batch_size]
+            batch = [texts[i] for i in indices]
+            outputs = self.ner_pipeline(batch, batch_size=batch_size)
+            for i, entities in zip(indices, outputs):
+                results[i] = self._entities_to_results(entities)
+        
+        return results
+    
+    def gate_segments(self, text: str) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Split a document into spans that need Layer 1 and spans the gate skips.
+        Adjacent passing sentences are joined so the model keeps their context.
+        """
+        if self.cascade == 'sentence':
+            segments = self.ner_gate.segments(text)
+        else:
+            segments = [(0, len(text))]
+        
+        ner_spans, skipped = [], []
+        for start, end in segments:
+            if self.ner_gate.needs_ner(text[start:end]):
+                if ner_spans and ner_spans[-1][1] == start:
+                    ner_spans[-1] = (ner_spans[-1][0], end)
+                else:
+                    ner_spans.append((start, end))
+            else:
+                skipped.append((start, end))
+        
+        self.cascade_stats['documents'] += 1
+        self.cascade_stats['documents_skipped'] += not ner_spans
+        self.cascade_stats['segments'] += len(segments)
+        self.cascade_stats['segments_skipped'] += len(skipped)
+        self.cascade_stats['chars'] += len(text)
+        self.cascade_stats['chars_skipped'] += sum(end - start for start, end in skipped)
+        return ner_spans, skipped
+    
+    def cascade_summary(self) -> Dict:
+        """Gate counters and hit rates accumulated since construction"""
+        stats = self.cascade_stats
+        return {
+            **stats,
+            'document_skip_rate': round(stats['documents_skipped'] / max(stats['documents'], 1), 4),
+            'segment_skip_rate': round(stats['segments_skipped'] / max(stats['segments'], 1), 4),
+            'char_skip_rate': round(stats['chars_skipped'] / max(stats['chars'], 1), 4)
+        }
+    
+    def validator_summary(self) -> Dict:
+        """Per pattern: matches checked, rejected, and rejected per document, since construction"""
+        documents = self.validator_stats['documents']
+        summary = {'documents': documents}
+        for pii_type in self._checks:
+            rejected = self.validator_stats[f'{pii_type}_rejected']
+            summary[pii_type] = {
+                'checked': self.validator_stats[f'{pii_type}_checked'],
+                'rejected': rejected,
+                'rejected_per_document': round(rejected / max(documents, 1), 4)
+            }
+        return summary
+    
+    def _gated_ml_layer(self, texts: List[str], batch_size: int) -> Tuple[List[List[PIIResult]], List[Dict]]:
+        """Layer 1 for a batch of documents, run only on spans the gate lets through"""
+        spans, owners, reports = [], [], []
+        for i, text in enumerate(texts):
+            ner_spans, skipped = self.gate_segments(text)
+            reports.append(self._cascade_report(ner_spans, skipped))
+            for start, end in ner_spans:
+                spans.append(text[start:end])
+                owners.append((i, start))
+        
+        results: List[List[PIIResult]] = [[] for _ in texts]
+        for (i, offset), found in zip(owners, self.detect_ml_layer_batch(spans, batch_size)):
+            for result in found:
+                result.start += offset
+                result.end += offset
+                results[i].append(result)
+        return results, reports
+    
+    def _cascade_report(self, ner_spans: List[Tuple[int, int]], skipped: List[Tuple[int, int]]) -> Dict:
+        """The 'cascade' entry of a result"""
+        return {
+            'mode': self.cascade,
+            'ner_segments': [[start, end] for start, end in ner_spans],
+            'skipped_segments': [[start, end] for start, end in skipped]
+        }
+    
+    def _window_tokens(self) -> int:
+        """Tokens per window, leaving room for the model's special tokens"""
+        if self.chunk_tokens:
+            return self.chunk_tokens
+        tokenizer = self.ner_pipeline.tokenizer
+        return min(tokenizer.model_max_length, 512) - tokenizer.num_special_tokens_to_add()
+    
+    def _needs_chunking(self, text: str) -> bool:
+        """Whether a document may exceed one window"""
+        # Every WordPiece token covers at least one character, so anything
+        # no longer than the window in characters is guaranteed to fit
+        return self.chunking and len(text) > self._window_tokens()
+    
+    def _iter_windows(self, text: str) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Split a document into overlapping windows on token boundaries.
+        
+        Yields (start, end, own_start, own_end) character offsets: the window
+        covers text[start:end] and owns entities starting inside
+        [own_start, own_end), which splits each overlap between neighbours.
+        Windows end and start on word boundaries where possible, and only a
+        bounded block of text is tokenized per window.
+        """
+        tokenizer = self.ner_pipeline.tokenizer
+        max_tokens = self._window_tokens()
+        overlap = min(self.chunk_overlap, max_tokens // 2)
+        block_chars = max_tokens * self.CHUNK_CHARS_PER_TOKEN
+        pos, own_start = 0, 0
         
+        while pos < len(text):
+            block_end = min(len(text), pos + block_chars)
+            if block_end < len(text):
+                # Cut on whitespace so the block does not end mid-word
+                cut = max(text.rfind(ws, pos + 1, block_end) for ws in (' ', '\n', '\t'))
+                if cut > pos:
+                    block_end = cut
+            
+            offsets = tokenizer(text[pos:block_end], add_special_tokens=False,
+                                return_offsets_mapping=True)['offset_mapping']
+            if not offsets:
+                # Only whitespace: nothing here can start or continue an entity
+                pos = block_end
+                continue
+            
+            if len(offsets) <= max_tokens:
+                # The rest of the block fits in one window
+                end = pos + offsets[-1][1]
+                if block_end == len(text) or len(offsets) < 2:
+                    own_end = len(text) if block_end == len(text) else block_end
+                    yield pos + offsets[0][0], end, own_start, own_end
+                    own_start, pos = own_end, block_end
+                    continue
+                # The block was cut by characters: the next one starts the
+                # overlap's worth of characters back, on a word boundary, and
+                # never more than halfway back so the scan keeps moving
+                next_token = len(offsets) - min(overlap, len(offsets) // 2)
+                next_token = self._word_start(offsets, next_token, max(1, next_token // 2))
+                next_pos = pos + offsets[next_token][0]
+                own_end = (next_pos + end) // 2
+                yield pos + offsets[0][0], end, own_start, own_end
+                own_start, pos = own_end, next_pos
+                continue
+            
+            # End the window on a word boundary, then step back by the overlap.
+            # Boundaries are only looked for in the back half of the window, so
+            # text without whitespace is cut every max_tokens - overlap tokens
+            k = self._word_start(offsets, max_tokens, max(overlap + 1, max_tokens // 2))
+            next_token = self._word_start(offsets, k - overlap, max(1, (k - overlap) // 2))
+            
+            end = pos + offsets[k - 1][1]
+            next_pos = pos + offsets[next_token][0]
+            own_end = (next_pos + end) // 2
+            yield pos + offsets[0][0], end, own_start, own_end
+            own_start, pos = own_end, next_pos
+    
+    @staticmethod
+    def _word_start(offsets: List[Tuple[int, int]], i: int, lowest: int) -> int:
+        """
+        The nearest token at or before i, but not before lowest, that starts a
+        word (is not glued to the previous token); i itself if there is none.
+        """
+        for j in range(i, lowest - 1, -1):
+            if offsets[j][0] != offsets[j - 1][1]:
+                return j
+        return i
+    
+    def _merge_window_duplicates(self, text: str, results: List[PIIResult]) -> List[PIIResult]:
+        """Merge same-type entities that overlap because they straddled a window edge"""
+        results.sort(key=lambda r: (r.start, r.end))
+        merged: List[PIIResult] = []
+        for result in results:
+            last = merged[-1] if merged else None
+            if last and last.pii_type == result.pii_type and result.start < last.end:
+                last.end = max(last.end, result.end)
+                last.confidence = max(last.confidence, result.confidence)
+                last.text = text[last.start:last.end]
+            else:
+                merged.append(result)
+        return merged
+    
+    def _entities_to_results(self, entities: List[Dict]) -> List[PIIResult]:
+        """Convert raw pipeline entities into Layer 1 results"""
+        results = []
         for entity in entities:
             if entity['entity_group'] in ['PER', 'LOC', 'ORG']:
                 results.append(PIIResult(
@@ -91,119 +678,530 @@ class MultiLayerPIIDetector:
         return results
     
     def detect_rules_layer(self, text: str) -> List[PIIResult]:
-        """Layer 2: Rule-based detection using regex patterns"""
+        """Layer 2: Rule-based detection using a single compiled regex pass"""
         results = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        rules = self._rules()
+        checks = self._checks if self.validate_rules else {}
+        checked, rejected = Counter(), Counter()
         
-        # Debug: Print what we're searching
-        print(f"\n[DEBUG] Searching text: {text}")
-        
-        for pii_type, config in self.patterns.items():
-            pattern = config['pattern']
-            matches = list(re.finditer(pattern, text, re.IGNORECASE))
-            
-            # Debug: Show what each pattern finds
-            if matches:
-                print(f"[DEBUG] {pii_type} pattern '{pattern}' found {len(matches)} matches")
-            
-            for match in matches:
-                print(f"[DEBUG] Found {pii_type}: '{match.group()}'")
-                results.append(PIIResult(
-                    text=match.group(),
-                    pii_type=config['name'],
-                    confidence=1.0,  # Rules are deterministic
-                    start=match.start(),
-                    end=match.end(),
-                    detection_layer='Rules'
-                ))
+        for pii_type, match in rules.finditer(text):
+            if debug:
+                logger.debug("Found %s: '%s'", pii_type, match.group())
+            check = checks.get(pii_type)
+            if check is not None:
+                checked[pii_type] += 1
+                if not check(match.group()):
+                    rejected[pii_type] += 1
+                    continue
+            results.append(PIIResult(
+                text=match.group(),
+                pii_type=self.patterns[pii_type]['name'],
+                confidence=1.0,  # Rules are deterministic
+                start=match.start(),
+                end=match.end(),
+                detection_layer='Rules'
+            ))
         
+        if checks:
+            self.validator_stats['documents'] += 1
+            self.validator_stats.update({f'{pii_type}_checked': n for pii_type, n in checked.items()})
+            self.validator_stats.update({f'{pii_type}_rejected': n for pii_type, n in rejected.items()})
         return results
     
+    def detect_rules_file(self, path: str, window_bytes: Optional[int] = None,
+                          overlap_bytes: Optional[int] = None, workers: int = 1) -> Iterator[PIIResult]:
+        """
+        Layer 2 over a whole file through a memory map, without decoding it.
+        Yields results in file order with absolute byte offsets as start and
+        end; see mmap_scanner.scan_file().
+        """
+        from mmap_scanner import DEFAULT_OVERLAP_BYTES, DEFAULT_WINDOW_BYTES, scan_file
+        
+        return scan_file(path, self.patterns, window_bytes or DEFAULT_WINDOW_BYTES,
+                         overlap_bytes or DEFAULT_OVERLAP_BYTES, workers, validate=self.validate_rules)
+    
+    def _rules(self) -> CompiledRuleSet:
+        """Compiled rule set, rebuilt if self.patterns was edited"""
+        if self._rule_set.signature != CompiledRuleSet.signature_of(self.patterns):
+            self._rule_set = CompiledRuleSet(self.patterns)
+            self._checks = resolve_validators(self.patterns)
+        return self._rule_set
+    
     def validate_statistical_layer(self, text: str, candidates: List[PIIResult]) -> List[PIIResult]:
         """Layer 3: Statistical validation and anomaly detection"""
-        validated = []
+        return self.validate_statistical_layer_batch([text], [candidates])[0]
+    
+    def validate_statistical_layer_batch(self, texts: List[str],
+                                         candidates_per_doc: List[List[PIIResult]]) -> List[List[PIIResult]]:
+        """
+        Layer 3 over every candidate of a batch of documents at once.
+        Entropy is computed for all candidates in one NumPy pass and each
+        document's context indicators are located once, so cost grows
+        roughly linearly with the number of candidates.
+        """
+        flat = [candidate for candidates in candidates_per_doc for candidate in candidates]
+        if not flat:
+            return [[] for _ in texts]
         
-        for candidate in candidates:
-            # Calculate entropy for randomness check
-            entropy = self._calculate_entropy(candidate.text)
-            
-            # Check surrounding context
-            context_score = self._analyze_context(text, candidate)
-            
-            # Combine scores
-            final_confidence = (candidate.confidence * 0.6 + 
-                              context_score * 0.3 + 
-                              (1.0 if entropy > self.entropy_threshold else 0.5) * 0.1)
-            
-            if final_confidence >= self.min_confidence:
-                candidate.confidence = final_confidence
-                validated.append(candidate)
+        # Calculate entropy for randomness check
+        entropy = self._entropies([candidate.text for candidate in flat])
         
+        # Check surrounding context
+        context_score = np.concatenate([self._context_scores(text, candidates)
+                                        for text, candidates in zip(texts, candidates_per_doc)])
+        
+        # Combine scores
+        confidence = np.fromiter((candidate.confidence for candidate in flat),
+                                 dtype=np.float64, count=len(flat))
+        final_confidence = (confidence * 0.6 +
+                            context_score * 0.3 +
+                            np.where(entropy > self.entropy_threshold, 1.0, 0.5) * 0.1)
+        keep = final_confidence >= self.min_confidence
+        
+        validated: List[List[PIIResult]] = []
+        i = 0
+        for candidates in candidates_per_doc:
+            kept = []
+            for candidate in candidates:
+                if keep[i]:
+                    candidate.confidence = float(final_confidence[i])
+                    kept.append(candidate)
+                i += 1
+            validated.append(kept)
         return validated
     
+    @staticmethod
+    def _entropies(texts: List[str]) -> np.ndarray:
+        """Shannon entropy of each string, computed over character codes in one pass"""
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        if not lengths.any():
+            return np.zeros(len(texts))
+        
+        codes = np.frombuffer(''.join(texts).encode('utf-32-le', errors='surrogatepass'),
+                              dtype=np.uint32).astype(np.uint64)
+        owners = np.repeat(np.arange(len(texts), dtype=np.uint64), lengths)
+        # One key per (string, character) pair; counting keys gives every histogram at once
+        pairs, counts = np.unique((owners << np.uint64(32)) | codes, return_counts=True)
+        pair_owner = (pairs >> np.uint64(32)).astype(np.int64)
+        prob = counts / lengths[pair_owner]
+        return np.bincount(pair_owner, weights=-prob * np.log2(prob), minlength=len(texts))
+    
+    @staticmethod
+    def _context_scores(text: str, candidates: List[PIIResult]) -> np.ndarray:
+        """Context score of every candidate in one document"""
+        if not candidates:
+            return np.zeros(0)
+        starts = np.fromiter((c.start for c in candidates), dtype=np.int64, count=len(candidates))
+        ends = np.fromiter((c.end for c in candidates), dtype=np.int64, count=len(candidates))
+        window_start = np.maximum(0, starts - CONTEXT_WINDOW)
+        window_end = np.minimum(len(text), ends + CONTEXT_WINDOW)
+        
+        # An indicator counts once per window if any occurrence lies fully inside it
+        indicator_count = np.zeros(len(candidates))
+        for indicator, positions in _indicator_positions(text).items():
+            idx = np.searchsorted(positions, window_start)
+            first = positions[np.minimum(idx, len(positions) - 1)]
+            indicator_count += (idx < len(positions)) & (first <= window_end - len(indicator))
+        return np.minimum(1.0, indicator_count * 0.3)
+    
     def _calculate_entropy(self, text: str) -> float:
         """Calculate Shannon entropy for randomness detection"""
         if not text:
             return 0
         
-        prob = [float(text.count(c)) / len(text) for c in set(text)]
+        prob = [count / len(text) for count in Counter(text).values()]
         entropy = -sum(p * np.log2(p) for p in prob if p > 0)
         return entropy
     
     def _analyze_context(self, full_text: str, result: PIIResult) -> float:
         """Analyze surrounding context for validation"""
-        # Simple context analysis - can be enhanced
-        context_window = 50
-        start = max(0, result.start - context_window)
-        end = min(len(full_text), result.end + context_window)
-        context = full_text[start:end].lower()
-        
-        # Check for PII indicators in context
-        indicators = ['ssn', 'social', 'credit', 'card', 'phone', 'email', 
-                     'address', 'number', 'id', 'account', 'dob', 'birth']
-        
-        indicator_count = sum(1 for ind in indicators if ind in context)
-        return min(1.0, indicator_count * 0.3)
-    
-    def merge_results(self, ml_results: List, rule_results: List) -> List[PIIResult]:
-        """Merge and deduplicate results from multiple layers"""
-        all_results = ml_results + rule_results
-        
-        # Sort by position and confidence
-        all_results.sort(key=lambda x: (x.start, -x.confidence))
-        
-        # Deduplicate overlapping detections
-        merged = []
-        for result in all_results:
-            if not merged or result.start >= merged[-1].end:
-                merged.append(result)
-            elif result.confidence > merged[-1].confidence:
-                merged[-1] = result
-        
-        return merged
+        return float(self._context_scores(full_text, [result])[0])
     
-    def detect(self, text: str) -> Dict:
+    def merge_results(self, ml_results: List, rule_results: List,
+                      text: Optional[str] = None) -> List[PIIResult]:
+        """
+        Merge and deduplicate results from multiple layers.
+        Overlaps are resolved under merge_policy, however they nest or chain.
+        """
+        return resolve_spans(ml_results + rule_results, self.merge_policy,
+                             self.prefer_rules_for, text)
+    
+    def config_fingerprint(self) -> str:
+        """Hash of every setting that affects detect() output, used in cache keys"""
+        state = (self.model_name, self.backend, CompiledRuleSet.signature_of(self.patterns),
+                 self.validate_rules, self.entropy_threshold, self.min_confidence,
+                 self.chunking, self.chunk_tokens, self.chunk_overlap,
+                 self.cascade, self.ner_gate.signature() if self.cascade else None,
+                 self.merge_policy, tuple(sorted(self.prefer_rules_for)))
+        if self._fingerprint is None or self._fingerprint[0] != state:
+            self._fingerprint = (state, hashlib.sha256(repr(state).encode('utf-8')).hexdigest())
+        return self._fingerprint[1]
+    
+    def detect(self, text: str, deadline_ms: Optional[float] = None) -> Dict:
         """
         Main detection method combining all three layers.
         Returns detailed results with confidence scores.
+        
+        With deadline_ms, Layer 2 always runs, Layer 1 only as far as the
+        remaining budget allows and Layer 3 falls back to a cheaper check
+        when short of time; the result's 'budget' entry reports what was
+        skipped or truncated (see latency_budget). Only results that were not
+        degraded are cached.
+        """
+        trace = Trace('detect') if self.metrics is not None else None
+        budget = Budget(deadline_ms) if deadline_ms is not None else None
+        if self.cache is None:
+            result = self._detect_uncached(text, trace, budget)
+        else:
+            key = content_key(self.config_fingerprint(), text)
+            result = self.cache.get(key)
+            if trace is not None:
+                trace.count('cache_hits' if result is not None else 'cache_misses')
+            if result is None:
+                result = self._detect_uncached(text, trace, budget)
+                if budget is None:
+                    self.cache.put(key, result)
+                elif not result['budget']['degraded']:
+                    self.cache.put(key, {k: v for k, v in result.items() if k != 'budget'})
+            elif budget is not None:
+                result = {**result, 'budget': budget.report('full', len(text), 'full')}
+        
+        if trace is not None:
+            self._finish_trace(trace, [result])
+        return result
+    
+    def detect_rules_only(self, text: str) -> Dict:
+        """
+        Layers 2 and 3 without the transformer, for latency-critical callers.
+        Cheap enough that results are never cached.
+        """
+        return self._detect_from_ml(text, [])
+    
+    def detect_spans(self, text: str) -> List[PIIResult]:
+        """
+        Resolved, validated spans for one document, sorted by start and never
+        overlapping; what detect() reports, without building the report.
         """
+        if self.cascade:
+            ml_results = self._gated_ml_layer([text], batch_size=1)[0][0]
+        else:
+            ml_results = self.detect_ml_layer(text)
+        return self.validate_statistical_layer(text, self._candidates(text, ml_results))
+    
+    def redact(self, source: Union[str, TextIO], output: Optional[TextIO] = None,
+               strategy: str = 'mask', salt: str = '',
+               chunk_chars: int = DEFAULT_CHUNK_CHARS) -> Union[str, int]:
+        """
+        Redact a string or text file object in one streaming pass.
+        
+        strategy is 'mask', 'hash' (salted, stable per value) or 'type-token'.
+        With an output stream the redacted text is written there in windows of
+        chunk_chars characters and the number of spans replaced is returned;
+        otherwise the redacted string is returned.
+        """
+        if output is None:
+            if not isinstance(source, str):
+                source = source.read()
+            return redact_text(self.detect_spans, source, strategy, salt, chunk_chars)
+        return redact_stream(self.detect_spans, source, output, strategy, salt, chunk_chars)
+    
+    def scan_dataframe(self, df, columns: Optional[List] = None, output: str = 'findings',
+                       batch_size: int = 16, profiles: Optional[Dict] = None):
+        """
+        Scan pandas DataFrame columns, detecting each distinct cell value once.
+        Returns a tidy findings frame or, with output='mask', a boolean frame
+        of cells holding PII; see dataframe_scanner.scan_dataframe().
+        """
+        from dataframe_scanner import scan_dataframe
+        
+        return scan_dataframe(self, df, columns, output, batch_size, profiles=profiles)
+    
+    def profile_dataframe(self, df, columns: Optional[List] = None, sample_size: int = 100,
+                          seed: int = 0, batch_size: int = 16) -> Dict:
+        """
+        Label each column from a sample of its cells and decide which layers
+        a full scan of it needs; see column_profiler.profile_dataframe().
+        """
+        from column_profiler import profile_dataframe
+        
+        return profile_dataframe(self, df, columns, sample_size, seed, batch_size)
+    
+    def _detect_uncached(self, text: str, trace: Optional[Trace] = None,
+                         budget: Optional[Budget] = None) -> Dict:
+        """Run all three layers on one document"""
+        if budget is not None:
+            return self._detect_within(text, budget, trace)
+        
         # Layer 1: ML Detection
-        ml_results = self.detect_ml_layer(text)
+        if self.cascade:
+            with timed(trace, 'layer1'):
+                ml_batch, reports = self._gated_ml_layer([text], batch_size=1)
+            if trace is not None:
+                self._trace_layer1(trace, [text], reports)
+            return self._detect_from_ml(text, ml_batch[0], reports[0], trace)
+        with timed(trace, 'layer1'):
+            ml_results = self.detect_ml_layer(text)
+        if trace is not None:
+            self._trace_layer1(trace, [text])
         
-        # Layer 2: Rule Detection
-        rule_results = self.detect_rules_layer(text)
+        return self._detect_from_ml(text, ml_results, trace=trace)
+    
+    def _detect_within(self, text: str, budget: Budget, trace: Optional[Trace] = None) -> Dict:
+        """All three layers under a deadline: Layer 2 first, then Layer 1 and Layer 3 as time allows"""
+        with timed(trace, 'layer2'):
+            rule_results = self.detect_rules_layer(text)
         
-        # Merge initial results
-        candidates = self.merge_results(ml_results, rule_results)
+        # Layer 1 comes ahead of Layer 3, whose fallback costs next to nothing
+        with timed(trace, 'layer1'):
+            ml_results, covered, ran, cascade_report = self._budgeted_ml_layer(text, budget)
+        layer1 = 'full' if covered >= len(text) else 'truncated' if ran else 'skipped'
+        
+        with timed(trace, 'merge'):
+            candidates = self.merge_results(ml_results, rule_results, text)
+        
+        layer3 = 'full' if budget.fits(self.stage_costs.estimate('layer3', len(candidates))) else 'cheap'
+        with timed(trace, 'layer3'):
+            if layer3 == 'full':
+                started = time.perf_counter()
+                validated = self.validate_statistical_layer(text, candidates)
+                self.stage_costs.observe('layer3', time.perf_counter() - started, len(candidates))
+            else:
+                # Context and entropy scoring skipped: each candidate stands on its own confidence
+                validated = [c for c in candidates if c.confidence >= self.min_confidence]
+        
+        if trace is not None:
+            trace.count('layer2_candidates', len(rule_results))
+            trace.count('layer1_candidates', len(ml_results))
+            trace.count('validated', len(validated))
+            trace.count(f'layer1_{layer1}')
+            trace.count(f'layer3_{layer3}')
+        report = self._build_report(validated, cascade_report)
+        report['budget'] = budget.report(layer1, min(covered, len(text)), layer3)
+        return report
+    
+    def _budgeted_ml_layer(self, text: str, budget: Budget) -> Tuple[List[PIIResult], int, bool, Optional[Dict]]:
+        """
+        Layer 1 in document order while the estimated cost of the next
+        windows fits the remaining budget. Returns the
+        results, how many leading characters were fully covered, whether the
+        model ran at all, and the cascade report.
+        """
+        cascade_report = None
+        if self.cascade:
+            spans, skipped = self.gate_segments(text)
+            cascade_report = self._cascade_report(spans, skipped)
+        else:
+            spans = [(0, len(text))] if text.strip() else []
+        
+        results: List[PIIResult] = []
+        ran = False
+        for offset, end in spans:
+            piece = text[offset:end]
+            chunked = self._needs_chunking(piece)
+            windows = self._iter_windows(piece) if chunked else iter([(0, len(piece), 0, len(piece))])
+            found: List[PIIResult] = []
+            window = next(windows, None)
+            covered = 0
+            while window is not None:
+                affordable = self.stage_costs.affordable('layer1', budget.remaining())
+                affordable = len(piece) if affordable is None else affordable
+                batch, chars = [], 0
+                while (window is not None and len(batch) < self.chunk_batch_size
+                       and chars + window[1] - window[0] <= affordable):
+                    batch.append(window)
+                    chars += window[1] - window[0]
+                    window = next(windows, None)
+                if not batch:
+                    # Not even the next window fits: take the prefix of it that does, cut on whitespace
+                    start = window[0]
+                    cut = max(piece.rfind(ws, start + 1, start + affordable) for ws in (' ', '\n')) \
+                        if affordable >= self.MIN_PARTIAL_CHARS else -1
+                    if cut <= start:
+                        break
+                    batch, chars, window = [(start, cut, window[2], cut)], cut - start, None
+                
+                started = time.perf_counter()
+                outputs = self.ner_pipeline([piece[s:e] for s, e, _, _ in batch], batch_size=len(batch))
+                self.stage_costs.observe('layer1', time.perf_counter() - started, chars)
+                ran = True
+                for (start, _, own_start, own_end), entities in zip(batch, outputs):
+                    for result in self._entities_to_results(entities):
+                        result.start += start
+                        result.end += start
+                        if own_start <= result.start < own_end:
+                            found.append(result)
+                covered = batch[-1][3]
+            
+            if chunked:
+                found = self._merge_window_duplicates(piece, found)
+            for result in found:
+                result.start += offset
+                result.end += offset
+            results.extend(found)
+            if covered < len(piece):
+                return results, offset + covered, ran, cascade_report
+        return results, len(text), ran, cascade_report
+    
+    def detect_batch(self, texts: List[str], batch_size: int = 16) -> List[Dict]:
+        """
+        Batched version of detect().
+        Layer 1 runs over padded batches of documents; Layers 2 and 3 run per
+        document. Returns one result dict per input, in input order.
+        """
+        trace = Trace('detect_batch') if self.metrics is not None else None
+        if self.cache is None:
+            results = self._detect_batch_uncached(texts, batch_size, trace)
+        else:
+            results = self._detect_batch_cached(texts, batch_size, trace)
+        
+        if trace is not None:
+            self._finish_trace(trace, results)
+        return results
+    
+    def _detect_batch_cached(self, texts: List[str], batch_size: int,
+                             trace: Optional[Trace] = None) -> List[Dict]:
+        """detect_batch() with cache lookups in front of the layers"""
+        fingerprint = self.config_fingerprint()
+        keys = [content_key(fingerprint, text) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+        
+        # Each distinct uncached text is detected once, even if repeated in the batch
+        missing: Dict[str, List[int]] = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                missing.setdefault(key, []).append(i)
+        if trace is not None:
+            trace.count('cache_misses', len(missing))
+            trace.count('cache_hits', len(texts) - len(missing))
+        if missing:
+            fresh = self._detect_batch_uncached([texts[indices[0]] for indices in missing.values()],
+                                                batch_size, trace)
+            for (key, indices), result in zip(missing.items(), fresh):
+                self.cache.put(key, result)
+                results[indices[0]] = result
+                # Repeats get their own copy, as cache hits do, without a lookup that may miss
+                for i in indices[1:]:
+                    results[i] = copy.deepcopy(result)
+        return results
+    
+    def detect_batch_columns(self, texts: List[str], batch_size: int = 16,
+                             doc_ids: Optional[List[int]] = None,
+                             use_ml: bool = True) -> ResultColumns:
+        """
+        detect_batch() returning one ResultColumns for the whole batch instead
+        of a dict per document; nothing is built per finding beyond the
+        PIIResult itself. doc_ids default to positions in texts. Type and
+        layer codes are stable for a given detector configuration.
+        use_ml=False skips Layer 1, as detect_rules_only() does.
+        Bypasses the result cache, which stores per-document dicts.
+        """
+        trace = Trace('detect_batch_columns') if self.metrics is not None else None
+        validated, _ = self._validate_batch(texts, batch_size, trace, use_ml)
+        types = ['PER', 'LOC', 'ORG'] + [pattern['name'] for pattern in self.patterns.values()]
+        columns = ResultColumns.from_results(validated, doc_ids, types=list(dict.fromkeys(types)),
+                                             layers=('ML/NLP', 'Rules'))
+        if trace is not None:
+            trace.finish()
+            self.metrics.observe(trace)
+        return columns
+    
+    def _detect_batch_uncached(self, texts: List[str], batch_size: int,
+                               trace: Optional[Trace] = None) -> List[Dict]:
+        """Run all three layers on a batch of documents"""
+        validated, reports = self._validate_batch(texts, batch_size, trace)
+        return [self._build_report(results, report) for results, report in zip(validated, reports)]
+    
+    def _validate_batch(self, texts: List[str], batch_size: int, trace: Optional[Trace] = None,
+                        use_ml: bool = True) -> Tuple[List[List[PIIResult]], List[Optional[Dict]]]:
+        """Validated findings and cascade reports for a batch of documents"""
+        if not use_ml:
+            ml_batch, reports = [[] for _ in texts], [None] * len(texts)
+            if trace is not None:
+                trace.count('documents', len(texts))
+        else:
+            with timed(trace, 'layer1'):
+                if self.cascade:
+                    ml_batch, reports = self._gated_ml_layer(texts, batch_size)
+                else:
+                    ml_batch = self.detect_ml_layer_batch(texts, batch_size=batch_size)
+                    reports = [None] * len(texts)
+            if trace is not None:
+                self._trace_layer1(trace, texts, reports if self.cascade else None)
+        candidates = [self._candidates(text, ml_results, trace) for text, ml_results in zip(texts, ml_batch)]
+        with timed(trace, 'layer3'):
+            validated = self.validate_statistical_layer_batch(texts, candidates)
+        if trace is not None:
+            trace.count('layer1_candidates', sum(map(len, ml_batch)))
+            trace.count('validated', sum(map(len, validated)))
+        return validated, reports
+    
+    def _detect_from_ml(self, text: str, ml_results: List[PIIResult],
+                        cascade_report: Optional[Dict] = None,
+                        trace: Optional[Trace] = None) -> Dict:
+        """Run Layers 2 and 3 on top of Layer 1 results and build the report"""
+        candidates = self._candidates(text, ml_results, trace)
         
         # Layer 3: Statistical Validation
-        validated_results = self.validate_statistical_layer(text, candidates)
+        with timed(trace, 'layer3'):
+            validated_results = self.validate_statistical_layer(text, candidates)
+        if trace is not None:
+            trace.count('layer1_candidates', len(ml_results))
+            trace.count('validated', len(validated_results))
+        
+        return self._build_report(validated_results, cascade_report)
+    
+    def _candidates(self, text: str, ml_results: List[PIIResult],
+                    trace: Optional[Trace] = None) -> List[PIIResult]:
+        """Layer 2 plus merging with Layer 1: the input to Layer 3"""
+        # Layer 2: Rule Detection
+        with timed(trace, 'layer2'):
+            rule_results = self.detect_rules_layer(text)
         
+        # Merge initial results
+        with timed(trace, 'merge'):
+            merged = self.merge_results(ml_results, rule_results, text)
+        if trace is not None:
+            trace.count('layer2_candidates', len(rule_results))
+            trace.count('merged_candidates', len(merged))
+        return merged
+    
+    def _trace_layer1(self, trace: Trace, texts: List[str], reports: Optional[List[Dict]] = None):
+        """Record documents, gate decisions and, if the metrics count them, model tokens for a Layer 1 pass"""
+        trace.count('documents', len(texts))
+        if reports is None:
+            sent = [text for text in texts if text]
+        else:
+            sent = [text[start:end] for text, report in zip(texts, reports)
+                    for start, end in report['ner_segments']]
+            for report in reports:
+                trace.count('gate_segments_passed', len(report['ner_segments']))
+                trace.count('gate_segments_skipped', len(report['skipped_segments']))
+                trace.count('gate_documents_skipped', not report['ner_segments'])
+        if not self.metrics.count_tokens:
+            return
+        # A second tokenizer pass, timed apart so it does not inflate layer1
+        with timed(trace, 'token_count'):
+            tokenizer = self.ner_pipeline.tokenizer
+            trace.count('tokens', sum(len(tokenizer(chunk, add_special_tokens=False)['input_ids'])
+                                      for chunk in sent))
+    
+    def _finish_trace(self, trace: Trace, results: List[Dict]):
+        """Close the trace, aggregate it and attach it to each result of the call"""
+        trace.finish()
+        view = self.metrics.observe(trace)
+        for result in results:
+            result['metrics'] = view
+    
+    def _build_report(self, validated_results: List[PIIResult],
+                      cascade_report: Optional[Dict] = None) -> Dict:
+        """Result dict returned by detect()"""
         # Calculate overall metrics
         total_detected = len(validated_results)
         avg_confidence = (sum(r.confidence for r in validated_results) / total_detected 
                          if total_detected > 0 else 0)
         
-        return {
+        report = {
             'pii_detected': [
                 {
                     'text': r.text,
@@ -221,6 +1219,9 @@ class MultiLayerPIIDetector:
                 'target_accuracy': '99.8%'
             }
         }
+        if cascade_report is not None:
+            report['cascade'] = cascade_report
+        return report
 
 def main():
     """Demo of the multi-layer PII detection system"""
@@ -0,0 +1,130 @@
+"""
+Multi-Process Sharded Scanning
+Runs MultiLayerPIIDetector across a pool of worker processes
+
+Each worker builds its detector (and loads the transformer) exactly once,
+then receives whole batches of documents. Only a bounded number of batches
+is in flight at a time, so feeding the pool from a lazy reader keeps memory
+constant no matter how large the corpus is.
+
+Usage:
+    with ShardedDetector(workers=8) as sharded:
+        for doc_id, result in sharded.scan_documents(documents):
+            ...
+"""
+
+import os
+import sys
+import itertools
+import contextlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Detector owned by the current worker process, built by _init_worker
+_worker_detector = None
+
+
+def _init_worker(detector_kwargs: Dict, torch_threads: int):
+    """Load and warm up the model once per worker and pin its intra-op thread count"""
+    global _worker_detector
+    try:
+        import torch
+        # Without this every worker spawns one thread per core and they fight
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from multi_layer_detector import MultiLayerPIIDetector
+    # Keep startup messages off stdout, which may be carrying findings
+    with contextlib.redirect_stdout(sys.stderr):
+        _worker_detector = MultiLayerPIIDetector(**detector_kwargs)
+        _worker_detector.warmup()
+
+
+def _detect_in_worker(texts: List[str], batch_size: int) -> List[Dict]:
+    """Run one batch on this worker's detector"""
+    return _worker_detector.detect_batch(texts, batch_size=batch_size)
+
+
+class ShardedDetector:
+    """
+    Process-pool execution mode for the detector.
+
+    workers processes each hold one MultiLayerPIIDetector built from
+    detector_kwargs. At most max_pending batches are queued or running at
+    once (default: two per worker), which is what bounds memory.
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 detector_kwargs: Optional[Dict] = None,
+                 max_pending: Optional[int] = None,
+                 torch_threads: Optional[int] = None,
+                 start_method: str = 'spawn'):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        # 'spawn' avoids forking a parent that may already hold torch threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(detector_kwargs or {}, threads)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def map_batches(self, batches: Iterable[Tuple[Any, List[str]]],
+                    batch_size: int = 16,
+                    ordered: bool = True) -> Iterator[Tuple[Any, List[Dict]]]:
+        """
+        Detect over (key, texts) batches, yielding (key, results).
+
+        Keys stay in this process and are never pickled, so they can be
+        arbitrary bookkeeping objects. With ordered=True results come back in
+        submission order; otherwise each batch is yielded as soon as it is done.
+        """
+        batches = iter(batches)
+        pending = deque()
+
+        def submit(count: int):
+            for key, texts in itertools.islice(batches, count):
+                pending.append((key, self._executor.submit(_detect_in_worker, texts, batch_size)))
+
+        submit(self.max_pending)
+        while pending:
+            if ordered:
+                key, future = pending.popleft()
+                yield key, future.result()
+            else:
+                done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                for entry in [entry for entry in pending if entry[1] in done]:
+                    pending.remove(entry)
+                    yield entry[0], entry[1].result()
+            submit(self.max_pending - len(pending))
+
+    def scan_documents(self, documents: Iterable[Tuple[Any, str]],
+                       batch_size: int = 16,
+                       ordered: bool = True) -> Iterator[Tuple[Any, Dict]]:
+        """Stream (doc_id, text) pairs through the pool, yielding (doc_id, result)"""
+        documents = iter(documents)
+        chunks = iter(lambda: list(itertools.islice(documents, batch_size)), [])
+        batches = (([doc_id for doc_id, _ in chunk], [text for _, text in chunk])
+                   for chunk in chunks)
+
+        for doc_ids, results in self.map_batches(batches, batch_size, ordered):
+            yield from zip(doc_ids, results)
+
+    def detect_batch(self, texts: List[str], batch_size: int = 16) -> List[Dict]:
+        """Same contract as MultiLayerPIIDetector.detect_batch, spread across workers"""
+        documents = enumerate(texts)
+        return [result for _, result in self.scan_documents(documents, batch_size)]
@@ -0,0 +1,228 @@
+"""
+PII Detection Service
+FastAPI front end with dynamic micro-batching in front of the NER model
+
+Concurrent requests are queued and flushed to MultiLayerPIIDetector.detect_batch
+as one batch once either max_batch_size texts are waiting or max_wait_ms has
+passed since the first of them arrived. Each caller then gets its own slice of
+the batch back. Requests with rules_only=true skip the queue and the model
+entirely and are answered by Layers 2 and 3 on a small thread pool of their
+own, so a large rules-only batch never blocks the event loop.
+
+Usage:
+    python pii_service.py --port 8000 --max-batch-size 32 --max-wait-ms 5
+
+    curl -X POST localhost:8000/detect -H 'Content-Type: application/json' \\
+         -d '{"text": "Call John Smith at 555-123-4567"}'
+"""
+
+import asyncio
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from inference_backends import BACKENDS
+from detection_metrics import DetectionMetrics
+
+
+class DetectRequest(BaseModel):
+    text: str
+    rules_only: bool = False
+
+
+class BatchDetectRequest(BaseModel):
+    texts: List[str]
+    rules_only: bool = False
+
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent callers into detect_batch() calls.
+
+    The model runs on a single background thread, so the event loop keeps
+    accepting requests (and filling the next batch) while a batch is running.
+    """
+
+    def __init__(self, detector, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = {'requests': 0, 'batches': 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self):
+        """Begin collecting; must be called from the running event loop"""
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pii-model')
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop collecting and release the model thread"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def warmup(self):
+        """Load the model on the model thread before taking traffic"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.detector.warmup)
+
+    async def submit(self, text: str) -> Dict:
+        """Queue one text and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self) -> List:
+        """Block for the first item, then gather more until the size or time limit"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Requests that piled up while the last batch ran are taken without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. disconnected) are not worth inferring
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.detector.detect_batch, texts, self.max_batch_size)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def create_app(detector=None, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+               detector_kwargs: Optional[Dict] = None, warmup: bool = True,
+               rules_threads: int = 2) -> FastAPI:
+    """
+    Build the service around a detector (constructed here if not given).
+    With warmup, the model is loaded and exercised before the app starts serving.
+    rules_only requests run on rules_threads threads, apart from the model's.
+    """
+    if detector is None:
+        from multi_layer_detector import MultiLayerPIIDetector
+        detector = MultiLayerPIIDetector(**(detector_kwargs or {}))
+    batcher = MicroBatcher(detector, max_batch_size, max_wait_ms)
+
+    def rules_only_batch(texts: List[str]) -> List[Dict]:
+        return [detector.detect_rules_only(text) for text in texts]
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        batcher.start()
+        app.state.rules_executor = ThreadPoolExecutor(max_workers=rules_threads,
+                                                      thread_name_prefix='pii-rules')
+        if warmup:
+            await batcher.warmup()
+        yield
+        await batcher.stop()
+        app.state.rules_executor.shutdown(wait=True)
+
+    app = FastAPI(title="Enterprise PII Detection", lifespan=lifespan)
+    app.state.detector = detector
+    app.state.batcher = batcher
+
+    @app.post("/detect")
+    async def detect(request: DetectRequest) -> Dict:
+        if request.rules_only:
+            return await asyncio.get_running_loop().run_in_executor(
+                app.state.rules_executor, detector.detect_rules_only, request.text)
+        return await batcher.submit(request.text)
+
+    @app.post("/detect/batch")
+    async def detect_batch(request: BatchDetectRequest) -> Dict:
+        if request.rules_only:
+            results = await asyncio.get_running_loop().run_in_executor(
+                app.state.rules_executor, rules_only_batch, request.texts)
+        else:
+            # Each text joins the shared queue, so batches mix callers
+            results = await asyncio.gather(*(batcher.submit(text) for text in request.texts))
+        return {'results': list(results)}
+
+    @app.get("/stats")
+    async def stats() -> Dict:
+        batches = batcher.stats['batches']
+        return {**batcher.stats,
+                'average_batch_size': round(batcher.stats['requests'] / batches, 2) if batches else 0.0}
+
+    if detector.metrics is not None:
+        @app.get("/metrics", response_class=PlainTextResponse)
+        async def metrics() -> str:
+            # Prometheus text exposition format
+            return detector.metrics.to_prometheus()
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve the API with uvicorn"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve PII detection over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model', default="dslim/bert-base-NER", help="Layer 1 model name or path")
+    parser.add_argument('--cascade', choices=('document', 'sentence'),
+                        help="Skip Layer 1 where a cheap gate rules out PER/LOC/ORG")
+    parser.add_argument('--validate-rules', action='store_true',
+                        help="Drop rule matches failing Luhn, SSN, calendar or NANP checks")
+    parser.add_argument('--max-batch-size', type=int, default=32, help="Texts per model batch")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="Longest a queued text waits for its batch to fill")
+    parser.add_argument('--rules-threads', type=int, default=2,
+                        help="Threads serving rules_only requests, apart from the model thread")
+    parser.add_argument('--backend', choices=BACKENDS, default='pytorch',
+                        help="Layer 1 runtime; ONNX backends take an exported directory as --model")
+    parser.add_argument('--local-files-only', action='store_true',
+                        help="Load the model from a local snapshot without contacting the hub")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Record per-stage timings and serve them at /metrics")
+    args = parser.parse_args(argv)
+
+    app = create_app(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                     rules_threads=args.rules_threads,
+                     detector_kwargs={'model_name': args.model, 'cascade': args.cascade,
+                                      'local_files_only': args.local_files_only,
+                                      'backend': args.backend,
+                                      'validate_rules': args.validate_rules,
+                                      'metrics': DetectionMetrics() if args.metrics else None})
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Pipelined Detection
+Thread-based execution mode that overlaps the detector's stages
+
+Layer 1 spends most of its time in the model's forward pass, which runs
+outside the GIL, so other Python work can proceed on other threads
+meanwhile. PipelinedDetector uses that in two ways:
+
+    detect()        Layer 2 runs on a pool thread while Layer 1 runs on
+                    the calling thread; merge and Layer 3 follow once both
+                    are done
+    detect_batch()  documents flow through three stages, each on its own
+    scan_documents()  thread and connected by bounded queues:
+
+                    prepare   gate, Layer 2, windowing of long documents
+                              and tokenization of batch N+1
+                    model     forward passes of batch N
+                    finish    entity decoding, merge and Layer 3 of batch
+                              N-1, on the consuming thread
+
+queue_depth bounds how many batches wait between two stages, which is what
+bounds memory. torch_threads pins PyTorch's intra-op thread count for the
+process; leave cores for the prepare and finish stages.
+
+Results match the detector's own, except that the result cache and metrics
+are bypassed, as in detect_batch_columns(). Segments longer than one window
+are always windowed here, whatever the detector's chunking setting, because
+the split model stages cannot take more than one window per input.
+
+Usage:
+    with PipelinedDetector(detector, queue_depth=2, torch_threads=6) as pipelined:
+        results = pipelined.detect_batch(texts, batch_size=16)
+        for doc_id, result in pipelined.scan_documents(documents):
+            ...
+"""
+
+import queue
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from multi_layer_detector import MultiLayerPIIDetector, PIIResult
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+@dataclass
+class _Batch:
+    """One batch of documents on its way through the pipeline"""
+    keys: List[Any]
+    texts: List[str]
+    rule_results: List[List[PIIResult]] = field(default_factory=list)
+    reports: List[Optional[Dict]] = field(default_factory=list)
+    # Spans of the documents that go to Layer 1: (doc, offset, text, chunked)
+    segments: List[Tuple[int, int, str, bool]] = field(default_factory=list)
+    # Model inputs, in model batches: (segment, start, own_start, own_end, text),
+    # where a whole short segment is one piece and a long one is one per window
+    pieces: List[List[Tuple[int, int, int, int, str]]] = field(default_factory=list)
+    encoded: List[Any] = field(default_factory=list)
+    outputs: List[Any] = field(default_factory=list)
+
+
+class _StageFailed:
+    """Carries an exception raised in a stage thread to the consumer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class PipelinedDetector:
+    """
+    Thread-pool execution mode for the detector.
+
+    Wraps a MultiLayerPIIDetector and shares its model, rules and
+    configuration. rule_threads threads serve Layer 2 for detect().
+    """
+
+    def __init__(self, detector: MultiLayerPIIDetector,
+                 queue_depth: int = 2,
+                 torch_threads: Optional[int] = None,
+                 rule_threads: int = 1):
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
+        self.detector = detector
+        self.queue_depth = queue_depth
+        if torch_threads:
+            try:
+                import torch
+                torch.set_num_threads(torch_threads)
+            except ImportError:
+                pass
+        self._rules = ThreadPoolExecutor(max_workers=rule_threads, thread_name_prefix='pii-rules')
+        # Fast tokenizers fail when one thread reconfigures them while another uses them
+        self._tokenizer_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the Layer 2 threads"""
+        self._rules.shutdown(wait=True)
+
+    def detect(self, text: str) -> Dict:
+        """detect() with Layers 1 and 2 running concurrently"""
+        detector = self.detector
+        rules = self._rules.submit(detector.detect_rules_layer, text)
+
+        cascade_report = None
+        if detector.cascade:
+            ml_batch, reports = detector._gated_ml_layer([text], batch_size=1)
+            ml_results, cascade_report = ml_batch[0], reports[0]
+        else:
+            ml_results = detector.detect_ml_layer(text)
+
+        candidates = detector.merge_results(ml_results, rules.result(), text)
+        validated = detector.validate_statistical_layer(text, candidates)
+        return detector._build_report(validated, cascade_report)
+
+    def detect_batch(self, texts: List[str], batch_size: int = 16) -> List[Dict]:
+        """Same contract as MultiLayerPIIDetector.detect_batch, run as a staged pipeline"""
+        return [result for _, result in self.scan_documents(enumerate(texts), batch_size)]
+
+    def scan_documents(self, documents: Iterable[Tuple[Any, str]],
+                       batch_size: int = 16) -> Iterator[Tuple[Any, Dict]]:
+        """Stream (doc_id, text) pairs through the pipeline, yielding (doc_id, result) in order"""
+        documents = iter(documents)
+        chunks = iter(lambda: list(itertools.islice(documents, batch_size)), [])
+        batches = (_Batch([doc_id for doc_id, _ in chunk], [text for _, text in chunk])
+                   for chunk in chunks)
+
+        stop = threading.Event()
+        prepared = queue.Queue(maxsize=self.queue_depth)
+        modelled = queue.Queue(maxsize=self.queue_depth)
+        threads = [
+            threading.Thread(target=self._run_stage, name='pii-prepare', daemon=True,
+                             args=(lambda: batches, lambda batch: self._prepare(batch, batch_size),
+                                   prepared, stop)),
+            threading.Thread(target=self._run_stage, name='pii-model', daemon=True,
+                             args=(lambda: _drain(prepared, stop), self._model, modelled, stop)),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in _drain(modelled, stop):
+                if isinstance(batch, _StageFailed):
+                    raise batch.error
+                yield from zip(batch.keys, self._finish(batch))
+        finally:
+            # Unblocks the stages if the consumer stops early or a stage failed
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    @staticmethod
+    def _run_stage(source, work, output: queue.Queue, stop: threading.Event):
+        """Apply work to every item of source, passing results (or a failure) downstream"""
+        try:
+            for item in source():
+                if isinstance(item, _StageFailed):
+                    _put(output, item, stop)
+                    return
+                if stop.is_set() or not _put(output, work(item), stop):
+                    return
+        except Exception as error:
+            _put(output, _StageFailed(error), stop)
+            return
+        _put(output, _DONE, stop)
+
+    def _prepare(self, batch: _Batch, batch_size: int) -> _Batch:
+        """Stage 1: gate, Layer 2, windowing and tokenization"""
+        detector = self.detector
+        for i, text in enumerate(batch.texts):
+            batch.rule_results.append(detector.detect_rules_layer(text))
+            if detector.cascade:
+                spans, skipped = detector.gate_segments(text)
+                batch.reports.append(detector._cascade_report(spans, skipped))
+            else:
+                # Empty documents have no tokens and cannot be fed to the model
+                spans = [(0, len(text))] if text.strip() else []
+                batch.reports.append(None)
+            for start, end in spans:
+                segment = text[start:end]
+                # Windowed even with chunking off: encode() cuts inputs at the
+                # model's limit, so a long segment sent whole would lose its tail
+                batch.segments.append((i, start, segment, len(segment) > detector._window_tokens()))
+
+        backend = detector.ner_pipeline
+        with self._tokenizer_lock:
+            pieces = []
+            for s, (_, _, segment, chunked) in enumerate(batch.segments):
+                if chunked:
+                    pieces.extend((s, start, own_start, own_end, segment[start:end])
+                                  for start, end, own_start, own_end in detector._iter_windows(segment))
+                else:
+                    pieces.append((s, 0, 0, len(segment), segment))
+            # Sorted by length so each padded model batch holds similarly sized inputs
+            pieces.sort(key=lambda piece: len(piece[4]))
+            for offset in range(0, len(pieces), batch_size):
+                batch.pieces.append(pieces[offset:offset + batch_size])
+                batch.encoded.append(_encode(backend, [piece[4] for piece in batch.pieces[-1]]))
+        return batch
+
+    def _model(self, batch: _Batch) -> _Batch:
+        """Stage 2: forward passes"""
+        backend = self.detector.ner_pipeline
+        batch.outputs = [_forward(backend, encoded) for encoded in batch.encoded]
+        return batch
+
+    def _finish(self, batch: _Batch) -> List[Dict]:
+        """Stage 3: decoding, merge, Layer 3 and reports"""
+        detector = self.detector
+        backend = detector.ner_pipeline
+        found: List[List[PIIResult]] = [[] for _ in batch.segments]
+        for pieces, encoded, outputs in zip(batch.pieces, batch.encoded, batch.outputs):
+            with self._tokenizer_lock:
+                entities = _decode(backend, [piece[4] for piece in pieces], encoded, outputs)
+            for (s, start, own_start, own_end, _), piece_entities in zip(pieces, entities):
+                for result in detector._entities_to_results(piece_entities):
+                    result.start += start
+                    result.end += start
+                    # Each window only keeps entities starting in its own share of the overlap
+                    if own_start <= result.start < own_end:
+                        found[s].append(result)
+
+        ml_batch: List[List[PIIResult]] = [[] for _ in batch.texts]
+        for (i, offset, segment, chunked), results in zip(batch.segments, found):
+            if chunked:
+                results = detector._merge_window_duplicates(segment, results)
+            for result in results:
+                result.start += offset
+                result.end += offset
+            ml_batch[i].extend(results)
+
+        candidates = [detector.merge_results(ml_results, rule_results, text)
+                      for text, ml_results, rule_results in zip(batch.texts, ml_batch, batch.rule_results)]
+        validated = detector.validate_statistical_layer_batch(batch.texts, candidates)
+        return [detector._build_report(results, report)
+                for results, report in zip(validated, batch.reports)]
+
+
+def _put(output: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item on a bounded queue, giving up once stop is set"""
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(source: queue.Queue, stop: threading.Event) -> Iterator:
+    """Items of a stage's output queue up to its end marker, or until stop is set"""
+    while not stop.is_set():
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        yield item
+        if isinstance(item, _StageFailed):
+            return
+
+
+# Backends that cannot be split (e.g. wrapped pipelines) run whole in the model stage
+
+def _encode(backend, texts: List[str]):
+    encode = getattr(backend, 'encode', None)
+    return encode(texts) if encode is not None else texts
+
+
+def _forward(backend, encoded):
+    if hasattr(backend, 'forward'):
+        return backend.forward(encoded)
+    return backend(list(encoded), batch_size=len(encoded))
+
+
+def _decode(backend, texts: List[str], encoded, outputs) -> List[List[Dict]]:
+    decode = getattr(backend, 'decode', None)
+    return decode(texts, encoded, outputs) if decode is not None else outputs
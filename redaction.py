@@ -0,0 +1,122 @@
+"""
+Streaming Redaction
+Writes redacted text straight to an output stream from resolved PII spans
+
+The input, a string or a text file object, is consumed in windows of
+chunk_chars characters. Each window is detected together with a little
+already-written text on its left (for context) and everything not yet
+written on its right; spans are replaced as the window is copied to the
+output, and only the undecided tail of the window (the last overlap_chars
+characters, cut at whitespace) is carried into the next one. Memory stays
+at a few windows, however large the document, and nothing builds finding
+dicts or repeated copies of the whole text.
+
+Strategies:
+    mask        Replace every character of the value with '*' (offsets survive)
+    hash        [TYPE:digest], a salted SHA-256 prefix that is stable per value
+    type-token  [TYPE]
+"""
+
+import io
+import hashlib
+from typing import Callable, Iterator, List, TextIO, Union
+
+REDACTION_STRATEGIES = ('mask', 'hash', 'type-token')
+
+DEFAULT_CHUNK_CHARS = 1 << 20
+DEFAULT_OVERLAP_CHARS = 256
+DEFAULT_CONTEXT_CHARS = 256
+
+
+def _type_label(pii_type: str) -> str:
+    return pii_type.upper().replace(' ', '_')
+
+
+def replacement_for(strategy: str, salt: str = '') -> Callable:
+    """Function mapping a resolved span to its replacement text"""
+    if strategy == 'mask':
+        return lambda span: '*' * (span.end - span.start)
+    if strategy == 'hash':
+        def hashed(span) -> str:
+            digest = hashlib.sha256((salt + span.text).encode('utf-8', errors='surrogatepass'))
+            return f"[{_type_label(span.pii_type)}:{digest.hexdigest()[:12]}]"
+        return hashed
+    if strategy == 'type-token':
+        return lambda span: f"[{_type_label(span.pii_type)}]"
+    raise ValueError(f"Unknown redaction strategy '{strategy}', expected one of {REDACTION_STRATEGIES}")
+
+
+def iter_chunks(source: Union[str, TextIO], chunk_chars: int) -> Iterator[str]:
+    """Slices of a string, or successive reads from a text file object"""
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_chars):
+            yield source[i:i + chunk_chars]
+        return
+    while True:
+        chunk = source.read(chunk_chars)
+        if not chunk:
+            return
+        if isinstance(chunk, bytes):
+            raise TypeError("redact() needs a text stream; open the file in text mode")
+        yield chunk
+
+
+def _safe_cut(window: str, limit: int, floor: int) -> int:
+    """Last whitespace at or before limit (but after floor), so no token is split"""
+    cut = max(window.rfind(' ', floor, limit), window.rfind('\n', floor, limit))
+    return cut + 1 if cut >= 0 else limit
+
+
+def redact_stream(detect_spans: Callable[[str], List], source: Union[str, TextIO],
+                  output: TextIO, strategy: str = 'mask', salt: str = '',
+                  chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                  overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+                  context_chars: int = DEFAULT_CONTEXT_CHARS) -> int:
+    """
+    Redact source into output using detect_spans(text) -> sorted, non-overlapping
+    spans. Returns the number of spans replaced.
+    """
+    replace = replacement_for(strategy, salt)
+    context = ''    # already written, kept only so detection sees left context
+    pending = ''    # read but not yet written
+    redacted = 0
+
+    chunks = iter_chunks(source, chunk_chars)
+    chunk = next(chunks, None)
+    while chunk is not None:
+        following = next(chunks, None)
+        window = context + pending + chunk
+        start = len(context)
+        if following is None:
+            cut = len(window)
+        else:
+            cut = _safe_cut(window, max(start, len(window) - overlap_chars), start)
+
+        position = start
+        for span in detect_spans(window):
+            # Spans starting in the context were decided by an earlier window;
+            # spans starting past the cut are left for the next one
+            if span.start < position or span.start >= cut:
+                continue
+            output.write(window[position:span.start])
+            output.write(replace(span))
+            position = span.end
+            redacted += 1
+        cut = max(cut, position)
+        output.write(window[position:cut])
+
+        context = window[max(0, cut - context_chars):cut]
+        pending = window[cut:]
+        chunk = following
+
+    if pending:
+        output.write(pending)
+    return redacted
+
+
+def redact_text(detect_spans: Callable[[str], List], text: str, strategy: str = 'mask',
+                salt: str = '', chunk_chars: int = DEFAULT_CHUNK_CHARS) -> str:
+    """Redacted copy of a string"""
+    output = io.StringIO()
+    redact_stream(detect_spans, text, output, strategy, salt, chunk_chars)
+    return output.getvalue()
@@ -0,0 +1,164 @@
+"""
+Content-Addressed Result Cache
+Bounded in-memory LRU with an optional SQLite tier for detect() results
+
+Keys are hashes of the document text together with a fingerprint of the
+detector configuration, so any change to the model, patterns or thresholds
+produces new keys and stale results are simply never looked up again (they
+age out of the LRU). Values are stored as JSON strings, which keeps memory
+compact and hands every caller its own fresh copy.
+
+A ResultCache pickles as its settings only, so passing one to worker
+processes gives each worker its own LRU backed by the same SQLite file.
+"""
+
+import json
+import sqlite3
+import hashlib
+import threading
+import multiprocessing.util
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def _commit_quietly(db: sqlite3.Connection):
+    """Exit-time commit; the connection may already have been closed"""
+    try:
+        db.commit()
+    except sqlite3.ProgrammingError:
+        pass
+
+
+def content_key(fingerprint: str, text: str) -> str:
+    """Cache key for a document under a given detector configuration"""
+    digest = hashlib.sha256(fingerprint.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', errors='surrogatepass'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for detection results.
+
+    max_entries bounds the in-memory LRU. If path is given, results are also
+    written to a SQLite database there, which survives restarts and is
+    consulted on memory misses. Disk writes are committed every commit_every
+    puts and on flush()/close().
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: Optional[str] = None,
+                 commit_every: int = 100):
+        self.max_entries = max_entries
+        self.path = path
+        self.commit_every = commit_every
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0,
+                       'disk_hits': 0, 'evictions': 0, 'writes': 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results "
+                             "(key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+            # Worker processes exit without running atexit hooks, but they do
+            # run multiprocessing finalizers, so pending writes are not lost
+            multiprocessing.util.Finalize(self, _commit_quietly, args=(self._db,), exitpriority=10)
+
+    def __getstate__(self) -> Dict:
+        return {'max_entries': self.max_entries, 'path': self.path,
+                'commit_every': self.commit_every}
+
+    def __setstate__(self, state: Dict):
+        self.__init__(**state)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result for key, or None"""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats['hits'] += 1
+                self._stats['memory_hits'] += 1
+                return json.loads(value)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self._stats['hits'] += 1
+                    self._stats['disk_hits'] += 1
+                    return json.loads(row[0])
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key: str, result: Dict):
+        """Store a result in memory and, if configured, on disk"""
+        value = json.dumps(result)
+        with self._lock:
+            self._remember(key, value)
+            self._stats['writes'] += 1
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                                 (key, value))
+                self._pending_writes += 1
+                if self._pending_writes >= self.commit_every:
+                    self._commit()
+
+    def _remember(self, key: str, value: str):
+        """Insert into the LRU, evicting the least recently used entries"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _commit(self):
+        """Commit pending disk writes (caller holds the lock)"""
+        if self._db is not None and self._pending_writes:
+            self._db.commit()
+            self._pending_writes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters plus current sizes"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            stats = dict(self._stats)
+            stats['entries'] = len(self._memory)
+            stats['hit_rate'] = round(self._stats['hits'] / lookups, 4) if lookups else 0.0
+            if self._db is not None:
+                stats['disk_entries'] = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return stats
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+                self._pending_writes = 0
+
+    def flush(self):
+        """Make all disk writes durable"""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """Flush and close the disk tier"""
+        with self._lock:
+            self._commit()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,112 @@
+"""
+Rule Candidate Validators
+Structural checks that drop impossible Layer 2 matches before Layer 3
+
+The Layer 2 regexes describe the shape of a value, so order IDs, timestamps
+and routing numbers match them too. A pattern may name one of these
+validators with its 'validator' key; with validate_rules=True the detector
+drops every match that fails it, before merging and Layer 3 scoring.
+
+    luhn    card number with a valid Luhn checksum, 13 to 19 digits
+    ssn     SSN area not 000, 666 or 9xx; group not 00; serial not 0000
+    date    a real calendar date as MM/DD/YYYY or DD/MM/YYYY
+    nanp    NANP number: area code and exchange start with 2-9, are not
+            N11 service codes, and the area code's middle digit is not 9
+
+Each check is a few microseconds of plain Python on a short string.
+
+Usage:
+    detector = MultiLayerPIIDetector(validate_rules=True)
+    detector.detect(text)
+    print(detector.validator_summary())
+"""
+
+import re
+from typing import Callable, Dict
+
+_NON_DIGITS = re.compile(r'\D')
+# Separators the Layer 2 patterns allow between digits
+_SEPARATORS = str.maketrans('', '', ' -.()+/')
+# Luhn doubling of each digit, with the two digits of the product summed
+_DOUBLED = str.maketrans('0123456789', '0246813579')
+_MONTH_DAYS = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _digits(value: str) -> str:
+    """The ASCII digits of value, separators dropped"""
+    digits = value.translate(_SEPARATORS)
+    if digits.isascii() and digits.isdigit():
+        return digits
+    # Other whitespace or non-ASCII digits, which \d also matches
+    return ''.join(str(int(c)) for c in _NON_DIGITS.sub('', value))
+
+
+def luhn_valid(value: str) -> bool:
+    """Card number passing the Luhn checksum"""
+    digits = _digits(value)
+    if not 13 <= len(digits) <= 19:
+        return False
+    # Summing the ASCII codes and subtracting ord('0') per digit avoids int() per digit
+    total = sum(digits[-1::-2].encode()) + sum(digits[-2::-2].translate(_DOUBLED).encode()) - 48 * len(digits)
+    return total % 10 == 0
+
+
+def ssn_valid(value: str) -> bool:
+    """SSN with an area, group and serial that can be issued"""
+    digits = _digits(value)
+    if len(digits) != 9:
+        return False
+    area = digits[:3]
+    return (area != '000' and area != '666' and area[0] != '9'
+            and digits[3:5] != '00' and digits[5:] != '0000')
+
+
+def date_valid(value: str) -> bool:
+    """Slash-separated date that exists in the calendar, read month-first or day-first"""
+    parts = value.split('/')
+    if len(parts) != 3:
+        return False
+    first, second, year = (int(part) for part in parts)
+    if year < 1:
+        return False
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+    def exists(month: int, day: int) -> bool:
+        return 1 <= month <= 12 and 1 <= day <= _MONTH_DAYS[month - 1] - (month == 2 and not leap)
+
+    return exists(first, second) or exists(second, first)
+
+
+def nanp_valid(value: str) -> bool:
+    """North American number with a well-formed area code and exchange"""
+    digits = _digits(value)
+    if len(digits) == 11 and digits[0] == '1':
+        digits = digits[1:]
+    if len(digits) != 10:
+        return False
+    area, exchange = digits[:3], digits[3:6]
+    for code in (area, exchange):
+        if code[0] in '01' or code[1:] == '11':
+            return False
+    return area[1] != '9'
+
+
+VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    'luhn': luhn_valid,
+    'ssn': ssn_valid,
+    'date': date_valid,
+    'nanp': nanp_valid,
+}
+
+
+def resolve_validators(patterns: Dict[str, Dict]) -> Dict[str, Callable[[str], bool]]:
+    """Pattern key -> check, for the patterns of a registry that name a validator"""
+    checks = {}
+    for pii_type, config in patterns.items():
+        name = config.get('validator')
+        if name is None:
+            continue
+        if name not in VALIDATORS:
+            raise ValueError(f"Unknown validator {name!r} for '{pii_type}', expected one of {sorted(VALIDATORS)}")
+        checks[pii_type] = VALIDATORS[name]
+    return checks
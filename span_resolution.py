@@ -0,0 +1,132 @@
+"""
+Span Resolution
+Resolves overlapping PII detections from different layers into a final set
+
+A sweep-line pass first splits the spans into chains of mutually reachable
+overlaps; spans in different chains cannot affect each other, so each chain
+is resolved on its own. Every policy is O(n log n) in sorting and searching
+and gives the same answer whatever order the spans arrive in:
+
+    highest_confidence  Greedy selection by confidence (then length). A span
+                        is kept unless it overlaps a span already kept in its
+                        chain, checked by bisecting a sorted interval list.
+    longest             Same, but longer spans win and confidence breaks ties.
+    union               Sweep-line: chains of overlapping spans collapse into
+                        one span covering all of them, typed after the most
+                        confident member.
+
+prefer_rules_for lists PII types (e.g. 'Social Security Number') whose
+rule-based detections beat any overlapping span, whatever the policy ranking
+would otherwise say. Spans are any dataclass with text, pii_type, confidence,
+start, end and detection_layer fields, such as PIIResult.
+"""
+
+import bisect
+import dataclasses
+from typing import Iterable, Iterator, List, Optional
+
+MERGE_POLICIES = ('highest_confidence', 'longest', 'union')
+
+RULES_LAYER = 'Rules'
+
+
+def resolve_spans(spans: Iterable, policy: str = 'highest_confidence',
+                  prefer_rules_for: Iterable[str] = (),
+                  text: Optional[str] = None) -> List:
+    """
+    Resolve overlapping spans under the given policy, returning them by start.
+    text, if given, is used to fill in the text of merged union spans.
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"Unknown merge policy '{policy}', expected one of {MERGE_POLICIES}")
+    spans = list(spans)
+    preferred = frozenset(prefer_rules_for)
+
+    if policy == 'union':
+        return _union(spans, preferred, text)
+    return _select(spans, policy, preferred)
+
+
+def _is_preferred(span, preferred: frozenset) -> bool:
+    """Rule detections of a preferred type outrank everything else"""
+    return span.detection_layer == RULES_LAYER and span.pii_type in preferred
+
+
+def _priority(span, policy: str, preferred: frozenset) -> tuple:
+    """Sort key where smaller is better; fully ordered so results are deterministic"""
+    length = span.end - span.start
+    if policy == 'longest':
+        rank = (-length, -span.confidence)
+    else:
+        rank = (-span.confidence, -length)
+    return (not _is_preferred(span, preferred),) + rank + (
+        span.start, span.end, span.pii_type, span.detection_layer)
+
+
+def _components(spans: List) -> Iterator[List]:
+    """Sweep-line over spans sorted by start, yielding chains of overlapping spans"""
+    group: List = []
+    group_end = None
+    for span in sorted(spans, key=lambda s: (s.start, s.end)):
+        if group and span.start < group_end:
+            group.append(span)
+            group_end = max(group_end, span.end)
+        else:
+            if group:
+                yield group
+            group, group_end = [span], span.end
+    if group:
+        yield group
+
+
+def _select(spans: List, policy: str, preferred: frozenset) -> List:
+    """Greedy non-overlapping selection in priority order, one component at a time"""
+    kept: List = []
+    for group in _components(spans):
+        if len(group) == 1:
+            kept.append(group[0])
+            continue
+
+        starts: List[int] = []
+        ends: List[int] = []
+        chosen: List = []
+        for span in sorted(group, key=lambda s: _priority(s, policy, preferred)):
+            # Chosen spans never overlap, so sorting by start also sorts by end
+            # and only the neighbours on either side can collide with a span
+            i = bisect.bisect_right(starts, span.start)
+            if i > 0 and ends[i - 1] > span.start:
+                continue
+            if i < len(starts) and starts[i] < span.end:
+                continue
+            starts.insert(i, span.start)
+            ends.insert(i, span.end)
+            chosen.append(span)
+        kept.extend(sorted(chosen, key=lambda s: s.start))
+
+    return kept
+
+
+def _union(spans: List, preferred: frozenset, text: Optional[str]) -> List:
+    """Collapse each chain of overlapping spans into one covering span"""
+    return [_combine(group, preferred, text) for group in _components(spans)]
+
+
+def _combine(group: List, preferred: frozenset, text: Optional[str]):
+    """One span covering the whole group, typed after its best member"""
+    if len(group) == 1:
+        return group[0]
+    best = min(group, key=lambda s: _priority(s, 'highest_confidence', preferred))
+    start = group[0].start
+    end = max(span.end for span in group)
+
+    if text is not None:
+        value = text[start:end]
+    else:
+        # Stitch member texts together along their offsets
+        value, covered = group[0].text, group[0].end
+        for span in group[1:]:
+            if span.end > covered:
+                value += span.text[max(0, covered - span.start):]
+                covered = span.end
+
+    return dataclasses.replace(best, text=value, start=start, end=end)
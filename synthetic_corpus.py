@@ -0,0 +1,532 @@
+"""
+Synthetic Labeled Corpus
+Seeded generator of healthcare, financial and legal documents with gold spans
+
+Documents are built from sentence templates in the style of the samples in
+notebooks/01_baseline_evaluation.py. Template slots are filled with values
+drawn in bulk with NumPy: names, places and organisations (gold PER, LOC
+and ORG), values for every Layer 2 pattern (gold labels named like the
+detector's pii_type, e.g. 'Social Security Number'), and unlabelled noise
+such as MRNs, NPIs, amounts, case numbers and admission or court dates.
+Generated values are valid: card numbers pass Luhn, SSNs and phone numbers
+follow issuing rules and dates exist, so rule_validators accepts every one.
+
+Sentence offsets and labels are computed with one cumulative sum per shard
+rather than per document. Every shard has its own seed derived from (seed,
+shard index), so a corpus is identical whatever the worker count, and
+shards can be generated in parallel.
+
+Knobs for stress tests:
+    pii_density     fraction of sentences that carry PII
+    length          sentences per document: 'fixed', 'uniform',
+                    'lognormal' or 'pareto' (long tail, for chunking)
+    mean_sentences  mean of that distribution, capped at max_sentences
+    paragraph_rate  fraction of sentence breaks that are line breaks
+
+Usage:
+    paths = write_corpus("corpus/", num_docs=1_000_000, fmt='parquet', workers=8)
+    for document in read_corpus(paths[0]):
+        print(document.text, document.labels)
+
+    python synthetic_corpus.py corpus/ --docs 1000000 --format jsonl --pii-density 0.5
+"""
+
+import os
+import sys
+import json
+import string
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from multi_layer_detector import DEFAULT_PATTERNS
+
+FORMATS = ('jsonl', 'parquet')
+LENGTH_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal', 'pareto')
+
+# Slot name -> gold label; slots not listed here are unlabelled noise
+LABELS: Dict[str, str] = {'PER': 'PER', 'LOC': 'LOC', 'ORG': 'ORG'}
+LABELS.update({key: config['name'] for key, config in DEFAULT_PATTERNS.items()})
+
+# Sentences with at least one labelled slot, and filler, per domain
+TEMPLATES = {
+    'healthcare': {
+        'pii': [
+            "Patient {PER}, MRN {mrn}, SSN {ssn}, admitted on {date}.",
+            "Emergency contact: {PER} at {email} or {phone}.",
+            "{PER} was referred to {ORG} in {LOC} for follow-up.",
+            "Insurance ID: {insurance}, Group: {group}, Phone: {phone}.",
+            "Prescription for {PER}, NPI: {npi}, billed to card {credit_card}.",
+            "Home address on file for {PER}: {address}, {LOC}.",
+            "DOB: {dob}. Attending physician: Dr. {PER}.",
+        ],
+        'filler': [
+            "Vitals were stable throughout the {hours} hour observation period.",
+            "Prescription for amoxicillin {dose}mg, twice daily for {days} days.",
+            "The patient denies chest pain or shortness of breath.",
+            "Lab results are pending and will be reviewed at the next visit.",
+            "Follow-up imaging is scheduled in {days} days.",
+        ],
+    },
+    'financial': {
+        'pii': [
+            "Account holder: {PER}, Account: {account}, Routing: {routing}.",
+            "Card {credit_card} was charged {amount} for the {PER} account.",
+            "Statements for {PER} are mailed to {address} in {LOC}.",
+            "Wire transfer from {ORG} approved; contact {email} with questions.",
+            "Customer SSN {ssn} verified by phone at {phone}.",
+            "Loan officer {PER} of {ORG} confirmed the {amount} disbursement.",
+        ],
+        'filler': [
+            "Wire transfer reference: WT-{year}-{reference}, Amount: {amount}.",
+            "The quarterly statement closed with a balance of {amount}.",
+            "Interest accrued at {rate}% over the billing period.",
+            "Transaction {reference} settled after {days} business days.",
+            "No overdraft fees were applied this cycle.",
+        ],
+    },
+    'legal': {
+        'pii': [
+            "Case #{case}, Plaintiff: {PER} v. Defendant: {ORG}.",
+            "Attorney {PER}, Bar #{bar}, Client ID: CL-{client}, DOB: {dob}.",
+            "Court date: {date}, Docket: {docket}, Judge: Hon. {PER}.",
+            "Service of process was made at {address}, {LOC}.",
+            "Counsel for {ORG} may be reached at {phone} or {email}.",
+            "The deponent, {PER}, stated SSN {ssn} under oath.",
+        ],
+        'filler': [
+            "The parties hereby agree to the terms set out in clause {clause}.",
+            "Discovery shall close within {days} days of this order.",
+            "Objections must be filed no later than {hours} hours before the hearing.",
+            "The motion to dismiss is denied in part and granted in part.",
+            "This agreement is governed by the laws of the state.",
+        ],
+    },
+}
+DOMAINS = tuple(TEMPLATES)
+
+FIRST_NAMES = ["John", "Jane", "Maria", "James", "Priya", "Chen", "Olivia", "Ahmed", "Robert",
+               "Sofia", "David", "Aisha", "Michael", "Elena", "Daniel", "Grace", "Luis", "Hannah",
+               "Kwame", "Yuki", "Thomas", "Fatima", "Samuel", "Irene"]
+LAST_NAMES = ["Doe", "Smith", "Garcia", "Wilson", "Patel", "Wei", "Brown", "Khan", "Johnson",
+              "Rossi", "Miller", "Okafor", "Nguyen", "Kowalski", "Martin", "Lee", "Hernandez",
+              "Cohen", "Mensah", "Tanaka", "Anderson", "Haddad", "Walker", "Novak"]
+CITIES = ["Boston", "Chicago", "Denver", "Seattle", "Atlanta", "Houston", "Phoenix", "Portland",
+          "Philadelphia", "San Diego", "Nashville", "Minneapolis"]
+ORGANIZATIONS = ["ACME Corp", "Mercy General Hospital", "Northwind Bank", "Globex Insurance",
+                 "Initech LLC", "Riverside Clinic", "First Harbor Credit Union", "Hooli Inc",
+                 "Stark Legal Partners", "Umbrella Health", "Contoso Capital", "Wayne Enterprises"]
+STREETS = ["Main", "Oak", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park", "Pine"]
+STREET_SUFFIXES = ["St", "Street", "Ave", "Avenue", "Rd", "Road", "Dr", "Drive", "Ln", "Lane",
+                   "Blvd", "Boulevard"]
+EMAIL_DOMAINS = ["example.com", "email.com", "hospital.org", "lawfirm.com", "bank.net"]
+
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+# Luhn doubling of each digit, with the two digits of the product summed
+_LUHN_DOUBLE = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9])
+
+
+@dataclass
+class CorpusConfig:
+    """Shape of the generated documents"""
+    domains: Dict[str, float] = field(default_factory=lambda: {domain: 1.0 for domain in DOMAINS})
+    pii_density: float = 0.4
+    length: str = 'lognormal'
+    mean_sentences: float = 6.0
+    max_sentences: int = 2_000
+    paragraph_rate: float = 0.1
+
+    def __post_init__(self):
+        if self.length not in LENGTH_DISTRIBUTIONS:
+            raise ValueError(f"length must be one of {LENGTH_DISTRIBUTIONS}, not {self.length!r}")
+        unknown = set(self.domains) - set(TEMPLATES)
+        if unknown:
+            raise ValueError(f"Unknown domains {sorted(unknown)}, expected some of {DOMAINS}")
+        if not 0.0 <= self.pii_density <= 1.0:
+            raise ValueError("pii_density must be between 0 and 1")
+
+
+@dataclass
+class Shard:
+    """
+    Generated documents plus their gold spans as parallel arrays: span i
+    covers texts[span_doc[i]][span_start[i]:span_end[i]] and has label
+    labels[span_label[i]].
+    """
+    ids: List[str]
+    domains: List[str]
+    texts: List[str]
+    span_doc: np.ndarray
+    span_start: np.ndarray
+    span_end: np.ndarray
+    span_label: np.ndarray
+    labels: List[str]
+
+    def document_labels(self) -> List[List[Dict]]:
+        """Per document, its gold spans as {'type', 'position'} dicts, like detect() findings"""
+        per_doc: List[List[Dict]] = [[] for _ in self.texts]
+        for doc, start, end, label in zip(self.span_doc.tolist(), self.span_start.tolist(),
+                                          self.span_end.tolist(), self.span_label.tolist()):
+            per_doc[doc].append({'type': self.labels[label], 'position': [start, end]})
+        return per_doc
+
+
+@dataclass
+class LabeledDocument:
+    """One document read back from a corpus file"""
+    id: str
+    domain: str
+    text: str
+    labels: List[Dict]
+
+
+def _compile_templates():
+    """Every template as (literals, slots): literals[i] precedes slots[i], the last literal ends it"""
+    compiled, pools = [], {}
+    for domain, kinds in TEMPLATES.items():
+        for kind, templates in kinds.items():
+            pools[domain, kind] = np.arange(len(compiled), len(compiled) + len(templates))
+            for template in templates:
+                literals, slots = [], []
+                for literal, slot, _, _ in string.Formatter().parse(template):
+                    literals.append(literal)
+                    if slot is not None:
+                        slots.append(slot)
+                if len(literals) == len(slots):
+                    literals.append('')
+                compiled.append((literals, slots))
+    return compiled, pools
+
+
+_COMPILED, _POOLS = _compile_templates()
+SLOTS = sorted({slot for _, slots in _COMPILED for slot in slots})
+LABEL_VOCABULARY = sorted(set(LABELS.values()))
+
+
+def _digit_columns(values: np.ndarray, width: int) -> List[np.ndarray]:
+    """ASCII codes of each zero-padded digit of values, most significant first"""
+    return [(values // 10 ** (width - 1 - i)) % 10 + 48 for i in range(width)]
+
+
+def _render(columns: Sequence) -> List[str]:
+    """Fixed-width strings from per-position columns of ASCII codes or single characters"""
+    n = len(next(column for column in columns if not isinstance(column, str)))
+    matrix = np.empty((n, len(columns)), dtype=np.uint8)
+    for i, column in enumerate(columns):
+        matrix[:, i] = ord(column) if isinstance(column, str) else column
+    flat = matrix.tobytes().decode('ascii')
+    width = len(columns)
+    return [flat[i:i + width] for i in range(0, len(flat), width)]
+
+
+def _choose(rng: np.random.Generator, options: List[str], n: int) -> List[str]:
+    return [options[i] for i in rng.integers(len(options), size=n).tolist()]
+
+
+def _names(rng, n):
+    return [f"{first} {last}" for first, last in zip(_choose(rng, FIRST_NAMES, n), _choose(rng, LAST_NAMES, n))]
+
+
+def _ssns(rng, n):
+    # Area 001-899 except 666, group 01-99, serial 0001-9999
+    area = rng.integers(1, 899, size=n)
+    area[area == 666] = 665
+    return _render(_digit_columns(area, 3) + ['-'] + _digit_columns(rng.integers(1, 100, size=n), 2) + ['-']
+                   + _digit_columns(rng.integers(1, 10_000, size=n), 4))
+
+
+def _cards(rng, n):
+    # 15 random digits behind a network prefix, then the Luhn check digit
+    digits = rng.integers(0, 10, size=(n, 15))
+    digits[:, 0] = rng.choice([3, 4, 5, 6], size=n)
+    doubled = np.arange(15) % 2 == 0
+    total = np.where(doubled, _LUHN_DOUBLE[digits], digits).sum(axis=1)
+    digits = np.column_stack([digits, (10 - total % 10) % 10]) + 48
+    separator = np.where(rng.random(n) < 0.5, ord('-'), ord(' '))
+    columns = []
+    for group in range(4):
+        if group:
+            columns.append(separator)
+        columns.extend(digits[:, 4 * group + i] for i in range(4))
+    return _render(columns)
+
+
+def _nanp_code(rng, n):
+    """Area codes or exchanges: first digit 2-9, not N11"""
+    code = rng.integers(200, 1000, size=n)
+    code[code % 100 == 11] += 1
+    return code
+
+
+def _phones(rng, n):
+    area = _nanp_code(rng, n)
+    # Area codes with a middle 9 are reserved
+    area[(area // 10) % 10 == 9] -= 10
+    separator = np.where(rng.random(n) < 0.8, ord('-'), ord('.'))
+    return _render(_digit_columns(area, 3) + [separator] + _digit_columns(_nanp_code(rng, n), 3) + [separator]
+                   + _digit_columns(rng.integers(0, 10_000, size=n), 4))
+
+
+def _dates(rng, n, first_year: int = 1930):
+    year = rng.integers(first_year, 2025, size=n)
+    month = rng.integers(1, 13, size=n)
+    days = _DAYS_IN_MONTH[month - 1] + ((month == 2) & (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0)))
+    day = 1 + (rng.random(n) * days).astype(np.int64)
+    return _render(_digit_columns(month, 2) + ['/'] + _digit_columns(day, 2) + ['/'] + _digit_columns(year, 4))
+
+
+def _emails(rng, n):
+    numbers = rng.integers(1, 1000, size=n).tolist()
+    return [f"{first.lower()}.{last.lower()}{number}@{domain}"
+            for first, last, number, domain in zip(_choose(rng, FIRST_NAMES, n), _choose(rng, LAST_NAMES, n),
+                                                   numbers, _choose(rng, EMAIL_DOMAINS, n))]
+
+
+def _addresses(rng, n):
+    numbers = rng.integers(1, 10_000, size=n).tolist()
+    return [f"{number} {street} {suffix}"
+            for number, street, suffix in zip(numbers, _choose(rng, STREETS, n), _choose(rng, STREET_SUFFIXES, n))]
+
+
+def _integers(low: int, high: int, width: int = 0):
+    def generate(rng, n):
+        values = rng.integers(low, high, size=n)
+        if width:
+            return _render(_digit_columns(values, width))
+        return list(map(str, values.tolist()))
+    return generate
+
+
+def _amounts(rng, n):
+    return [f"${value:,}" for value in rng.integers(10, 100_000, size=n).tolist()]
+
+
+GENERATORS = {
+    'PER': _names,
+    'LOC': lambda rng, n: _choose(rng, CITIES, n),
+    'ORG': lambda rng, n: _choose(rng, ORGANIZATIONS, n),
+    'ssn': _ssns,
+    'credit_card': _cards,
+    'phone': _phones,
+    'email': _emails,
+    'dob': _dates,
+    'address': _addresses,
+    # Unlabelled noise, number-shaped like much of the real thing
+    'date': lambda rng, n: _dates(rng, n, first_year=2015),
+    'mrn': _integers(10_000, 100_000),
+    'npi': _integers(1_000_000_000, 2_000_000_000),
+    'insurance': lambda rng, n: [f"BCBS-{value}" for value in _integers(0, 10 ** 9, 9)(rng, n)],
+    'group': lambda rng, n: [f"EMP{value}" for value in _integers(2000, 2025)(rng, n)],
+    'account': _integers(0, 10 ** 9, 9),
+    'routing': _integers(0, 10 ** 9, 9),
+    'amount': _amounts,
+    'reference': _integers(0, 10 ** 7, 7),
+    'year': _integers(2015, 2025),
+    'rate': lambda rng, n: [f"{value:.2f}" for value in (rng.random(n) * 20).tolist()],
+    'case': lambda rng, n: [f"{year}-CV-{value}" for year, value in
+                            zip(_integers(2015, 2025)(rng, n), _integers(0, 10 ** 6, 6)(rng, n))],
+    'docket': lambda rng, n: [f"{year}-CR-{value}" for year, value in
+                              zip(_integers(2015, 2025)(rng, n), _integers(0, 10 ** 4, 4)(rng, n))],
+    'bar': _integers(10_000, 1_000_000),
+    'client': _integers(10_000, 100_000),
+    'clause': _integers(1, 40),
+    'dose': lambda rng, n: _choose(rng, ['250', '500', '875'], n),
+    'days': _integers(2, 90),
+    'hours': _integers(2, 72),
+}
+
+
+def _sentence_counts(rng: np.random.Generator, n: int, config: CorpusConfig) -> np.ndarray:
+    """Sentences per document under config.length"""
+    mean = config.mean_sentences
+    if config.length == 'fixed':
+        counts = np.full(n, round(mean))
+    elif config.length == 'uniform':
+        counts = rng.integers(1, max(2, round(2 * mean)), size=n)
+    elif config.length == 'lognormal':
+        sigma = 0.75
+        counts = np.rint(rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, size=n))
+    else:
+        # Lomax with shape 1.5 shifted by one: mean 3 * scale, a long tail of huge documents
+        counts = np.rint((1 + rng.pareto(1.5, size=n)) * mean / 3)
+    return np.clip(counts, 1, config.max_sentences).astype(np.int64)
+
+
+def generate_shard(num_docs: int, config: Optional[CorpusConfig] = None, seed=0,
+                   first_id: int = 0) -> Shard:
+    """num_docs documents with ids doc-<first_id>, doc-<first_id + 1>, ..."""
+    config = config or CorpusConfig()
+    rng = np.random.default_rng(seed)
+    domain_names = list(config.domains)
+    weights = np.array([config.domains[name] for name in domain_names], dtype=np.float64)
+    doc_domain = rng.choice(len(domain_names), size=num_docs, p=weights / weights.sum())
+
+    counts = _sentence_counts(rng, num_docs, config)
+    sentence_doc = np.repeat(np.arange(num_docs), counts)
+    sentence_domain = doc_domain[sentence_doc]
+    has_pii = rng.random(len(sentence_doc)) < config.pii_density
+    template = np.empty(len(sentence_doc), dtype=np.int64)
+    for d, name in enumerate(domain_names):
+        for kind, mask in (('pii', has_pii), ('filler', ~has_pii)):
+            selected = (sentence_domain == d) & mask
+            pool = _POOLS[name, kind]
+            template[selected] = pool[rng.integers(len(pool), size=int(selected.sum()))]
+
+    # Draw every slot's values for the whole shard at once
+    slot_uses = np.bincount(template, minlength=len(_COMPILED))
+    values = {}
+    for slot in SLOTS:
+        needed = int(sum(slot_uses[t] * slots.count(slot) for t, (_, slots) in enumerate(_COMPILED)))
+        values[slot] = iter(GENERATORS[slot](rng, needed)) if needed else iter(())
+    label_codes = {label: code for code, label in enumerate(LABEL_VOCABULARY)}
+    slot_codes = {slot: label_codes[LABELS[slot]] if slot in LABELS else -1 for slot in SLOTS}
+
+    first_sentence = np.ones(len(sentence_doc), dtype=bool)
+    first_sentence[1:] = sentence_doc[1:] != sentence_doc[:-1]
+    breaks = np.where(rng.random(len(sentence_doc)) < config.paragraph_rate, "\n", " ")
+
+    # One flat list of pieces for the shard; offsets come from a cumulative sum afterwards
+    pieces: List[str] = []
+    piece_label: List[int] = []
+    doc_first_piece: List[int] = []
+    for t, first, separator in zip(template.tolist(), first_sentence.tolist(), breaks.tolist()):
+        if first:
+            doc_first_piece.append(len(pieces))
+        else:
+            pieces.append(separator)
+            piece_label.append(-1)
+        literals, slots = _COMPILED[t]
+        for literal, slot in zip(literals, slots):
+            pieces.append(literal)
+            pieces.append(next(values[slot]))
+            piece_label.extend((-1, slot_codes[slot]))
+        pieces.append(literals[-1])
+        piece_label.append(-1)
+
+    lengths = np.fromiter(map(len, pieces), dtype=np.int64, count=len(pieces))
+    starts = np.cumsum(lengths) - lengths
+    bounds = doc_first_piece + [len(pieces)]
+    piece_doc = np.repeat(np.arange(num_docs), np.diff(bounds))
+    piece_label = np.array(piece_label, dtype=np.int16)
+    labelled = np.flatnonzero(piece_label >= 0)
+    span_doc = piece_doc[labelled]
+    span_start = starts[labelled] - starts[np.array(doc_first_piece)][span_doc]
+
+    return Shard(
+        ids=[f"doc-{first_id + i}" for i in range(num_docs)],
+        domains=[domain_names[d] for d in doc_domain.tolist()],
+        texts=[''.join(pieces[a:b]) for a, b in zip(bounds[:-1], bounds[1:])],
+        span_doc=span_doc,
+        span_start=span_start,
+        span_end=span_start + lengths[labelled],
+        span_label=piece_label[labelled],
+        labels=list(LABEL_VOCABULARY),
+    )
+
+
+def write_shard(shard: Shard, path: str, fmt: str):
+    """Write a shard as JSONL (one document per line) or Parquet"""
+    if fmt == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as handle:
+            for doc_id, domain, text, labels in zip(shard.ids, shard.domains, shard.texts,
+                                                    shard.document_labels()):
+                handle.write(json.dumps({'id': doc_id, 'domain': domain, 'text': text, 'labels': labels}) + "\n")
+    elif fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Spans are already grouped by document, so list offsets come from the counts
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(shard.span_doc, minlength=len(shard.texts)))])
+        spans = pa.StructArray.from_arrays(
+            [pa.DictionaryArray.from_arrays(pa.array(shard.span_label, pa.int16()), pa.array(shard.labels)),
+             pa.array(shard.span_start, pa.int64()), pa.array(shard.span_end, pa.int64())],
+            names=['type', 'start', 'end'])
+        table = pa.table({
+            'id': pa.array(shard.ids),
+            'domain': pa.array(shard.domains).dictionary_encode(),
+            'text': pa.array(shard.texts, pa.large_string()),
+            'labels': pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), spans),
+        })
+        pq.write_table(table, path, compression='zstd')
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+
+
+def _generate_and_write(index: int, num_docs: int, first_id: int, config: CorpusConfig,
+                        seed: int, path: str, fmt: str) -> str:
+    write_shard(generate_shard(num_docs, config, np.random.SeedSequence([seed, index]), first_id), path, fmt)
+    return path
+
+
+def write_corpus(output_dir: str, num_docs: int, shard_docs: int = 100_000, fmt: str = 'jsonl',
+                 config: Optional[CorpusConfig] = None, seed: int = 0, workers: int = 1) -> List[str]:
+    """
+    Generate num_docs documents into output_dir as part-NNNNN.<fmt> shards of
+    shard_docs documents each, with workers processes. Returns the shard paths.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+    config = config or CorpusConfig()
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    for index, first_id in enumerate(range(0, num_docs, shard_docs)):
+        path = os.path.join(output_dir, f"part-{index:05d}.{fmt}")
+        tasks.append((index, min(shard_docs, num_docs - first_id), first_id, config, seed, path, fmt))
+    if workers <= 1:
+        return [_generate_and_write(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(_generate_and_write, *zip(*tasks)))
+
+
+def read_corpus(path: str) -> Iterator[LabeledDocument]:
+    """Documents of one shard written by write_corpus()"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                labels = [{'type': span['type'], 'position': [span['start'], span['end']]}
+                          for span in row['labels']]
+                yield LabeledDocument(row['id'], row['domain'], row['text'], labels)
+        return
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            record = json.loads(line)
+            yield LabeledDocument(record['id'], record['domain'], record['text'], record['labels'])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a labeled synthetic PII corpus in shards")
+    parser.add_argument('output_dir', help="Directory for the part-NNNNN shards")
+    parser.add_argument('--docs', type=int, default=100_000, help="Documents to generate")
+    parser.add_argument('--shard-docs', type=int, default=100_000, help="Documents per shard")
+    parser.add_argument('--format', choices=FORMATS, default='jsonl')
+    parser.add_argument('--domains', default=','.join(DOMAINS),
+                        help="Comma-separated domains, optionally weighted as name=weight")
+    parser.add_argument('--pii-density', type=float, default=0.4, help="Fraction of sentences carrying PII")
+    parser.add_argument('--length', choices=LENGTH_DISTRIBUTIONS, default='lognormal',
+                        help="Distribution of sentences per document")
+    parser.add_argument('--mean-sentences', type=float, default=6.0)
+    parser.add_argument('--max-sentences', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating shards")
+    args = parser.parse_args(argv)
+
+    domains = {}
+    for spec in args.domains.split(','):
+        name, _, weight = spec.partition('=')
+        domains[name.strip()] = float(weight or 1.0)
+    config = CorpusConfig(domains=domains, pii_density=args.pii_density, length=args.length,
+                          mean_sentences=args.mean_sentences, max_sentences=args.max_sentences)
+    for path in write_corpus(args.output_dir, args.docs, args.shard_docs, args.format, config,
+                             args.seed, args.workers):
+        print(path, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Window layout of MultiLayerPIIDetector._iter_windows"""
+
+import re
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from multi_layer_detector import MultiLayerPIIDetector
+
+
+class WordPieceTokenizer:
+    """Splits on whitespace, then into pieces of at most three characters"""
+
+    model_max_length = 512
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def __call__(self, text, **kwargs):
+        return {'offset_mapping': [m.span() for m in re.finditer(r'\S{1,3}', text)]}
+
+
+class StubPipeline:
+    tokenizer = WordPieceTokenizer()
+
+    def __call__(self, inputs, **kwargs):
+        return [[] for _ in inputs] if isinstance(inputs, list) else []
+
+
+@pytest.fixture
+def detector(capsys):
+    detector = MultiLayerPIIDetector(chunk_overlap=64)
+    detector.ner_pipeline = StubPipeline()
+    capsys.readouterr()
+    return detector
+
+
+def check_tiling(text, windows):
+    """Owned ranges tile the text without gaps"""
+    assert windows[0][2] == 0 and windows[-1][3] == len(text)
+    for window, following in zip(windows, windows[1:]):
+        assert window[3] == following[2]
+
+
+def test_text_without_whitespace_steps_by_window_minus_overlap(detector):
+    text = '1' * 200_000
+    windows = list(detector._iter_windows(text))
+    tokens = len(WordPieceTokenizer()(text)['offset_mapping'])
+    step = detector._window_tokens() - 64
+    assert len(windows) <= tokens // step + 2
+    check_tiling(text, windows)
+
+
+def test_adjacent_words_share_a_window(detector):
+    text = ' '.join('x' * (1 + i % 5) for i in range(5000))
+    windows = list(detector._iter_windows(text))
+    words = [m.span() for m in re.finditer(r'\S+', text)]
+    for left, right in zip(words, words[1:]):
+        assert any(start <= left[0] and right[1] <= end for start, end, _, _ in windows)
+    check_tiling(text, windows)
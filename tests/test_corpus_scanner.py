@@ -0,0 +1,44 @@
+"""Input handling of corpus_scanner.scan"""
+
+import io
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from corpus_scanner import build_parser, scan
+
+
+class EchoDetector:
+    """Reports each whole document as one finding, so rows show what was read"""
+
+    def detect_batch(self, texts, batch_size=16):
+        return [{'pii_detected': [{'text': text, 'type': 'TEST', 'position': [0, len(text)]}]}
+                for text in texts]
+
+
+def scanned(path, **kwargs):
+    output = io.StringIO()
+    scan(EchoDetector(), str(path), output, **kwargs)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_tsv_is_split_on_tabs(tmp_path):
+    path = tmp_path / 'export.tsv'
+    path.write_text("id\ttext\n1\tCall John, at home\n2\tSSN 123-45-6789\n")
+    rows = scanned(path, id_field='id')
+    assert [(row['doc_id'], row['text']) for row in rows] == [
+        ('1', 'Call John, at home'), ('2', 'SSN 123-45-6789')]
+
+
+def test_explicit_delimiter(tmp_path):
+    path = tmp_path / 'export.txt'
+    path.write_text("id;text\n1;Call John, at home\n")
+    rows = scanned(path, fmt='csv', id_field='id', delimiter=';')
+    assert [(row['doc_id'], row['text']) for row in rows] == [('1', 'Call John, at home')]
+
+
+def test_cli_accepts_delimiter():
+    args = build_parser().parse_args(['scan', 'export.txt', '--format', 'csv', '--delimiter', ';'])
+    assert args.delimiter == ';'
@@ -0,0 +1,46 @@
+"""Partial rescans of incremental_scan.IncrementalScanner"""
+
+import re
+
+from incremental_scan import FingerprintStore, IncrementalScanner, chunk_spans
+
+# Word pairs across a sentence end, so findings straddle chunk boundaries
+PATTERN = re.compile(r'\w+\. \w+')
+CHUNKING = dict(chunked_min_chars=200, chunk_min_chars=60, chunk_target_chars=120, margin_chars=20)
+
+
+class PatternDetector:
+    """Reports every match of PATTERN"""
+
+    def config_fingerprint(self):
+        return 'pattern'
+
+    def detect_batch(self, texts, batch_size=16):
+        return [{'pii_detected': [{'text': m.group(), 'type': 'TEST', 'position': [m.start(), m.end()]}
+                                  for m in PATTERN.finditer(text)]}
+                for text in texts]
+
+
+def document():
+    return ''.join(f"Record{i} belongs to holder{i} in branch{i % 7}. " for i in range(60))
+
+
+def scan(tmp_path, text):
+    with FingerprintStore(str(tmp_path / 'fingerprints.db')) as store:
+        return IncrementalScanner(PatternDetector(), store, **CHUNKING).detect_batch(['doc'], [text])[0]
+
+
+def test_deleted_middle_chunk_is_rescanned_at_the_join(tmp_path):
+    text = document()
+    spans = chunk_spans(text, CHUNKING['chunk_min_chars'], CHUNKING['chunk_target_chars'])
+    assert len(spans) >= 3
+    start, end = spans[len(spans) // 2]
+    edited = text[:start] + text[end:]
+
+    scan(tmp_path, text)
+    result = scan(tmp_path, edited)
+
+    assert result['incremental'] == 'partial'
+    assert result['pii_detected'] == PatternDetector().detect_batch([edited])[0]['pii_detected']
+    for finding in result['pii_detected']:
+        assert edited[finding['position'][0]:finding['position'][1]] == finding['text']
@@ -0,0 +1,51 @@
+"""Model inputs of PipelinedDetector's staged path"""
+
+import re
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from multi_layer_detector import MultiLayerPIIDetector
+from pipelined_detection import PipelinedDetector
+
+
+class WordPieceTokenizer:
+    """Splits on whitespace, then into pieces of at most three characters"""
+
+    model_max_length = 512
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def __call__(self, text, **kwargs):
+        return {'offset_mapping': [m.span() for m in re.finditer(r'\S{1,3}', text)]}
+
+
+class RecordingPipeline:
+    """Finds nothing, but remembers every input it was given"""
+
+    tokenizer = WordPieceTokenizer()
+
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, inputs, **kwargs):
+        self.inputs.extend(inputs if isinstance(inputs, list) else [inputs])
+        return [[] for _ in inputs] if isinstance(inputs, list) else []
+
+
+@pytest.mark.parametrize('chunking', [True, False])
+def test_long_documents_reach_the_model_in_windows(capsys, chunking):
+    detector = MultiLayerPIIDetector(chunking=chunking)
+    pipeline = detector.ner_pipeline = RecordingPipeline()
+    capsys.readouterr()
+    text = ' '.join(f'word{i}' for i in range(2000))
+
+    with PipelinedDetector(detector) as pipelined:
+        pipelined.detect_batch([text, 'short note'])
+
+    window = detector._window_tokens()
+    assert all(len(WordPieceTokenizer()(piece)['offset_mapping']) <= window for piece in pipeline.inputs)
+    # The tail of the long document is sent to the model, not cut off
+    assert any(piece.endswith('word1999') for piece in pipeline.inputs)
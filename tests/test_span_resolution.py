@@ -0,0 +1,136 @@
+"""Overlap invariants of span_resolution.resolve_spans"""
+
+import random
+from dataclasses import dataclass
+
+import pytest
+
+from span_resolution import MERGE_POLICIES, resolve_spans
+
+PII_TYPES = ['PER', 'LOC', 'ORG', 'Social Security Number', 'Phone Number', 'Email Address']
+
+
+@dataclass
+class Span:
+    """Same fields as PIIResult, without importing the detector"""
+    text: str
+    pii_type: str
+    confidence: float
+    start: int
+    end: int
+    detection_layer: str
+
+
+def span(start, end, pii_type='PER', confidence=0.9, layer='ML/NLP'):
+    return Span('x' * (end - start), pii_type, confidence, start, end, layer)
+
+
+def random_spans(num_spans, seed):
+    """Dense nested and chained overlaps, shuffled"""
+    rng = random.Random(seed)
+    spans, position = [], 0
+    while len(spans) < num_spans:
+        if rng.random() < 0.5:
+            outer = rng.randint(20, 60)
+            spans.append(span(position, position + outer, rng.choice(PII_TYPES),
+                              round(rng.uniform(0.5, 1.0), 3), 'ML/NLP'))
+            for _ in range(rng.randint(2, 5)):
+                start = position + rng.randint(0, outer - 5)
+                spans.append(span(start, start + rng.randint(3, 12), rng.choice(PII_TYPES),
+                                  round(rng.uniform(0.5, 1.0), 3), 'Rules'))
+            position += outer + rng.randint(1, 20)
+        else:
+            start = position
+            for _ in range(rng.randint(3, 8)):
+                length = rng.randint(6, 18)
+                spans.append(span(start, start + length, rng.choice(PII_TYPES),
+                                  round(rng.uniform(0.5, 1.0), 3), rng.choice(['ML/NLP', 'Rules'])))
+                start += rng.randint(2, length - 1)
+            position = start + 40
+    rng.shuffle(spans)
+    return spans
+
+
+def covered(spans):
+    """Set of character positions covered by any span"""
+    return {i for s in spans for i in range(s.start, s.end)}
+
+
+@pytest.mark.parametrize('policy', MERGE_POLICIES)
+@pytest.mark.parametrize('seed', range(5))
+def test_output_never_overlaps(policy, seed):
+    resolved = resolve_spans(random_spans(500, seed), policy)
+    for left, right in zip(resolved, resolved[1:]):
+        assert left.end <= right.start
+
+
+@pytest.mark.parametrize('policy', MERGE_POLICIES)
+@pytest.mark.parametrize('seed', range(5))
+def test_every_input_span_is_represented(policy, seed):
+    spans = random_spans(500, seed)
+    resolved = resolve_spans(spans, policy)
+    for s in spans:
+        assert any(r.start < s.end and s.start < r.end for r in resolved)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_union_loses_no_coverage(seed):
+    spans = random_spans(500, seed)
+    assert covered(resolve_spans(spans, 'union')) == covered(spans)
+
+
+@pytest.mark.parametrize('policy', MERGE_POLICIES)
+@pytest.mark.parametrize('seed', range(5))
+def test_input_order_does_not_matter(policy, seed):
+    spans = random_spans(500, seed)
+    shuffled = list(spans)
+    random.Random(seed + 100).shuffle(shuffled)
+    assert resolve_spans(spans, policy) == resolve_spans(shuffled, policy)
+    assert resolve_spans(spans, policy) == resolve_spans(list(reversed(spans)), policy)
+
+
+def test_highest_confidence_keeps_most_confident():
+    long_weak = span(0, 20, confidence=0.7)
+    short_strong = span(5, 10, confidence=0.95)
+    assert resolve_spans([long_weak, short_strong], 'highest_confidence') == [short_strong]
+
+
+def test_longest_keeps_longest():
+    long_weak = span(0, 20, confidence=0.7)
+    short_strong = span(5, 10, confidence=0.95)
+    assert resolve_spans([long_weak, short_strong], 'longest') == [long_weak]
+
+
+def test_union_merges_chain_typed_after_best_member():
+    text = 'John Smith Street'
+    spans = [span(0, 10, 'PER', 0.8), span(5, 17, 'LOC', 0.9)]
+    [merged] = resolve_spans(spans, 'union', text=text)
+    assert (merged.start, merged.end, merged.text, merged.pii_type) == (0, 17, text, 'LOC')
+
+
+def test_disjoint_spans_are_all_kept():
+    spans = [span(10, 15), span(0, 5), span(20, 25)]
+    for policy in MERGE_POLICIES:
+        assert [(s.start, s.end) for s in resolve_spans(spans, policy)] == [(0, 5), (10, 15), (20, 25)]
+
+
+@pytest.mark.parametrize('policy', MERGE_POLICIES)
+def test_prefer_rules_for_overrides_confidence(policy):
+    ml = span(0, 20, 'PER', 0.99, 'ML/NLP')
+    ssn = span(4, 15, 'Social Security Number', 0.6, 'Rules')
+    [kept] = resolve_spans([ml, ssn], policy, prefer_rules_for=['Social Security Number'])
+    assert kept.pii_type == 'Social Security Number'
+    assert kept.detection_layer == 'Rules'
+
+
+def test_prefer_rules_for_ignores_ml_spans_of_that_type():
+    ml_ssn = span(0, 11, 'Social Security Number', 0.7, 'ML/NLP')
+    rule_phone = span(2, 12, 'Phone Number', 0.9, 'Rules')
+    kept = resolve_spans([ml_ssn, rule_phone], 'highest_confidence',
+                         prefer_rules_for=['Social Security Number'])
+    assert kept == [rule_phone]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_spans([], 'shortest')